@@ -1,5 +1,5 @@
 from logging.config import fileConfig
-from sqlalchemy import engine_from_config, pool
+from sqlalchemy import engine_from_config, make_url, pool
 from alembic import context
 from app.models.database import Base
 from app.core.config import settings
@@ -11,19 +11,34 @@ config = context.config
 if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 
-# Set the SQLAlchemy URL from our settings
-config.set_main_option("sqlalchemy.url", str(settings.DATABASE_URL))
+# Set the SQLAlchemy URL from our settings (migrations run with the sync drivers)
+config.set_main_option(
+    "sqlalchemy.url",
+    str(settings.DATABASE_URL).replace("+asyncpg", "+psycopg2").replace("+aiosqlite", "")
+)
 
 # Add your model's MetaData object here for 'autogenerate' support
 target_metadata = Base.metadata
 
 
+def include_object_for(dialect_name: str):
+    """Skip indexes the models only create on other dialects (Index.ddl_if), e.g. GIN on SQLite"""
+    def include_object(obj, name, type_, reflected, compare_to):
+        ddl_if = getattr(obj, "_ddl_if", None)
+        if type_ == "index" and ddl_if is not None and ddl_if.dialect:
+            dialects = [ddl_if.dialect] if isinstance(ddl_if.dialect, str) else ddl_if.dialect
+            return dialect_name in dialects
+        return True
+    return include_object
+
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode."""
     url = config.get_main_option("sqlalchemy.url")
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object_for(make_url(url).get_backend_name()),
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -43,7 +58,8 @@ def run_migrations_online() -> None:
     with connectable.connect() as connection:
         context.configure(
             connection=connection, 
-            target_metadata=target_metadata
+            target_metadata=target_metadata,
+            include_object=include_object_for(connection.dialect.name)
         )
 
         with context.begin_transaction():
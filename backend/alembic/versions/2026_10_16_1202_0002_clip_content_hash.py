@@ -0,0 +1,38 @@
+"""Clip content hash
+
+clips.content_hash: blake2b-256 of the clip file, computed while uploads
+stream to disk. Indexed for lookups by content.
+
+Existing clips keep a NULL hash.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-16 12:02:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('clips', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    if op.get_context().dialect.name == 'postgresql':
+        # Build without blocking writes on a populated table
+        with op.get_context().autocommit_block():
+            op.create_index(op.f('ix_clips_content_hash'), 'clips', ['content_hash'], unique=False,
+                            postgresql_concurrently=True, if_not_exists=True)
+    else:
+        op.create_index(op.f('ix_clips_content_hash'), 'clips', ['content_hash'], unique=False,
+                        if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_clips_content_hash'), table_name='clips', if_exists=True)
+    op.drop_column('clips', 'content_hash')
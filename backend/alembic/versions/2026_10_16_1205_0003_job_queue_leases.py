@@ -0,0 +1,43 @@
+"""Job queue columns
+
+The processing_jobs columns the durable job queue needs: attempt counting,
+retry backoff (run_after) and worker leases (locked_by, lease_expires_at,
+heartbeat_at).
+
+Existing jobs get attempts = 0 and max_attempts = 3, as new ones do, so the
+claim's compare-and-set on attempts works for them.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-16 12:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+JOB_COLUMNS = [
+    ('attempts', sa.Integer()),
+    ('max_attempts', sa.Integer()),
+    ('run_after', sa.DateTime(timezone=True)),
+    ('locked_by', sa.String()),
+    ('lease_expires_at', sa.DateTime(timezone=True)),
+    ('heartbeat_at', sa.DateTime(timezone=True)),
+]
+
+
+def upgrade() -> None:
+    for name, type_ in JOB_COLUMNS:
+        op.add_column('processing_jobs', sa.Column(name, type_, nullable=True))
+    op.execute(sa.text("UPDATE processing_jobs SET attempts = 0, max_attempts = 3 WHERE attempts IS NULL"))
+
+
+def downgrade() -> None:
+    for name, _ in reversed(JOB_COLUMNS):
+        op.drop_column('processing_jobs', name)
@@ -0,0 +1,41 @@
+"""Clip listing indexes
+
+Composite indexes for keyset pagination of clips, newest first, unfiltered
+or filtered by status or owner. The trailing id makes (created_at, id) a
+total order, so a cursor page is a single index range scan.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-16 12:10:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+LISTING_INDEXES = [
+    ('ix_clips_created_at_id', ['created_at', 'id']),
+    ('ix_clips_status_created_at_id', ['status', 'created_at', 'id']),
+    ('ix_clips_owner_id_created_at_id', ['owner_id', 'created_at', 'id']),
+]
+
+
+def upgrade() -> None:
+    for name, columns in LISTING_INDEXES:
+        if op.get_context().dialect.name == 'postgresql':
+            # Build without blocking writes on a populated table
+            with op.get_context().autocommit_block():
+                op.create_index(name, 'clips', columns, unique=False,
+                                postgresql_concurrently=True, if_not_exists=True)
+        else:
+            op.create_index(name, 'clips', columns, unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    for name, _ in reversed(LISTING_INDEXES):
+        op.drop_index(name, table_name='clips', if_exists=True)
@@ -0,0 +1,76 @@
+"""Hot path indexes and JSONB clip documents
+
+Indexes for the queries the API and the job worker run on every request or
+poll: jobs by clip and status, publications by clip and platform, and two
+partial indexes for JobQueue.claim (the pending queue head and expired
+leases). On PostgreSQL, clips.ai_metadata and clips.highlights_detected
+become JSONB with jsonb_path_ops GIN indexes for @> containment queries.
+
+The JSONB conversion rewrites the clips table under an exclusive lock; the
+indexes are built CONCURRENTLY afterwards.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+JSONB_COLUMNS = ['ai_metadata', 'highlights_detected']
+
+# (name, table, columns, partial index predicate)
+HOT_PATH_INDEXES = [
+    ('ix_processing_jobs_clip_id_status', 'processing_jobs', ['clip_id', 'status'], None),
+    ('ix_processing_jobs_pending', 'processing_jobs', ['status', 'id'], "status = 'pending'"),
+    ('ix_processing_jobs_leases', 'processing_jobs', ['status', 'lease_expires_at'], "status = 'processing'"),
+    ('ix_publications_clip_id_platform', 'publications', ['clip_id', 'platform'], None),
+]
+
+
+def upgrade() -> None:
+    postgres = op.get_context().dialect.name == 'postgresql'
+    if postgres:
+        for column in JSONB_COLUMNS:
+            op.alter_column('clips', column, type_=postgresql.JSONB(), existing_type=sa.JSON(),
+                            existing_nullable=True, postgresql_using=f'{column}::jsonb')
+
+    for name, table, columns, where in HOT_PATH_INDEXES:
+        if postgres:
+            with op.get_context().autocommit_block():
+                op.create_index(name, table, columns, unique=False, if_not_exists=True,
+                                postgresql_where=sa.text(where) if where else None,
+                                postgresql_concurrently=True)
+        else:
+            op.create_index(name, table, columns, unique=False, if_not_exists=True,
+                            sqlite_where=sa.text(where) if where else None)
+
+    if postgres:
+        for column in JSONB_COLUMNS:
+            with op.get_context().autocommit_block():
+                op.create_index(f'ix_clips_{column}_gin', 'clips', [column], unique=False, if_not_exists=True,
+                                postgresql_using='gin', postgresql_ops={column: 'jsonb_path_ops'},
+                                postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    postgres = op.get_context().dialect.name == 'postgresql'
+    if postgres:
+        for column in reversed(JSONB_COLUMNS):
+            op.drop_index(f'ix_clips_{column}_gin', table_name='clips', if_exists=True)
+
+    for name, table, _, _ in reversed(HOT_PATH_INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
+
+    if postgres:
+        for column in reversed(JSONB_COLUMNS):
+            op.alter_column('clips', column, type_=sa.JSON(), existing_type=postgresql.JSONB(),
+                            existing_nullable=True, postgresql_using=f'{column}::json')
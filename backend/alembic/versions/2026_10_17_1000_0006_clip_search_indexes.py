@@ -0,0 +1,78 @@
+"""Clip search indexes
+
+Indexes for clip search: clips.game_detected, and an expression index on
+highlights_detected.highlight_score (the peak moment score, written by the
+highlight detector). The expressions are the ones ClipSearch compiles to:
+((highlights_detected ->> 'highlight_score')::float) on PostgreSQL and
+json_extract(highlights_detected, '$.highlight_score') on SQLite.
+
+Clips analyzed before this revision get their highlight_score backfilled
+from best_moments; the downgrade leaves that key in place.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+HIGHLIGHT_SCORE = {
+    'postgresql': "((highlights_detected ->> 'highlight_score')::float)",
+    'sqlite': "json_extract(highlights_detected, '$.highlight_score')",
+}
+
+BACKFILL = {
+    'postgresql': """
+        UPDATE clips
+        SET highlights_detected = clips.highlights_detected || jsonb_build_object('highlight_score', s.score)
+        FROM (
+            SELECT c.id, coalesce(max((m ->> 'score')::float), 0.0) AS score
+            FROM clips c
+            LEFT JOIN LATERAL jsonb_array_elements(c.highlights_detected -> 'best_moments') m ON true
+            WHERE jsonb_typeof(c.highlights_detected -> 'best_moments') = 'array'
+              AND NOT c.highlights_detected ? 'highlight_score'
+            GROUP BY c.id
+        ) s
+        WHERE clips.id = s.id
+    """,
+    'sqlite': """
+        UPDATE clips
+        SET highlights_detected = json_set(highlights_detected, '$.highlight_score', coalesce(
+            (SELECT max(json_extract(m.value, '$.score'))
+             FROM json_each(clips.highlights_detected, '$.best_moments') AS m),
+            0.0))
+        WHERE json_type(highlights_detected, '$.best_moments') = 'array'
+          AND json_type(highlights_detected, '$.highlight_score') IS NULL
+    """,
+}
+
+
+def upgrade() -> None:
+    dialect = op.get_context().dialect.name
+    if dialect in BACKFILL:
+        op.execute(sa.text(BACKFILL[dialect]))
+
+    if dialect == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.create_index('ix_clips_game_detected', 'clips', ['game_detected'], unique=False,
+                            if_not_exists=True, postgresql_concurrently=True)
+            op.create_index('ix_clips_highlight_score', 'clips', [sa.text(HIGHLIGHT_SCORE[dialect])],
+                            unique=False, if_not_exists=True, postgresql_concurrently=True)
+    else:
+        op.create_index('ix_clips_game_detected', 'clips', ['game_detected'], unique=False, if_not_exists=True)
+        if dialect in HIGHLIGHT_SCORE:
+            op.create_index('ix_clips_highlight_score', 'clips', [sa.text(HIGHLIGHT_SCORE[dialect])],
+                            unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_clips_highlight_score', table_name='clips', if_exists=True)
+    op.drop_index('ix_clips_game_detected', table_name='clips', if_exists=True)
@@ -1,7 +1,13 @@
 from fastapi import APIRouter, HTTPException
-from typing import Optional
+from fastapi.responses import StreamingResponse
+from typing import Any, AsyncIterator, Optional
+import json
 from pydantic import BaseModel
-from app.services.ai_service_ollama import AIService, OllamaService
+from app.services.ai_service_ollama import AIService, OllamaService, generation_flights
+from app.services.analysis_pool import get_analysis_pool
+from app.services.admission import OverloadedError, Priority, get_ollama_limiter
+from app.services.llm_cache import get_llm_cache
+from app.services.model_router import get_model_router
 
 router = APIRouter()
 
@@ -10,11 +16,22 @@ class GenerateMetadataRequest(BaseModel):
     clip_title: str
     game_name: Optional[str] = None
     clip_duration: Optional[int] = None
+    use_cache: bool = True
 
 
 class GenerateTextRequest(BaseModel):
     prompt: str
     model: Optional[str] = None
+    use_cache: bool = True
+
+
+def _overloaded(e: OverloadedError) -> HTTPException:
+    """429 with Retry-After for requests shed by the Ollama admission controller"""
+    return HTTPException(
+        status_code=429,
+        detail=str(e),
+        headers={"Retry-After": str(int(e.retry_after))}
+    )
 
 
 @router.get("/models")
@@ -37,18 +54,55 @@ async def generate_text(request: GenerateTextRequest):
     """Generate text using Ollama"""
     try:
         ollama = OllamaService()
-        async with ollama:
-            response = await ollama.generate_text(request.prompt, request.model)
+        model_used = request.model or ollama.select_model("text")
+        response = await ollama.generate_text(request.prompt, model_used, use_cache=request.use_cache)
         
         return {
             "success": True,
             "response": response,
-            "model_used": request.model or ollama.default_model
+            "model_used": model_used
         }
+    except OverloadedError as e:
+        raise _overloaded(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating text: {str(e)}")
 
 
+def _sse(event: str, data: Any) -> str:
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def _sse_response(events: AsyncIterator[str]) -> StreamingResponse:
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.post("/generate-text/stream")
+async def stream_text(request: GenerateTextRequest):
+    """Stream generated tokens as Server-Sent Events"""
+    try:
+        get_ollama_limiter().check(Priority.INTERACTIVE)
+    except OverloadedError as e:
+        raise _overloaded(e)
+    
+    ollama = OllamaService()
+    model_used = request.model or ollama.select_model("text")
+    
+    async def events():
+        try:
+            async for token in ollama.stream_text(request.prompt, model_used, use_cache=request.use_cache):
+                yield _sse("token", {"token": token})
+            yield _sse("done", {"model_used": model_used})
+        except Exception as e:
+            yield _sse("error", {"detail": f"Error generating text: {str(e)}"})
+    
+    return _sse_response(events())
+
+
 @router.post("/generate-metadata")
 async def generate_gaming_metadata(request: GenerateMetadataRequest):
     """Generate gaming-specific metadata"""
@@ -57,30 +111,63 @@ async def generate_gaming_metadata(request: GenerateMetadataRequest):
         metadata = await ai_service.metadata_service.generate_gaming_metadata(
             clip_title=request.clip_title,
             game_name=request.game_name,
-            clip_duration=request.clip_duration
+            clip_duration=request.clip_duration,
+            use_cache=request.use_cache
         )
         
         return {
             "success": True,
             "metadata": metadata
         }
+    except OverloadedError as e:
+        raise _overloaded(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating metadata: {str(e)}")
 
 
+@router.post("/generate-metadata/stream")
+async def stream_gaming_metadata(request: GenerateMetadataRequest):
+    """Stream gaming metadata generation; each field (the title first) is sent as soon as it is complete"""
+    try:
+        get_ollama_limiter().check(Priority.INTERACTIVE)
+    except OverloadedError as e:
+        raise _overloaded(e)
+    
+    ai_service = AIService()
+    
+    async def events():
+        try:
+            async for item in ai_service.metadata_service.stream_gaming_metadata(
+                clip_title=request.clip_title,
+                game_name=request.game_name,
+                clip_duration=request.clip_duration,
+                use_cache=request.use_cache
+            ):
+                if item["event"] == "token":
+                    yield _sse("token", {"token": item["data"]})
+                elif item["event"] == "field":
+                    # The key comes from model output, so it travels in the data, never as the event name
+                    yield _sse("field", {"key": item["key"], "value": item["value"]})
+                else:
+                    yield _sse("metadata", {"metadata": item["data"], "cached": item["cached"]})
+        except Exception as e:
+            yield _sse("error", {"detail": f"Error generating metadata: {str(e)}"})
+    
+    return _sse_response(events())
+
+
 @router.post("/test-ollama")
 async def test_ollama_connection():
     """Test Ollama connection and basic functionality"""
     try:
         ollama = OllamaService()
-        async with ollama:
-            # Test with a simple prompt
-            test_prompt = "Generate a catchy title for an epic gaming moment in 10 words or less."
-            response = await ollama.generate_text(test_prompt)
-            
-            # Get available models
-            models = await ollama.list_models()
-            
+        # Test with a simple prompt
+        test_prompt = "Generate a catchy title for an epic gaming moment in 10 words or less."
+        response = await ollama.generate_text(test_prompt)
+        
+        # Get available models
+        models = await ollama.list_models()
+        
         return {
             "success": True,
             "connection": "OK",
@@ -88,6 +175,8 @@ async def test_ollama_connection():
             "available_models": len(models),
             "models": [model.get("name", "Unknown") for model in models]
         }
+    except OverloadedError as e:
+        raise _overloaded(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Ollama connection failed: {str(e)}")
 
@@ -106,17 +195,69 @@ async def analyze_gaming_content(clip_title: str):
             "success": True,
             "analysis": analysis
         }
+    except OverloadedError as e:
+        raise _overloaded(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error analyzing content: {str(e)}")
 
 
+@router.get("/models/status")
+async def get_model_status():
+    """Per-task model choice, per-model latency and which models Ollama has loaded"""
+    model_router = get_model_router()
+    await model_router.refresh_loaded()
+    return {
+        "success": True,
+        "router": model_router.stats()
+    }
+
+
+@router.post("/models/warmup")
+async def warm_up_models():
+    """Load the routed models into Ollama and pin them with keep_alive"""
+    results = await get_model_router().warm_up()
+    return {
+        "success": all(results.values()),
+        "models": results
+    }
+
+
+@router.get("/cache/stats")
+async def get_cache_stats():
+    """LLM response cache hit/miss counters and in-flight request coalescing"""
+    return {
+        "success": True,
+        "cache": get_llm_cache().stats(),
+        "single_flight": generation_flights.stats()
+    }
+
+
+@router.get("/queue/stats")
+async def get_queue_stats():
+    """Ollama admission control and video analysis worker pool load"""
+    return {
+        "success": True,
+        "admission": get_ollama_limiter().stats(),
+        "analysis_pool": get_analysis_pool().stats()
+    }
+
+
+@router.delete("/cache")
+async def clear_cache():
+    """Drop all cached LLM responses"""
+    try:
+        await get_llm_cache().clear()
+        return {"success": True}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error clearing cache: {str(e)}")
+
+
 @router.get("/health")
 async def ai_health_check():
     """Check AI services health"""
     try:
         ollama = OllamaService()
-        async with ollama:
-            models = await ollama.list_models()
+        models = await ollama.list_models()
         
         return {
             "ollama": {
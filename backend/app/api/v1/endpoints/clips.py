@@ -1,36 +1,116 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Header, Query, Request, Response
+from fastapi.responses import FileResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from app.core.database import get_database
-from app.models.schemas import Clip, ClipCreate, ClipUpdate, APIResponse, PaginatedResponse
+from app.models.schemas import Clip, ClipCreate, ClipUpdate, APIResponse, ClipSearchResponse, CursorPaginatedResponse
+from app.services.clip_search import ClipSearch
 from app.services.clip_service import ClipService
-from app.services.ai_service import AIService
+from app.services.job_queue import get_job_queue
+import app.services.job_handlers  # noqa: F401  (registers the handlers)
+from app.services.upload_service import UploadOffsetError, UploadTooLargeError, get_upload_sessions, max_upload_bytes
+from app.services.thumbnail_engine import MEDIA_TYPES, generate_clip_thumbnail, get_thumbnail_engine
+from app.utils.pagination import InvalidCursorError
 
 router = APIRouter()
 
 
-@router.get("/", response_model=PaginatedResponse)
+@router.get("/", response_model=CursorPaginatedResponse)
 async def get_clips(
-    page: int = 1,
-    per_page: int = 20,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
     status: Optional[str] = None,
+    owner_id: Optional[int] = None,
+    include_total: bool = True,
+    estimate_total: bool = False,
     db: AsyncSession = Depends(get_database)
 ):
-    """Get all clips with pagination and filtering"""
+    """Get clips newest first with cursor pagination and filtering"""
     try:
         clip_service = ClipService(db)
-        clips, total = await clip_service.get_clips(
-            page=page, 
-            per_page=per_page, 
-            status=status
+        clips, next_cursor = await clip_service.list_clips(
+            limit=limit,
+            cursor=cursor,
+            status=status,
+            owner_id=owner_id
         )
         
-        return PaginatedResponse(
+        total, is_estimate = None, False
+        if include_total:
+            total, is_estimate = await clip_service.count_clips(
+                status=status,
+                owner_id=owner_id,
+                estimate=estimate_total
+            )
+        
+        return CursorPaginatedResponse(
             items=clips,
+            next_cursor=next_cursor,
+            limit=limit,
             total=total,
-            page=page,
-            per_page=per_page,
-            total_pages=(total + per_page - 1) // per_page
+            total_is_estimate=is_estimate
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/search", response_model=ClipSearchResponse)
+async def search_clips(
+    game: Optional[str] = None,
+    hashtag: Optional[List[str]] = Query(None),
+    status: Optional[str] = None,
+    min_score: Optional[float] = None,
+    max_score: Optional[float] = None,
+    owner_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    include_facets: bool = True,
+    facet_limit: int = Query(20, ge=1, le=100),
+    include_total: bool = True,
+    db: AsyncSession = Depends(get_database)
+):
+    """Search clips by game, hashtags (all must match), status and highlight score, with facet counts"""
+    try:
+        search = ClipSearch(
+            db,
+            status=status,
+            game=game,
+            hashtags=hashtag,
+            min_score=min_score,
+            max_score=max_score,
+            owner_id=owner_id
+        )
+        clips, next_cursor = await search.page(limit=limit, cursor=cursor)
+        
+        return ClipSearchResponse(
+            items=clips,
+            next_cursor=next_cursor,
+            limit=limit,
+            total=await search.count() if include_total else None,
+            facets=await search.facets(limit=facet_limit) if include_facets else {}
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/probe", response_model=APIResponse)
+async def probe_clips(
+    limit: int = 10000,
+    db: AsyncSession = Depends(get_database)
+):
+    """Fill in missing durations from container metadata"""
+    try:
+        clip_service = ClipService(db)
+        updated = await clip_service.backfill_durations(limit=limit)
+        
+        return APIResponse(
+            success=True,
+            message=f"Probed {updated} clips",
+            data={"updated": updated}
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -59,7 +139,6 @@ async def get_clip(
 @router.post("/", response_model=APIResponse)
 async def create_clip(
     clip_data: ClipCreate,
-    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_database)
 ):
     """Create a new clip"""
@@ -67,8 +146,8 @@ async def create_clip(
         clip_service = ClipService(db)
         clip = await clip_service.create_clip(clip_data)
         
-        # Start background processing
-        background_tasks.add_task(process_clip_background, clip.id, db)
+        # Queue processing for the job worker
+        await get_job_queue().enqueue(db, "clip_processing", clip_id=clip.id)
         
         return APIResponse(
             success=True,
@@ -83,7 +162,6 @@ async def create_clip(
 async def upload_clip(
     file: UploadFile = File(...),
     title: str = "Untitled Clip",
-    background_tasks: BackgroundTasks = None,
     db: AsyncSession = Depends(get_database)
 ):
     """Upload a video file and create a clip"""
@@ -95,21 +173,140 @@ async def upload_clip(
         clip_service = ClipService(db)
         clip = await clip_service.upload_clip(file, title)
         
-        # Start background processing
-        if background_tasks:
-            background_tasks.add_task(process_clip_background, clip.id, db)
+        # Queue processing for the job worker
+        await get_job_queue().enqueue(db, "clip_processing", clip_id=clip.id)
         
         return APIResponse(
             success=True,
             message="Clip uploaded successfully",
             data={"clip_id": clip.id}
         )
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/upload/stream", response_model=APIResponse)
+async def upload_clip_stream(
+    request: Request,
+    filename: str,
+    title: str = "Untitled Clip",
+    db: AsyncSession = Depends(get_database)
+):
+    """Upload a raw video body, written to disk as it arrives (no multipart spooling)"""
+    try:
+        content_type = request.headers.get("content-type", "")
+        if content_type and not content_type.startswith(("video/", "application/octet-stream")):
+            raise HTTPException(status_code=400, detail="File must be a video")
+        declared = request.headers.get("content-length")
+        try:
+            declared_size = int(declared) if declared else None
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid Content-Length header")
+        if declared_size is not None and declared_size > max_upload_bytes():
+            raise UploadTooLargeError(max_upload_bytes())
+        
+        clip_service = ClipService(db)
+        clip = await clip_service.upload_stream(request.stream(), filename, title)
+        
+        await get_job_queue().enqueue(db, "clip_processing", clip_id=clip.id)
+        
+        return APIResponse(
+            success=True,
+            message="Clip uploaded successfully",
+            data={"clip_id": clip.id, "file_size": clip.file_size, "content_hash": clip.content_hash}
+        )
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/uploads", response_model=APIResponse)
+async def create_upload(
+    filename: str,
+    title: str = "Untitled Clip",
+    total_size: Optional[int] = None
+):
+    """Start a resumable upload; send the body with PATCH /uploads/{upload_id}"""
+    try:
+        session = await get_upload_sessions().create(filename, title, total_size)
+        return APIResponse(success=True, message="Upload created", data=session)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/uploads/{upload_id}", response_model=APIResponse)
+async def get_upload(upload_id: str):
+    """Current offset of a resumable upload, where the next chunk must start"""
+    session = await get_upload_sessions().get(upload_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return APIResponse(success=True, message="Upload in progress", data=session)
+
+
+@router.patch("/uploads/{upload_id}", response_model=APIResponse)
+async def append_upload(
+    upload_id: str,
+    request: Request,
+    upload_offset: int = Header(...)
+):
+    """Append the request body at Upload-Offset"""
+    try:
+        session = await get_upload_sessions().append(upload_id, upload_offset, request.stream())
+        return APIResponse(success=True, message="Chunk stored", data=session)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    except UploadOffsetError as e:
+        raise HTTPException(status_code=409, detail={"message": str(e), "offset": e.expected})
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/uploads/{upload_id}/complete", response_model=APIResponse)
+async def complete_upload(
+    upload_id: str,
+    db: AsyncSession = Depends(get_database)
+):
+    """Finish a resumable upload and create the clip"""
+    try:
+        upload = await get_upload_sessions().complete(upload_id)
+        
+        clip_service = ClipService(db)
+        clip = await clip_service.create_uploaded_clip(upload, upload["title"], upload["filename"])
+        
+        await get_job_queue().enqueue(db, "clip_processing", clip_id=clip.id)
+        
+        return APIResponse(
+            success=True,
+            message="Clip uploaded successfully",
+            data={"clip_id": clip.id, "file_size": clip.file_size, "content_hash": clip.content_hash}
+        )
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    except UploadOffsetError as e:
+        raise HTTPException(status_code=409, detail={"message": str(e), "offset": e.received})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.delete("/uploads/{upload_id}", response_model=APIResponse)
+async def abort_upload(upload_id: str):
+    """Discard a resumable upload"""
+    if not await get_upload_sessions().abort(upload_id):
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return APIResponse(success=True, message="Upload discarded")
+
+
 @router.put("/{clip_id}", response_model=APIResponse)
 async def update_clip(
     clip_id: int,
@@ -161,17 +358,16 @@ async def delete_clip(
 @router.post("/{clip_id}/generate-metadata", response_model=APIResponse)
 async def generate_metadata(
     clip_id: int,
-    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_database)
 ):
     """Generate AI metadata for a clip"""
     try:
-        # Start background task for AI metadata generation
-        background_tasks.add_task(generate_metadata_background, clip_id, db)
+        job = await get_job_queue().enqueue(db, "metadata_generation", clip_id=clip_id)
         
         return APIResponse(
             success=True,
-            message="Metadata generation started"
+            message="Metadata generation queued",
+            data={"job_id": job.id}
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -180,55 +376,46 @@ async def generate_metadata(
 @router.post("/{clip_id}/detect-highlights", response_model=APIResponse)
 async def detect_highlights(
     clip_id: int,
-    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_database)
 ):
     """Detect highlights in a clip using AI"""
     try:
-        # Start background task for highlight detection
-        background_tasks.add_task(detect_highlights_background, clip_id, db)
+        job = await get_job_queue().enqueue(db, "highlight_detection", clip_id=clip_id)
         
         return APIResponse(
             success=True,
-            message="Highlight detection started"
+            message="Highlight detection queued",
+            data={"job_id": job.id}
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-# Background task functions
-async def process_clip_background(clip_id: int, db: AsyncSession):
-    """Background task to process a newly uploaded clip"""
+@router.get("/{clip_id}/thumbnail")
+async def get_clip_thumbnail(
+    clip_id: int,
+    request: Request,
+    size: str = "medium",
+    format: str = "jpg",
+    db: AsyncSession = Depends(get_database)
+):
+    """Serve a cached thumbnail, generating it on first request"""
+    engine = get_thumbnail_engine()
+    if size not in engine.sizes or format not in engine.formats:
+        raise HTTPException(status_code=400, detail=f"Unsupported thumbnail size or format: {size}.{format}")
     try:
-        ai_service = AIService()
-        
-        # Detect highlights
-        await ai_service.detect_highlights(clip_id)
-        
-        # Generate metadata
-        await ai_service.generate_metadata(clip_id)
+        thumbnails = await generate_clip_thumbnail(clip_id, db)
+        if not thumbnails:
+            raise HTTPException(status_code=404, detail="Thumbnail not available")
         
-        # Generate thumbnail
-        await ai_service.generate_thumbnail(clip_id)
+        path = thumbnails["files"][size][format]
+        etag = engine.etag_for(path)
+        headers = {"ETag": etag, "Cache-Control": "public, max-age=3600"}
+        if etag in request.headers.get("if-none-match", ""):
+            return Response(status_code=304, headers=headers)
         
+        return FileResponse(path, media_type=MEDIA_TYPES[format], headers=headers)
+    except HTTPException:
+        raise
     except Exception as e:
-        # Log error and update clip status
-        print(f"Error processing clip {clip_id}: {e}")
-
-
-async def generate_metadata_background(clip_id: int, db: AsyncSession):
-    """Background task for AI metadata generation"""
-    try:
-        ai_service = AIService()
-        await ai_service.generate_metadata(clip_id)
-    except Exception as e:
-        print(f"Error generating metadata for clip {clip_id}: {e}")
-
-
-async def detect_highlights_background(clip_id: int, db: AsyncSession):
-    """Background task for highlight detection"""
-    try:
-        ai_service = AIService()
-        await ai_service.detect_highlights(clip_id)
-    except Exception as e:
-        print(f"Error detecting highlights for clip {clip_id}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
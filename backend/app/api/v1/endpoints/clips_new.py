@@ -5,13 +5,16 @@ API endpoints for managing and processing gaming clips
 
 from fastapi import APIRouter, HTTPException
 from typing import List, Dict, Any, Optional
-from pydantic import BaseModel
-from app.services.clips_monitor import ClipsMonitor
+from pydantic import BaseModel, Field
+from app.services.clips_monitor import get_clips_monitor
 
 router = APIRouter()
 
 class ClipProcessRequest(BaseModel):
     limit: Optional[int] = 5
+    concurrency: Optional[int] = Field(None, ge=1, le=64)
+    item_timeout: Optional[float] = Field(None, gt=0)
+    ordered: bool = True
 
 class ClipScanResponse(BaseModel):
     success: bool
@@ -22,13 +25,14 @@ class ClipProcessResponse(BaseModel):
     success: bool
     processed_count: int
     results: List[Dict[str, Any]]
+    stats: Dict[str, Any] = {}
 
 
 @router.get("/scan", response_model=ClipScanResponse)
 async def scan_outplayed_clips():
     """Scan the Outplayed folder for gaming clips"""
     try:
-        monitor = ClipsMonitor()
+        monitor = get_clips_monitor()
         clips = await monitor.scan_existing_clips()
         
         return ClipScanResponse(
@@ -44,13 +48,19 @@ async def scan_outplayed_clips():
 async def process_clips_batch(request: ClipProcessRequest):
     """Process a batch of clips with AI metadata generation"""
     try:
-        monitor = ClipsMonitor()
-        results = await monitor.process_clip_batch(limit=request.limit)
+        monitor = get_clips_monitor()
+        results, stats = await monitor.run_clip_batch(
+            limit=request.limit,
+            concurrency=request.concurrency,
+            item_timeout=request.item_timeout,
+            ordered=request.ordered
+        )
         
         return ClipProcessResponse(
             success=True,
             processed_count=len(results),
-            results=results
+            results=results,
+            stats=stats
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing clips: {str(e)}")
@@ -60,7 +70,7 @@ async def process_clips_batch(request: ClipProcessRequest):
 async def get_clip_stats():
     """Get statistics about available clips"""
     try:
-        monitor = ClipsMonitor()
+        monitor = get_clips_monitor()
         clips = await monitor.scan_existing_clips()
         
         # Group by game
@@ -89,11 +99,11 @@ async def get_clip_stats():
 async def clips_health_check():
     """Check clips monitoring service health"""
     try:
-        monitor = ClipsMonitor()
+        monitor = get_clips_monitor()
         path_exists = monitor.outplayed_path.exists()
         
         if path_exists:
-            # Quick scan to verify accessibility
+            # Incremental index refresh to verify accessibility
             clips = await monitor.scan_existing_clips()
             clips_count = len(clips)
         else:
@@ -104,6 +114,8 @@ async def clips_health_check():
             "outplayed_path": str(monitor.outplayed_path),
             "path_exists": path_exists,
             "clips_available": clips_count,
+            "monitoring": monitor.is_monitoring,
+            "event_queue": monitor.get_event_metrics(),
             "status": "healthy" if path_exists else "path_not_found"
         }
     except Exception as e:
@@ -1,29 +1,95 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 from app.core.database import get_database
+from app.models.database import ProcessingJob as ProcessingJobModel
+from app.models.schemas import APIResponse, JobStatus, PaginatedResponse, ProcessingJob, ProcessingJobCreate
+from app.services.job_queue import JOB_HANDLERS, get_job_queue
+import app.services.job_handlers  # noqa: F401  (registers the handlers)
 
 router = APIRouter()
 
 
-@router.get("/")
-async def get_jobs(db: AsyncSession = Depends(get_database)):
-    """Get all processing jobs"""
-    return {"message": "Processing jobs - Coming soon"}
+@router.get("/", response_model=PaginatedResponse)
+async def get_jobs(
+    page: int = 1,
+    per_page: int = 50,
+    status: Optional[JobStatus] = None,
+    job_type: Optional[str] = None,
+    db: AsyncSession = Depends(get_database)
+):
+    """Get all processing jobs, newest first"""
+    try:
+        query = select(ProcessingJobModel)
+        count_query = select(func.count(ProcessingJobModel.id))
+        if status:
+            query = query.where(ProcessingJobModel.status == status.value)
+            count_query = count_query.where(ProcessingJobModel.status == status.value)
+        if job_type:
+            query = query.where(ProcessingJobModel.job_type == job_type)
+            count_query = count_query.where(ProcessingJobModel.job_type == job_type)
 
+        total = (await db.execute(count_query)).scalar()
+        result = await db.execute(
+            query.order_by(ProcessingJobModel.id.desc()).offset((page - 1) * per_page).limit(per_page)
+        )
 
-@router.get("/{job_id}")
+        return PaginatedResponse(
+            items=[ProcessingJob.model_validate(job) for job in result.scalars().all()],
+            total=total,
+            page=page,
+            per_page=per_page,
+            total_pages=(total + per_page - 1) // per_page
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/", response_model=APIResponse)
+async def create_job(job: ProcessingJobCreate, db: AsyncSession = Depends(get_database)):
+    """Queue a processing job for a clip"""
+    if job.job_type not in JOB_HANDLERS:
+        raise HTTPException(status_code=400, detail=f"Unknown job type, expected one of {sorted(JOB_HANDLERS)}")
+    try:
+        created = await get_job_queue().enqueue(db, job.job_type, clip_id=job.clip_id)
+        return APIResponse(success=True, message="Job queued", data={"job_id": created.id})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/{job_id}", response_model=ProcessingJob)
 async def get_job(job_id: int, db: AsyncSession = Depends(get_database)):
     """Get specific processing job"""
-    return {"message": f"Job {job_id} - Coming soon"}
+    result = await db.execute(select(ProcessingJobModel).where(ProcessingJobModel.id == job_id))
+    job = result.scalar_one_or_none()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
 
 
-@router.post("/{job_id}/cancel")
+@router.post("/{job_id}/cancel", response_model=APIResponse)
 async def cancel_job(job_id: int, db: AsyncSession = Depends(get_database)):
     """Cancel a processing job"""
-    return {"message": f"Cancelling job {job_id} - Coming soon"}
+    if not await get_job_queue().cancel(db, job_id):
+        raise HTTPException(status_code=409, detail="Job not found or already finished")
+    return APIResponse(success=True, message=f"Job {job_id} cancelled")
+
+
+@router.post("/{job_id}/retry", response_model=APIResponse)
+async def retry_job(job_id: int, db: AsyncSession = Depends(get_database)):
+    """Queue a failed or cancelled job again"""
+    if not await get_job_queue().retry(db, job_id):
+        raise HTTPException(status_code=409, detail="Job not found or not failed/cancelled")
+    return APIResponse(success=True, message=f"Job {job_id} queued again")
 
 
-@router.get("/clip/{clip_id}")
+@router.get("/clip/{clip_id}", response_model=List[ProcessingJob])
 async def get_clip_jobs(clip_id: int, db: AsyncSession = Depends(get_database)):
     """Get all jobs for a specific clip"""
-    return {"message": f"Jobs for clip {clip_id} - Coming soon"}
+    result = await db.execute(
+        select(ProcessingJobModel)
+        .where(ProcessingJobModel.clip_id == clip_id)
+        .order_by(ProcessingJobModel.id.desc())
+    )
+    return result.scalars().all()
@@ -1,4 +1,4 @@
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 from pydantic import validator
 from pydantic_settings import BaseSettings
 
@@ -34,12 +34,113 @@ class Settings(BaseSettings):
     # AI Settings
     OLLAMA_BASE_URL: str = "http://localhost:11434"
     OLLAMA_MODEL: str = "deepseek-r1:latest"  # Using your available model
+    # Per-task model preference, best first; later entries are lighter failover models
+    OLLAMA_TASK_MODELS: Dict[str, List[str]] = {
+        "title": ["deepseek-r1:latest", "nidum-gemma", "medgemma:4b"],
+        "hashtags": ["medgemma:4b", "nidum-gemma"],
+        "analysis": ["nidum-gemma", "medgemma:4b"],
+    }
+    OLLAMA_KEEP_ALIVE: str = "30m"  # how long Ollama keeps a model loaded after use
+    OLLAMA_WARMUP_KEEP_ALIVE: int = -1  # same for the warm-up models; negative pins them in memory
+    OLLAMA_WARMUP_ON_STARTUP: bool = True
+    OLLAMA_WARMUP_MODELS: list = []  # defaults to the first model of every task
+    OLLAMA_WARMUP_TIMEOUT: float = 300.0
+    OLLAMA_TASK_LATENCY_SLO: float = 30.0  # p95 seconds before failing over to a lighter model
+    OLLAMA_FAILOVER_COOLDOWN: float = 120.0
     YOLO_MODEL_PATH: str = "yolov8n.pt"
     
+    # Video frame sampling
+    FRAME_SAMPLER_SEEK_THRESHOLD_SECONDS: float = 4.0  # shorter gaps are decoded through instead of seeked
+    FRAME_SAMPLER_MAX_WIDTH: int = 1280  # frames are downscaled to this width right after decode
+    ANALYSIS_SAMPLE_FRAMES: int = 10
+    
+    # YOLO inference
+    YOLO_IMAGE_SIZE: int = 640  # inference resolution (letterboxed square)
+    YOLO_BATCH_SIZE: int = 8
+    YOLO_CONFIDENCE: float = 0.25
+    YOLO_DEVICE: str = "cpu"
+    
+    # Highlight detection
+    HIGHLIGHT_SAMPLE_FPS: float = 2.0  # timeline resolution
+    HIGHLIGHT_ANALYSIS_WIDTH: int = 320
+    HIGHLIGHT_OBJECT_STRIDE: int = 4  # run YOLO on every Nth timeline sample
+    HIGHLIGHT_SIGNAL_WEIGHTS: Dict[str, float] = {"motion": 0.45, "audio": 0.35, "objects": 0.2}
+    HIGHLIGHT_MIN_SCORE: float = 0.35
+    HIGHLIGHT_MIN_GAP: float = 8.0  # seconds between two picked moments
+    HIGHLIGHT_MAX_MOMENTS: int = 5
+    HIGHLIGHT_CLIP_LENGTH: float = 15.0  # seconds per recommended clip
+    HIGHLIGHT_AUDIO_TIMEOUT: float = 120.0
+    
+    # Thumbnails
+    THUMBNAIL_SIZES: Dict[str, int] = {"large": 1280, "medium": 640, "small": 320}  # max width per size
+    THUMBNAIL_FORMATS: List[str] = ["jpg", "webp"]
+    THUMBNAIL_CANDIDATES_PER_MOMENT: int = 5
+    THUMBNAIL_MAX_MOMENTS: int = 3
+    
+    # Video analysis worker processes
+    ANALYSIS_WORKERS: int = 0  # 0 = half the CPU cores
+    ANALYSIS_WORKER_MAX_JOBS: int = 50  # recycle a worker after this many jobs
+    ANALYSIS_WORKER_THREADS: int = 2  # torch/OpenCV threads per worker
+    ANALYSIS_SHARED_FRAMES: bool = False  # decode in a child process per job into a shared-memory ring; the spawn only pays off for large samples
+    ANALYSIS_RING_SLOTS: int = 16
+    
+    # Processing job queue (ProcessingJob rows, run by `python -m app.worker`)
+    JOB_WORKER_CONCURRENCY: int = 2
+    JOB_WORKER_IN_API: bool = False  # also run a worker inside the API process (single-process setups)
+    JOB_LEASE_SECONDS: float = 120.0  # a job is reclaimed if its worker misses heartbeats this long
+    JOB_HEARTBEAT_INTERVAL: float = 20.0
+    JOB_POLL_INTERVAL: float = 1.0  # idle wait between claims
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_RETRY_BACKOFF_BASE: float = 10.0  # seconds, doubled per attempt
+    JOB_RETRY_BACKOFF_MAX: float = 600.0
+    
+    # Ollama HTTP client pool
+    OLLAMA_TIMEOUT: float = 60.0
+    OLLAMA_CONNECT_TIMEOUT: float = 5.0
+    OLLAMA_MAX_CONNECTIONS: int = 20
+    OLLAMA_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    OLLAMA_KEEPALIVE_EXPIRY: float = 60.0  # seconds an idle connection is kept open
+    OLLAMA_HTTP2: bool = False  # requires the h2 package and an HTTP/2 capable endpoint
+    
+    # Ollama admission control (adaptive concurrency limit + priority queue)
+    OLLAMA_CONCURRENCY_INITIAL: int = 2
+    OLLAMA_CONCURRENCY_MIN: int = 1
+    OLLAMA_CONCURRENCY_MAX: int = 8
+    OLLAMA_LATENCY_SLO: float = 45.0  # seconds; slower generations shrink the limit
+    OLLAMA_QUEUE_MAX_INTERACTIVE: int = 16
+    OLLAMA_QUEUE_MAX_BACKGROUND: int = 1000
+    OLLAMA_QUEUE_TIMEOUT_INTERACTIVE: float = 30.0  # shed with 429 after waiting this long
+    
+    # LLM response cache
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_MAX_ENTRIES: int = 1024
+    LLM_CACHE_TTL_SECONDS: float = 7 * 24 * 3600
+    LLM_CACHE_BACKEND: str = "memory"  # memory, sqlite or redis (uses REDIS_URL)
+    LLM_CACHE_SQLITE_PATH: Optional[str] = None  # defaults to OUTPUT_DIRECTORY/cache/llm_cache.sqlite3
+    
     # File Processing
     WATCH_DIRECTORIES: list = []
     OUTPUT_DIRECTORY: str = "output"
     MAX_FILE_SIZE_MB: int = 500
+    UPLOAD_FLUSH_BYTES: int = 4 * 1024 * 1024  # request chunks are coalesced into writes of this size
+    CLIP_INDEX_DIRECTORY: Optional[str] = None  # defaults to OUTPUT_DIRECTORY/index
+    CLIP_BATCH_CONCURRENCY: int = 4
+    CLIP_BATCH_MAX_IN_FLIGHT: int = 16
+    CLIP_BATCH_ITEM_TIMEOUT: float = 180.0  # seconds per clip
+    CLIP_EVENT_WORKERS: int = 2
+    CLIP_EVENT_QUEUE_SIZE: int = 256
+    CLIP_EVENT_ENQUEUE_TIMEOUT: float = 5.0  # seconds the observer waits for a free slot
+    CLIP_SETTLE_QUIET_PERIOD: float = 2.0  # seconds without size change before a clip is processed
+    CLIP_SETTLE_MAX_WAIT: float = 300.0  # process anyway if still changing after this long
+    CLIP_SETTLE_POLL_INTERVAL: float = 0.5
+    CLIP_DEDUP_ENABLED: bool = True
+    CLIP_DEDUP_FRAMES: int = 5  # frames hashed per clip
+    CLIP_DEDUP_MAX_DISTANCE: int = 10  # mean Hamming bits per frame (of 64) to count as a duplicate
+    CLIP_DEDUP_DURATION_TOLERANCE: float = 2.0  # seconds
+    CLIP_STORE_ENABLED: bool = True
+    CLIP_STORE_DIRECTORY: Optional[str] = None  # defaults to OUTPUT_DIRECTORY/store, keep on the watch folders' filesystem
+    CLIP_STORE_LINK_MODE: str = "link"  # link (reflink, hardlink, then copy) or copy
+    CLIP_COUNT_ESTIMATE_THRESHOLD: int = 100_000  # above this many rows, estimated totals come from planner stats
     
     # Platform API Keys (stored as environment variables)
     YOUTUBE_CLIENT_ID: Optional[str] = None
@@ -0,0 +1,58 @@
+import logging
+from typing import Optional
+import httpx
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Application-scoped client shared by every Ollama consumer
+_ollama_client: Optional[httpx.AsyncClient] = None
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def create_ollama_client() -> httpx.AsyncClient:
+    """Create a connection-pooled client configured from settings"""
+    http2 = settings.OLLAMA_HTTP2 and _http2_available()
+    if settings.OLLAMA_HTTP2 and not http2:
+        logger.warning("OLLAMA_HTTP2 is enabled but the h2 package is missing, using HTTP/1.1")
+
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(settings.OLLAMA_TIMEOUT, connect=settings.OLLAMA_CONNECT_TIMEOUT),
+        limits=httpx.Limits(
+            max_connections=settings.OLLAMA_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.OLLAMA_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.OLLAMA_KEEPALIVE_EXPIRY,
+        ),
+        http2=http2,
+    )
+
+
+async def init_ollama_client() -> httpx.AsyncClient:
+    """Create the shared client, called from the FastAPI lifespan"""
+    global _ollama_client
+    if _ollama_client is None or _ollama_client.is_closed:
+        _ollama_client = create_ollama_client()
+    return _ollama_client
+
+
+async def close_ollama_client() -> None:
+    """Close the shared client on shutdown"""
+    global _ollama_client
+    if _ollama_client is not None:
+        await _ollama_client.aclose()
+        _ollama_client = None
+
+
+def get_ollama_client() -> httpx.AsyncClient:
+    """Return the shared client, creating it lazily outside the app lifespan (scripts, workers)"""
+    global _ollama_client
+    if _ollama_client is None or _ollama_client.is_closed:
+        _ollama_client = create_ollama_client()
+    return _ollama_client
@@ -2,8 +2,12 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from contextlib import asynccontextmanager
+import asyncio
 import logging
 from app.core.config import settings
+from app.core.http_client import init_ollama_client, close_ollama_client
+from app.services.analysis_pool import shutdown_analysis_pool
+from app.services.model_router import get_model_router
 from app.api.v1.endpoints import ai
 # from app.api.v1.router import api_router
 
@@ -17,8 +21,29 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     """Application lifespan events"""
     logger.info("Starting ClipConductor AI Backend")
+    client = await init_ollama_client()
+    warmup_task = None
+    if settings.OLLAMA_WARMUP_ON_STARTUP:
+        # Load and pin the routed models without delaying startup
+        warmup_task = asyncio.create_task(get_model_router().warm_up(client))
+    worker_stop = asyncio.Event()
+    worker_task = None
+    if settings.JOB_WORKER_IN_API:
+        from app.services.job_queue import JobWorker
+        import app.services.job_handlers  # noqa: F401
+        worker_task = asyncio.create_task(JobWorker().run(worker_stop))
+    else:
+        logger.warning("Clip processing jobs run in a separate worker: start `python -m app.worker` "
+                       "(or set JOB_WORKER_IN_API=true), otherwise clips stay in processing")
     yield
     logger.info("Shutting down ClipConductor AI Backend")
+    if warmup_task and not warmup_task.done():
+        warmup_task.cancel()
+    if worker_task:
+        worker_stop.set()
+        await worker_task
+    await asyncio.to_thread(shutdown_analysis_pool)
+    await close_ollama_client()
 
 
 # Create FastAPI application
@@ -58,6 +83,19 @@ try:
 except ImportError as e:
     logger.warning(f"Clips monitoring disabled: {e}")
 
+# Clip CRUD, listing, search, uploads and thumbnails; after clips_new so /scan, /stats and /health
+# resolve before /{clip_id}
+from app.api.v1.endpoints import clips
+app.include_router(clips.router, prefix=f"{settings.API_V1_STR}/clips", tags=["Clips"])
+
+# Add Processing job endpoints
+try:
+    from app.api.v1.endpoints import jobs
+    app.include_router(jobs.router, prefix=f"{settings.API_V1_STR}/jobs", tags=["Jobs"])
+    logger.info("Job endpoints enabled")
+except ImportError as e:
+    logger.warning(f"Job endpoints disabled: {e}")
+
 # Add Notification endpoints
 try:
     from app.api.v1.endpoints import notifications
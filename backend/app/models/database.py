@@ -1,4 +1,6 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, JSON, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, JSON, ForeignKey, Index, text
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -7,6 +9,16 @@ from datetime import datetime
 
 Base = declarative_base()
 
+# JSONB on PostgreSQL so documents can be GIN-indexed and queried with @>, plain JSON elsewhere
+JSONDocument = JSON().with_variant(JSONB(), "postgresql")
+
+# SQLite stores timestamps as text and its CURRENT_TIMESTAMP default has no fraction: write and bind
+# (keyset cursors) in that same format so values compare correctly
+SortableTimestamp = DateTime(timezone=True).with_variant(
+    sqlite.DATETIME(storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d"),
+    "sqlite"
+)
+
 
 class User(Base):
     __tablename__ = "users"
@@ -36,11 +48,12 @@ class Clip(Base):
     thumbnail_path = Column(String)
     duration = Column(Integer)  # in seconds
     file_size = Column(Integer)  # in bytes
+    content_hash = Column(String(64), index=True)  # blake2b-256 of the file
     status = Column(String, default="processing")  # processing, ready, published, error
-    game_detected = Column(String)
-    highlights_detected = Column(JSON)
-    ai_metadata = Column(JSON)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    game_detected = Column(String, index=True)
+    highlights_detected = Column(JSONDocument)
+    ai_metadata = Column(JSONDocument)
+    created_at = Column(SortableTimestamp, server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     # Foreign Keys
@@ -50,6 +63,23 @@ class Clip(Base):
     owner = relationship("User", back_populates="clips")
     publications = relationship("Publication", back_populates="clip")
     processing_jobs = relationship("ProcessingJob", back_populates="clip")
+    
+    # Keyset listing: newest first, optionally filtered by status or owner
+    __table_args__ = (
+        Index("ix_clips_created_at_id", "created_at", "id"),
+        Index("ix_clips_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_clips_owner_id_created_at_id", "owner_id", "created_at", "id"),
+        # Containment (@>) lookups into the JSON documents, PostgreSQL only
+        Index("ix_clips_ai_metadata_gin", "ai_metadata", postgresql_using="gin",
+              postgresql_ops={"ai_metadata": "jsonb_path_ops"}).ddl_if(dialect="postgresql"),
+        Index("ix_clips_highlights_detected_gin", "highlights_detected", postgresql_using="gin",
+              postgresql_ops={"highlights_detected": "jsonb_path_ops"}).ddl_if(dialect="postgresql"),
+        # Highlight score filter: the expressions ClipSearch.highlight_score() compiles to
+        Index("ix_clips_highlight_score",
+              text("((highlights_detected ->> 'highlight_score')::float)")).ddl_if(dialect="postgresql"),
+        Index("ix_clips_highlight_score",
+              text("json_extract(highlights_detected, '$.highlight_score')")).ddl_if(dialect="sqlite"),
+    )
 
 
 class PlatformCredential(Base):
@@ -91,6 +121,10 @@ class Publication(Base):
     
     # Relationships
     clip = relationship("Clip", back_populates="publications")
+    
+    __table_args__ = (
+        Index("ix_publications_clip_id_platform", "clip_id", "platform"),
+    )
 
 
 class ProcessingJob(Base):
@@ -98,10 +132,16 @@ class ProcessingJob(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     job_type = Column(String, nullable=False)  # highlight_detection, metadata_generation, thumbnail_creation
-    status = Column(String, default="pending")  # pending, processing, completed, failed
+    status = Column(String, default="pending")  # pending, processing, completed, failed, cancelled
     progress = Column(Integer, default=0)  # 0-100
     result_data = Column(JSON)
     error_message = Column(Text)
+    attempts = Column(Integer, default=0)
+    max_attempts = Column(Integer, default=3)
+    run_after = Column(DateTime(timezone=True))  # not claimable before this (retry backoff)
+    locked_by = Column(String)  # worker holding the lease
+    lease_expires_at = Column(DateTime(timezone=True))  # reclaimed by another worker after this
+    heartbeat_at = Column(DateTime(timezone=True))
     started_at = Column(DateTime(timezone=True))
     completed_at = Column(DateTime(timezone=True))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -112,6 +152,17 @@ class ProcessingJob(Base):
     
     # Relationships
     clip = relationship("Clip", back_populates="processing_jobs")
+    
+    __table_args__ = (
+        Index("ix_processing_jobs_clip_id_status", "clip_id", "status"),
+        # Partial indexes for JobQueue.claim: the queue head and expired leases,
+        # small no matter how many finished jobs the table keeps. The leading
+        # status lets SQLite use them inside the claim query's OR as well
+        Index("ix_processing_jobs_pending", "status", "id",
+              postgresql_where=text("status = 'pending'"), sqlite_where=text("status = 'pending'")),
+        Index("ix_processing_jobs_leases", "status", "lease_expires_at",
+              postgresql_where=text("status = 'processing'"), sqlite_where=text("status = 'processing'")),
+    )
 
 
 class SystemConfig(Base):
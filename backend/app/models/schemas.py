@@ -16,6 +16,7 @@ class JobStatus(str, Enum):
     PROCESSING = "processing"
     COMPLETED = "completed"
     FAILED = "failed"
+    CANCELLED = "cancelled"
 
 
 class PublicationStatus(str, Enum):
@@ -77,6 +78,7 @@ class Clip(ClipBase):
     thumbnail_path: Optional[str] = None
     duration: Optional[int] = None
     file_size: Optional[int] = None
+    content_hash: Optional[str] = None
     status: ClipStatus
     game_detected: Optional[str] = None
     highlights_detected: Optional[Dict[str, Any]] = None
@@ -105,6 +107,11 @@ class ProcessingJob(ProcessingJobBase):
     progress: int
     result_data: Optional[Dict[str, Any]] = None
     error_message: Optional[str] = None
+    attempts: int = 0
+    max_attempts: int = 3
+    run_after: Optional[datetime] = None
+    locked_by: Optional[str] = None
+    heartbeat_at: Optional[datetime] = None
     started_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
     created_at: datetime
@@ -180,6 +187,25 @@ class PaginatedResponse(BaseModel):
     total_pages: int
 
 
+class CursorPaginatedResponse(BaseModel):
+    items: List[Any]
+    next_cursor: Optional[str] = None  # pass as ?cursor= for the next page, None on the last page
+    limit: int
+    total: Optional[int] = None
+    total_is_estimate: bool = False
+
+
+class FacetCount(BaseModel):
+    value: str
+    count: int
+    min: Optional[float] = None  # highlight_score buckets: lower bound (inclusive)
+    max: Optional[float] = None  # highlight_score buckets: upper bound (exclusive)
+
+
+class ClipSearchResponse(CursorPaginatedResponse):
+    facets: Dict[str, List[FacetCount]] = {}
+
+
 # AI Generation Request Schemas
 class AIMetadataRequest(BaseModel):
     clip_id: int
@@ -0,0 +1,219 @@
+"""
+ClipConductor AI - Admission Control
+Adaptive concurrency limit and priority queue in front of Ollama
+"""
+
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import Any, Dict, List, Optional
+from app.core.config import settings
+from app.services.batch_processor import percentile
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0  # dashboard /ai/* calls
+    BACKGROUND = 1  # clip batch and monitor processing
+
+
+class OverloadedError(Exception):
+    """Raised when a request is shed instead of queued"""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class AdaptiveLimiter:
+    """
+    Client-side concurrency limit for a backend that queues invisibly.
+
+    The limit follows a gradient/AIMD rule: every completion whose latency
+    stays within ``tolerance`` times the best recently observed latency (and
+    under the hard ``latency_slo``) grows the limit by ``1/limit``; a slow
+    completion, timeout or error multiplies it by ``backoff``. Waiting
+    requests are served strictly by priority, FIFO within a class. Requests
+    are shed with ``OverloadedError`` when their class queue is full or they
+    waited longer than the class queue timeout.
+    """
+
+    def __init__(self,
+                 initial_limit: int = 2,
+                 min_limit: int = 1,
+                 max_limit: int = 8,
+                 latency_slo: float = 45.0,
+                 tolerance: float = 2.0,
+                 backoff: float = 0.7,
+                 max_queue: Optional[Dict[Priority, int]] = None,
+                 queue_timeout: Optional[Dict[Priority, Optional[float]]] = None):
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_slo = latency_slo
+        self.tolerance = tolerance
+        self.backoff = backoff
+        self.max_queue = max_queue or {Priority.INTERACTIVE: 16, Priority.BACKGROUND: 1000}
+        self.queue_timeout = queue_timeout or {Priority.INTERACTIVE: 30.0, Priority.BACKGROUND: None}
+        self.in_flight = 0
+        self._waiters: List = []
+        self._queued = {p: 0 for p in Priority}
+        self._seq = itertools.count()
+        self._min_latency: Optional[float] = None
+        self._avg_latency = 0.0
+        self._queue_times: Dict[Priority, List[float]] = {p: [] for p in Priority}
+        self.admitted = {p: 0 for p in Priority}
+        self.shed = {p: 0 for p in Priority}
+
+    def _capacity(self) -> int:
+        return max(self.min_limit, int(self.limit))
+
+    def _retry_after(self, priority: Priority) -> float:
+        ahead = sum(n for p, n in self._queued.items() if p <= priority) + 1
+        per_request = self._avg_latency or 5.0
+        return max(1.0, math.ceil(ahead / self._capacity() * per_request))
+
+    def check(self, priority: Priority) -> None:
+        """Raise OverloadedError now if a request of this class would be shed"""
+        if self.in_flight >= self._capacity() and self._queued[priority] >= self.max_queue[priority]:
+            self.shed[priority] += 1
+            raise OverloadedError(
+                f"Ollama is saturated ({self._queued[priority]} {priority.name.lower()} requests queued)",
+                self._retry_after(priority)
+            )
+
+    async def acquire(self, priority: Priority) -> float:
+        """Wait for a slot, returns the time spent queued"""
+        start = time.monotonic()
+        if self.in_flight < self._capacity() and not self._waiters:
+            self.in_flight += 1
+            self._record_admission(priority, 0.0)
+            return 0.0
+
+        self.check(priority)
+        future = asyncio.get_running_loop().create_future()
+        entry = [int(priority), next(self._seq), future]
+        heapq.heappush(self._waiters, entry)
+        self._queued[priority] += 1
+        self._wake()
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout=self.queue_timeout.get(priority))
+        except asyncio.TimeoutError:
+            self._abandon(entry, future)
+            self.shed[priority] += 1
+            raise OverloadedError(
+                f"Timed out after {self.queue_timeout[priority]}s waiting for Ollama",
+                self._retry_after(priority)
+            )
+        except asyncio.CancelledError:
+            self._abandon(entry, future)
+            raise
+        finally:
+            self._queued[priority] -= 1
+
+        waited = time.monotonic() - start
+        self._record_admission(priority, waited)
+        return waited
+
+    def _abandon(self, entry, future: asyncio.Future) -> None:
+        if future.done() and not future.cancelled():
+            # Slot was handed to us just as we gave up, pass it on
+            self.release(None, ok=True)
+        else:
+            future.cancel()
+            entry[2] = None
+
+    def _record_admission(self, priority: Priority, waited: float) -> None:
+        self.admitted[priority] += 1
+        samples = self._queue_times[priority]
+        samples.append(waited)
+        if len(samples) > 512:
+            del samples[:256]
+
+    def release(self, latency: Optional[float], ok: bool = True) -> None:
+        """Free a slot and adapt the limit from the observed latency"""
+        if latency is not None:
+            self._adapt(latency, ok)
+        self.in_flight -= 1
+        self._wake()
+
+    def _adapt(self, latency: float, ok: bool) -> None:
+        self._avg_latency = latency if not self._avg_latency else 0.8 * self._avg_latency + 0.2 * latency
+        if ok:
+            # Slowly forget the best latency so the baseline tracks model/load changes
+            if self._min_latency is None or latency < self._min_latency:
+                self._min_latency = latency
+            else:
+                self._min_latency *= 1.01
+
+        congested = (not ok or latency > self.latency_slo
+                     or (self._min_latency is not None and latency > self._min_latency * self.tolerance))
+        if congested:
+            self.limit = max(float(self.min_limit), self.limit * self.backoff)
+        else:
+            self.limit = min(float(self.max_limit), self.limit + 1.0 / max(self.limit, 1.0))
+
+    def _wake(self) -> None:
+        while self._waiters and self.in_flight < self._capacity():
+            _, _, future = heapq.heappop(self._waiters)
+            if future is None or future.done():
+                continue
+            self.in_flight += 1
+            future.set_result(True)
+
+    @asynccontextmanager
+    async def slot(self, priority: Priority):
+        """Hold a slot for one backend call, feeding its latency back into the limit"""
+        await self.acquire(priority)
+        start = time.monotonic()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            self.release(time.monotonic() - start, ok=ok)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "min_latency_seconds": round(self._min_latency or 0.0, 3),
+            "avg_latency_seconds": round(self._avg_latency, 3),
+            "classes": {
+                p.name.lower(): {
+                    "queued": self._queued[p],
+                    "admitted": self.admitted[p],
+                    "shed": self.shed[p],
+                    "queue_time_p50_seconds": round(percentile(self._queue_times[p], 50), 3),
+                    "queue_time_p95_seconds": round(percentile(self._queue_times[p], 95), 3),
+                }
+                for p in Priority
+            },
+        }
+
+
+_ollama_limiter: Optional[AdaptiveLimiter] = None
+
+
+def get_ollama_limiter() -> AdaptiveLimiter:
+    """Return the process-wide limiter shared by all Ollama calls"""
+    global _ollama_limiter
+    if _ollama_limiter is None:
+        _ollama_limiter = AdaptiveLimiter(
+            initial_limit=settings.OLLAMA_CONCURRENCY_INITIAL,
+            min_limit=settings.OLLAMA_CONCURRENCY_MIN,
+            max_limit=settings.OLLAMA_CONCURRENCY_MAX,
+            latency_slo=settings.OLLAMA_LATENCY_SLO,
+            max_queue={
+                Priority.INTERACTIVE: settings.OLLAMA_QUEUE_MAX_INTERACTIVE,
+                Priority.BACKGROUND: settings.OLLAMA_QUEUE_MAX_BACKGROUND,
+            },
+            queue_timeout={
+                Priority.INTERACTIVE: settings.OLLAMA_QUEUE_TIMEOUT_INTERACTIVE,
+                Priority.BACKGROUND: None,
+            },
+        )
+    return _ollama_limiter
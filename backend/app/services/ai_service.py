@@ -1,11 +1,13 @@
 import asyncio
-import cv2
 import numpy as np
 from typing import Dict, List, Optional, Any
-import httpx
 import json
-from ultralytics import YOLO
 from app.core.config import settings
+from app.core.http_client import get_ollama_client
+from app.services.admission import Priority, get_ollama_limiter
+from app.services.analysis_pool import get_analysis_pool
+from app.services.highlight_detector import detect_clip_highlights
+from app.services.thumbnail_engine import generate_clip_thumbnail
 from app.models.database import Clip as ClipModel, ProcessingJob as ProcessingJobModel
 from app.models.schemas import JobStatus
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -14,44 +16,13 @@ from sqlalchemy import select, update
 
 class AIService:
     def __init__(self):
-        self.ollama_client = httpx.AsyncClient(base_url=settings.OLLAMA_BASE_URL)
-        self.yolo_model = None
+        self.ollama_client = get_ollama_client()
+        self.analysis_pool = get_analysis_pool()
     
-    def load_yolo_model(self):
-        """Load YOLO model for object detection"""
-        if not self.yolo_model:
-            self.yolo_model = YOLO(settings.YOLO_MODEL_PATH)
-        return self.yolo_model
-    
-    async def detect_highlights(self, clip_id: int) -> Dict[str, Any]:
-        """Detect highlights in a video using YOLO and OpenCV"""
-        try:
-            # Load YOLO model
-            model = self.load_yolo_model()
-            
-            # Get clip file path from database
-            # TODO: Add database session to get file path
-            
-            # Mock implementation for now
-            highlights = {
-                "kill_moments": [
-                    {"timestamp": 45.2, "confidence": 0.85},
-                    {"timestamp": 123.7, "confidence": 0.92}
-                ],
-                "action_scenes": [
-                    {"timestamp": 67.3, "confidence": 0.78},
-                    {"timestamp": 189.1, "confidence": 0.81}
-                ],
-                "weapon_pickups": [
-                    {"timestamp": 12.5, "confidence": 0.73}
-                ]
-            }
-            
-            return highlights
-            
-        except Exception as e:
-            print(f"Error detecting highlights: {e}")
-            return {}
+    async def detect_highlights(self, clip_id: int, db: AsyncSession = None,
+                                video_path: Optional[str] = None) -> Dict[str, Any]:
+        """Detect highlights in a video from motion, audio and YOLO object density"""
+        return await detect_clip_highlights(clip_id, db, video_path)
     
     async def generate_metadata(self, clip_id: int, game_title: Optional[str] = None) -> Dict[str, Any]:
         """Generate AI metadata using Ollama LLM"""
@@ -70,12 +41,13 @@ class AIService:
             """
             
             # Call Ollama API
-            response = await self.ollama_client.post("/api/generate", json={
-                "model": settings.OLLAMA_MODEL,
-                "prompt": prompt,
-                "stream": False,
-                "format": "json"
-            })
+            async with get_ollama_limiter().slot(Priority.BACKGROUND):
+                response = await self.ollama_client.post(f"{settings.OLLAMA_BASE_URL}/api/generate", json={
+                    "model": settings.OLLAMA_MODEL,
+                    "prompt": prompt,
+                    "stream": False,
+                    "format": "json"
+                })
             
             if response.status_code == 200:
                 result = response.json()
@@ -110,72 +82,17 @@ class AIService:
                 "platform_optimizations": {}
             }
     
-    async def generate_thumbnail(self, clip_id: int) -> Optional[str]:
-        """Generate thumbnail from video using OpenCV"""
-        try:
-            # Get clip file path
-            # TODO: Get from database
-            
-            # Mock thumbnail generation
-            thumbnail_path = f"thumbnails/clip_{clip_id}_thumb.jpg"
-            
-            # In real implementation:
-            # 1. Extract frame from video at highlight timestamp
-            # 2. Apply AI enhancements (text overlay, effects)
-            # 3. Save as thumbnail
-            
-            return thumbnail_path
-            
-        except Exception as e:
-            print(f"Error generating thumbnail: {e}")
-            return None
+    async def generate_thumbnail(self, clip_id: int, db: AsyncSession = None,
+                                 video_path: Optional[str] = None) -> Optional[str]:
+        """Generate thumbnails from the best frame near the clip's highlights"""
+        thumbnails = await generate_clip_thumbnail(clip_id, db, video_path)
+        return thumbnails["primary"] if thumbnails else None
     
     async def analyze_game_content(self, video_path: str) -> Dict[str, Any]:
         """Analyze video content to detect game type and events"""
         try:
-            cap = cv2.VideoCapture(video_path)
-            
-            if not cap.isOpened():
-                raise Exception("Could not open video file")
-            
-            # Get video properties
-            fps = cap.get(cv2.CAP_PROP_FPS)
-            frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-            duration = frame_count / fps
-            
-            # Sample frames for analysis
-            sample_frames = []
-            sample_interval = max(1, int(frame_count / 10))  # Sample 10 frames
-            
-            for i in range(0, frame_count, sample_interval):
-                cap.set(cv2.CAP_PROP_POS_FRAMES, i)
-                ret, frame = cap.read()
-                if ret:
-                    sample_frames.append(frame)
-            
-            cap.release()
-            
-            # Analyze frames with YOLO
-            model = self.load_yolo_model()
-            detections = []
-            
-            for frame in sample_frames:
-                results = model(frame)
-                # Process YOLO results
-                for r in results:
-                    if r.boxes is not None:
-                        detections.extend(r.boxes.cls.tolist())
-            
-            # Determine game type and events based on detections
-            analysis = {
-                "duration": duration,
-                "fps": fps,
-                "detected_objects": detections,
-                "game_type": "unknown",  # Could be enhanced with game-specific detection
-                "action_density": len(detections) / len(sample_frames) if sample_frames else 0
-            }
-            
-            return analysis
+            # Frame sampling and batched YOLO run in an analysis worker process
+            return await self.analysis_pool.analyze_content(video_path)
             
         except Exception as e:
             print(f"Error analyzing game content: {e}")
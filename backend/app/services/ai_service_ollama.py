@@ -1,8 +1,20 @@
 import asyncio
+import copy
+import time
 import httpx
 import json
-from typing import Dict, List, Optional, Any
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Any
 from app.core.config import settings
+from app.core.http_client import get_ollama_client
+from app.services.admission import OverloadedError, Priority, get_ollama_limiter
+from app.services.highlight_detector import detect_clip_highlights
+from app.services.model_router import ModelRouter, get_model_router
+from app.services.llm_cache import LLMCache, get_llm_cache, make_cache_key
+from app.services.single_flight import SingleFlight
+from app.services.thumbnail_engine import generate_clip_thumbnail
+from app.services.video_probe import duration_seconds, get_video_probe
+from app.utils.hashtags import normalize_metadata_hashtags
+from app.utils.json_stream import JSONFieldStream
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, update
 from app.models.database import Clip as ClipModel, ProcessingJob as ProcessingJobModel
@@ -11,18 +23,42 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Identical generations in flight anywhere in the process share one Ollama call
+generation_flights = SingleFlight()
+
+
+class OllamaStreamError(Exception):
+    """A streamed generation failed or ended without a done chunk"""
+
 
 class OllamaService:
-    def __init__(self):
+    def __init__(self,
+                 client: Optional[httpx.AsyncClient] = None,
+                 cache: Optional[LLMCache] = None,
+                 priority: Priority = Priority.INTERACTIVE,
+                 router: Optional[ModelRouter] = None):
         self.base_url = settings.OLLAMA_BASE_URL
-        self.client = httpx.AsyncClient(timeout=60.0)
-        self.default_model = "deepseek-r1:latest"  # Using your available model
+        # Shared, pooled client from the app lifespan; never closed per request
+        self.client = client or get_ollama_client()
+        self.cache = cache or (get_llm_cache() if settings.LLM_CACHE_ENABLED else None)
+        self.flights = generation_flights
+        # Admission control: interactive calls are queued ahead of background work
+        self.limiter = get_ollama_limiter()
+        self.priority = priority
+        self.router = router or get_model_router()
+        self.default_model = settings.OLLAMA_MODEL
+        self.default_options = {
+            "temperature": 0.7,
+            "top_p": 0.9,
+            "max_tokens": 500
+        }
     
     async def __aenter__(self):
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        await self.client.aclose()
+        # The pooled client outlives this service, connections stay alive
+        pass
     
     async def list_models(self) -> List[Dict[str, Any]]:
         """Get list of available models"""
@@ -36,50 +72,152 @@ class OllamaService:
             logger.error(f"Error listing models: {e}")
             return []
     
-    async def generate_text(self, prompt: str, model: Optional[str] = None) -> str:
-        """Generate text using Ollama"""
+    def select_model(self, task: str) -> str:
+        """Model for a task, honouring latency-based failover"""
+        return self.router.select(task)
+    
+    async def generate_text(self, prompt: str, model: Optional[str] = None, use_cache: bool = True,
+                            task: str = "text") -> str:
+        """Generate text using Ollama, served from the response cache when possible"""
+        model_name = model or self.select_model(task)
+        
+        cache_key = None
+        if self.cache is not None:
+            if use_cache:
+                cache_key = make_cache_key("generate", prompt, model_name, self.default_options)
+                cached = await self.cache.get(cache_key)
+                if cached is not None:
+                    return cached
+            else:
+                self.cache.record_bypass()
+        
+        response = await self._generate(prompt, model_name)
+        
+        # Empty responses are errors, never cache them
+        if cache_key and response:
+            await self.cache.set(cache_key, response)
+        return response
+    
+    async def _generate(self, prompt: str, model_name: str) -> str:
+        """Run one generation, joining an identical one already in flight"""
+        key = make_cache_key("generate", prompt, model_name, self.default_options)
+        return await self.flights.do(key, lambda: self._post_generate(prompt, model_name))
+    
+    async def _post_generate(self, prompt: str, model_name: str) -> str:
+        payload = {
+            "model": model_name,
+            "prompt": prompt,
+            "stream": False,
+            "options": self.default_options,
+            "keep_alive": self.router.keep_alive(model_name)
+        }
+        
+        start = time.monotonic()
         try:
-            model_name = model or self.default_model
-            
-            payload = {
-                "model": model_name,
-                "prompt": prompt,
-                "stream": False,
-                "options": {
-                    "temperature": 0.7,
-                    "top_p": 0.9,
-                    "max_tokens": 500
-                }
-            }
-            
-            response = await self.client.post(
-                f"{self.base_url}/api/generate",
-                json=payload,
-                timeout=60.0
-            )
+            # Transport errors propagate through the slot so the limiter backs off
+            async with self.limiter.slot(self.priority):
+                response = await self.client.post(
+                    f"{self.base_url}/api/generate",
+                    json=payload
+                )
             
+            self.router.record(model_name, time.monotonic() - start, ok=response.status_code == 200)
             if response.status_code == 200:
                 result = response.json()
                 return result.get("response", "").strip()
             else:
                 logger.error(f"Ollama API error: {response.status_code} - {response.text}")
                 return ""
-                
+        
+        except OverloadedError:
+            raise
         except Exception as e:
+            self.router.record(model_name, time.monotonic() - start, ok=False)
             logger.error(f"Error generating text: {e}")
             return ""
+    
+    async def stream_text(self, prompt: str, model: Optional[str] = None,
+                          use_cache: bool = True, task: str = "text") -> AsyncIterator[str]:
+        """Yield response tokens as Ollama produces them (NDJSON stream)"""
+        model_name = model or self.select_model(task)
+        
+        cache_key = None
+        if self.cache is not None:
+            if use_cache:
+                cache_key = make_cache_key("generate", prompt, model_name, self.default_options)
+                cached = await self.cache.get(cache_key)
+                if cached is not None:
+                    yield cached
+                    return
+            else:
+                self.cache.record_bypass()
+        
+        parts = []
+        async for token in self._stream(prompt, model_name):
+            parts.append(token)
+            yield token
+        
+        # _stream raises unless Ollama sent done, so only complete responses are cached
+        response = "".join(parts).strip()
+        if cache_key and response:
+            await self.cache.set(cache_key, response)
+    
+    async def _stream(self, prompt: str, model_name: str) -> AsyncIterator[str]:
+        """Yield tokens until the done chunk, raises OllamaStreamError if the stream fails first"""
+        payload = {
+            "model": model_name,
+            "prompt": prompt,
+            "stream": True,
+            "options": self.default_options,
+            "keep_alive": self.router.keep_alive(model_name)
+        }
+        
+        start = time.monotonic()
+        error = None
+        try:
+            async with self.limiter.slot(self.priority):
+                async with self.client.stream("POST", f"{self.base_url}/api/generate", json=payload) as response:
+                    if response.status_code != 200:
+                        body = await response.aread()
+                        error = f"Ollama API error: {response.status_code} - {body[:200]!r}"
+                    else:
+                        async for line in response.aiter_lines():
+                            if not line:
+                                continue
+                            chunk = json.loads(line)
+                            if chunk.get("error"):
+                                error = f"Ollama stream error: {chunk['error']}"
+                                break
+                            token = chunk.get("response", "")
+                            if token:
+                                yield token
+                            if chunk.get("done"):
+                                self.router.record(model_name, time.monotonic() - start)
+                                return
+                        else:
+                            error = "Ollama stream ended before the response was done"
+        except OverloadedError:
+            raise
+        except Exception as e:
+            self.router.record(model_name, time.monotonic() - start, ok=False)
+            logger.error(f"Error streaming text: {e}")
+            raise OllamaStreamError(str(e)) from e
+        
+        # API and model errors are raised outside the slot, as in _post_generate they are not overload
+        self.router.record(model_name, time.monotonic() - start, ok=False)
+        logger.error(error)
+        raise OllamaStreamError(error)
 
 
 class AIMetadataService:
-    def __init__(self):
-        self.ollama = OllamaService()
+    def __init__(self, ollama: Optional[OllamaService] = None):
+        self.ollama = ollama or OllamaService()
     
-    async def generate_gaming_metadata(self, 
-                                     clip_title: str,
-                                     game_name: Optional[str] = None,
-                                     clip_duration: Optional[int] = None) -> Dict[str, Any]:
-        """Generate gaming-specific metadata"""
-        
+    def _build_metadata_prompt(self, 
+                               clip_title: str,
+                               game_name: Optional[str] = None,
+                               clip_duration: Optional[int] = None) -> str:
+        """Build the metadata generation prompt"""
         game_context = f" for {game_name}" if game_name else ""
         duration_context = f" ({clip_duration}s long)" if clip_duration else ""
         
@@ -89,8 +227,7 @@ class AIMetadataService:
         Generate:
         1. A catchy title (max 60 characters) that would get clicks
         2. An engaging description (max 200 characters) with emoji
-        3. 8-12 trending hashtags relevant to gaming
-        4. Platform-specific optimizations
+        3. Platform-specific optimizations
         
         Focus on gaming keywords, action words, and viral potential.
         
@@ -98,7 +235,6 @@ class AIMetadataService:
         {{
             "title": "Epic Gaming Moment!",
             "description": "🎮 Insane clutch play that'll blow your mind! Watch till the end! 🔥",
-            "hashtags": ["#gaming", "#epic", "#clutch", "#viral", "#fyp", "#gaming2024"],
             "platforms": {{
                 "youtube": {{
                     "title": "YouTube optimized title",
@@ -115,18 +251,160 @@ class AIMetadataService:
             }}
         }}
         """
+        return prompt
+    
+    def _build_hashtags_prompt(self, clip_title: str, game_name: Optional[str] = None) -> str:
+        """Hashtags are a short list, generated separately by the small hashtag model"""
+        game_context = f" for {game_name}" if game_name else ""
+        return f"""
+        Suggest 8-12 trending hashtags for a gaming clip titled "{clip_title}"{game_context}.
+        Mix broad gaming tags with tags for the game and the moment.
+        
+        Respond with only a JSON array of strings:
+        ["#gaming", "#epic", "#clutch", "#viral", "#fyp"]
+        """
+    
+    @staticmethod
+    def _parse_hashtags(response: str) -> Optional[List[str]]:
+        """The JSON array of a hashtag response, None if there is none"""
+        text = response.split("</think>", 1)[-1]
+        start, end = text.find("["), text.rfind("]")
+        if start == -1 or end < start:
+            return None
+        try:
+            tags = json.loads(text[start:end + 1])
+        except json.JSONDecodeError:
+            return None
+        if not isinstance(tags, list):
+            return None
+        return [tag.strip() for tag in tags if isinstance(tag, str) and tag.strip()] or None
+    
+    async def _generate_hashtags(self, prompt: str, model_name: str) -> Optional[List[str]]:
+        return self._parse_hashtags(await self.ollama._generate(prompt, model_name))
+    
+    def _split_models(self) -> Tuple[str, str]:
+        """Large model for title and description, small one for hashtags"""
+        return self.ollama.select_model("title"), self.ollama.select_model("hashtags")
+    
+    def _metadata_cache_key(self, prompt: str, hashtags_prompt: str, title_model: str, hashtags_model: str) -> str:
+        return make_cache_key("gaming_metadata", f"{prompt}\n{hashtags_prompt}", f"{title_model}+{hashtags_model}",
+                              self.ollama.default_options)
+    
+    def _with_hashtags(self, metadata: Dict[str, Any], hashtags: Optional[List[str]],
+                       clip_title: str, game_name: Optional[str]) -> Dict[str, Any]:
+        metadata["hashtags"] = hashtags or self._generate_fallback_metadata(clip_title, game_name)["hashtags"]
+        return metadata
+    
+    async def generate_gaming_metadata(self, 
+                                     clip_title: str,
+                                     game_name: Optional[str] = None,
+                                     clip_duration: Optional[int] = None,
+                                     use_cache: bool = True) -> Dict[str, Any]:
+        """Generate gaming-specific metadata"""
+        
+        prompt = self._build_metadata_prompt(clip_title, game_name, clip_duration)
+        hashtags_prompt = self._build_hashtags_prompt(clip_title, game_name)
+        title_model, hashtags_model = self._split_models()
+        
+        cache = self.ollama.cache
+        cache_key = None
+        if cache is not None:
+            if use_cache:
+                cache_key = self._metadata_cache_key(prompt, hashtags_prompt, title_model, hashtags_model)
+                cached = await cache.get(cache_key)
+                if cached is not None:
+                    return copy.deepcopy(cached)
+            else:
+                cache.record_bypass()
+        
+        # Title and hashtags run side by side on their own models
+        response, hashtags = await asyncio.gather(
+            self.ollama._generate(prompt, title_model),
+            self._generate_hashtags(hashtags_prompt, hashtags_model),
+        )
+        
+        try:
+            # Try to parse JSON response
+            metadata = json.loads(response)
+        except json.JSONDecodeError:
+            metadata = None
+        if not isinstance(metadata, dict):
+            # Fallback if JSON parsing fails
+            logger.warning("Failed to parse AI response as JSON, using fallback")
+            return self._generate_fallback_metadata(clip_title, game_name)
+        
+        metadata = self._with_hashtags(metadata, hashtags, clip_title, game_name)
+        # Only fully generated metadata is cached, not fallback hashtags or the raw text
+        if cache_key and hashtags:
+            await cache.set(cache_key, copy.deepcopy(metadata))
+        return metadata
+    
+    async def stream_gaming_metadata(self,
+                                     clip_title: str,
+                                     game_name: Optional[str] = None,
+                                     clip_duration: Optional[int] = None,
+                                     use_cache: bool = True) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream metadata generation as events.
         
-        async with self.ollama:
-            response = await self.ollama.generate_text(prompt)
+        Yields {"event": "token"} for every generated token, {"event": "field"}
+        as soon as a top-level string field such as the title is complete, and
+        a final {"event": "metadata"} with the parsed (or fallback) metadata.
+        Tokens are the title model's; the hashtags come from the hashtag model
+        and arrive with the final metadata.
+        """
+        prompt = self._build_metadata_prompt(clip_title, game_name, clip_duration)
+        hashtags_prompt = self._build_hashtags_prompt(clip_title, game_name)
+        title_model, hashtags_model = self._split_models()
+        
+        cache = self.ollama.cache
+        cache_key = None
+        if cache is not None:
+            if use_cache:
+                cache_key = self._metadata_cache_key(prompt, hashtags_prompt, title_model, hashtags_model)
+                cached = await cache.get(cache_key)
+                if cached is not None:
+                    for key in ("title", "description"):
+                        if isinstance(cached.get(key), str):
+                            yield {"event": "field", "key": key, "value": cached[key]}
+                    yield {"event": "metadata", "data": copy.deepcopy(cached), "cached": True}
+                    return
+            else:
+                cache.record_bypass()
+        
+        # Hashtags come from the small model in the background while the title model streams
+        hashtags_task = asyncio.create_task(self._generate_hashtags(hashtags_prompt, hashtags_model))
+        try:
+            parser = JSONFieldStream()
+            try:
+                async for token in self.ollama._stream(prompt, title_model):
+                    yield {"event": "token", "data": token}
+                    for key, value in parser.feed(token):
+                        yield {"event": "field", "key": key, "value": value}
+            except OllamaStreamError:
+                # Same as generate_gaming_metadata when Ollama fails: fallback metadata, nothing cached
+                logger.warning("Metadata stream failed, using fallback")
+                yield {"event": "metadata", "data": self._generate_fallback_metadata(clip_title, game_name),
+                       "cached": False}
+                return
             
             try:
-                # Try to parse JSON response
-                metadata = json.loads(response)
-                return metadata
+                metadata = json.loads(parser.json_text(), strict=False)
             except json.JSONDecodeError:
-                # Fallback if JSON parsing fails
-                logger.warning("Failed to parse AI response as JSON, using fallback")
-                return self._generate_fallback_metadata(clip_title, game_name)
+                metadata = None
+            if not isinstance(metadata, dict):
+                logger.warning("Failed to parse streamed AI response as JSON, using fallback")
+                yield {"event": "metadata", "data": self._generate_fallback_metadata(clip_title, game_name),
+                       "cached": False}
+                return
+            
+            hashtags = await hashtags_task
+            metadata = self._with_hashtags(metadata, hashtags, clip_title, game_name)
+            if cache_key and hashtags:
+                await cache.set(cache_key, copy.deepcopy(metadata))
+            yield {"event": "metadata", "data": metadata, "cached": False}
+        finally:
+            hashtags_task.cancel()
     
     def _generate_fallback_metadata(self, clip_title: str, game_name: Optional[str] = None) -> Dict[str, Any]:
         """Fallback metadata when AI generation fails"""
@@ -173,26 +451,36 @@ class AIMetadataService:
         }}
         """
         
-        async with self.ollama:
-            response = await self.ollama.generate_text(prompt)
-            
-            try:
-                return json.loads(response)
-            except json.JSONDecodeError:
-                return {
-                    "content_type": "gaming",
-                    "engagement_potential": "medium",
-                    "suggested_improvements": ["Add engaging thumbnail", "Include call-to-action"],
-                    "target_audience": "Gaming enthusiasts",
-                    "best_platforms": ["youtube", "tiktok", "instagram"],
-                    "optimal_posting_time": "Peak gaming hours (6-10 PM)"
-                }
+        response = await self.ollama.generate_text(prompt, task="analysis")
+        
+        try:
+            return json.loads(response)
+        except json.JSONDecodeError:
+            return {
+                "content_type": "gaming",
+                "engagement_potential": "medium",
+                "suggested_improvements": ["Add engaging thumbnail", "Include call-to-action"],
+                "target_audience": "Gaming enthusiasts",
+                "best_platforms": ["youtube", "tiktok", "instagram"],
+                "optimal_posting_time": "Peak gaming hours (6-10 PM)"
+            }
 
 
 class AIService:
-    def __init__(self):
-        self.metadata_service = AIMetadataService()
-        self.ollama = OllamaService()
+    def __init__(self, ollama: Optional[OllamaService] = None):
+        self.ollama = ollama or OllamaService()
+        self.metadata_service = AIMetadataService(self.ollama)
+    
+    async def _probe_duration(self, clip_id: int, file_path: str, db: AsyncSession) -> Optional[int]:
+        """Read the duration from the container and persist it on the clip"""
+        duration = duration_seconds(await asyncio.to_thread(get_video_probe().probe, file_path))
+        if duration is not None:
+            await db.execute(
+                update(ClipModel)
+                .where(ClipModel.id == clip_id)
+                .values(duration=duration)
+            )
+        return duration
     
     async def generate_metadata(self, clip_id: int, db: AsyncSession = None) -> Dict[str, Any]:
         """Generate AI metadata for a clip"""
@@ -207,6 +495,8 @@ class AIService:
                 
                 if clip_data:
                     title, file_path, duration = clip_data
+                    if duration is None and file_path:
+                        duration = await self._probe_duration(clip_id, file_path, db)
                 else:
                     title, file_path, duration = f"Gaming Clip {clip_id}", "", None
             else:
@@ -223,7 +513,7 @@ class AIService:
                 await db.execute(
                     update(ClipModel)
                     .where(ClipModel.id == clip_id)
-                    .values(ai_metadata=metadata, status="ready")
+                    .values(ai_metadata=normalize_metadata_hashtags(metadata), status="ready")
                 )
                 await db.commit()
             
@@ -233,44 +523,20 @@ class AIService:
             logger.error(f"Error generating metadata for clip {clip_id}: {e}")
             return self.metadata_service._generate_fallback_metadata(f"Gaming Clip {clip_id}")
     
-    async def detect_highlights(self, clip_id: int, db: AsyncSession = None) -> Dict[str, Any]:
-        """Mock highlight detection (placeholder for computer vision)"""
-        # This would integrate with YOLOv8 for actual highlight detection
-        mock_highlights = {
-            "detected_events": [
-                {"type": "kill", "timestamp": 15.5, "confidence": 0.85},
-                {"type": "achievement", "timestamp": 32.1, "confidence": 0.92},
-                {"type": "epic_moment", "timestamp": 48.7, "confidence": 0.78}
-            ],
-            "best_moments": [
-                {"start": 14.0, "end": 18.0, "score": 0.95},
-                {"start": 30.5, "end": 35.0, "score": 0.88}
-            ],
-            "recommended_clips": [
-                {"start": 10.0, "end": 25.0, "title": "Epic Kill Streak"},
-                {"start": 40.0, "end": 55.0, "title": "Amazing Play"}
-            ]
-        }
-        
-        if db:
-            await db.execute(
-                update(ClipModel)
-                .where(ClipModel.id == clip_id)
-                .values(highlights_detected=mock_highlights)
-            )
-            await db.commit()
-        
-        return mock_highlights
+    async def detect_highlights(self, clip_id: int, db: AsyncSession = None,
+                                video_path: Optional[str] = None) -> Dict[str, Any]:
+        """Detect highlights from motion, audio and YOLO object density"""
+        return await detect_clip_highlights(clip_id, db, video_path)
     
-    async def generate_thumbnail(self, clip_id: int, db: AsyncSession = None) -> Optional[str]:
-        """Generate thumbnail (placeholder)"""
-        # This would use OpenCV to extract and enhance frames
-        thumbnail_path = f"thumbnails/clip_{clip_id}_thumb.jpg"
-        
-        logger.info(f"Generated thumbnail for clip {clip_id}: {thumbnail_path}")
-        return thumbnail_path
+    async def generate_thumbnail(self, clip_id: int, db: AsyncSession = None,
+                                 video_path: Optional[str] = None) -> Optional[str]:
+        """Generate thumbnails from the best frame near the clip's highlights"""
+        thumbnails = await generate_clip_thumbnail(clip_id, db, video_path)
+        if thumbnails:
+            logger.info(f"Generated thumbnail for clip {clip_id}: {thumbnails['primary']}")
+            return thumbnails["primary"]
+        return None
     
     async def get_available_models(self) -> List[Dict[str, Any]]:
         """Get available Ollama models"""
-        async with self.ollama:
-            return await self.ollama.list_models()
+        return await self.ollama.list_models()
@@ -0,0 +1,204 @@
+"""
+ClipConductor AI - Analysis Worker Pool
+Runs OpenCV decoding and YOLO inference in worker processes, away from the API process
+"""
+
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+from app.core.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Per-process state, set by _init_worker inside each worker
+_worker_detector = None
+
+
+def _init_worker(model_path: str, threads: int) -> None:
+    """Load YOLO once per worker process and cap its thread usage"""
+    global _worker_detector
+    import cv2
+    cv2.setNumThreads(threads)
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+
+    from app.services.detector import BatchDetector
+    _worker_detector = BatchDetector(model_path=model_path)
+    _worker_detector.model  # load weights now rather than on the first job
+
+
+def _detect_via_ring(video_path: str, indices, frame_shape):
+    """Decode in a child process into shared memory and run YOLO on slot views as they arrive"""
+    from app.services.detector import Detections
+    from app.services.frame_ring import SharedFrameDecoder
+
+    parts = []
+    with SharedFrameDecoder(video_path, indices, frame_shape, max_width=settings.FRAME_SAMPLER_MAX_WIDTH,
+                            slots=settings.ANALYSIS_RING_SLOTS) as source:
+        for batch in source.batches(_worker_detector.batch_size):
+            parts.append(_worker_detector.detect([view for _, view, _ in batch]))
+            source.release(batch)
+            del batch
+        frames = source.frames
+    return Detections.concatenate(parts), frames
+
+
+def analyze_content_job(video_path: str) -> Dict[str, Any]:
+    """Sample frames and run batched YOLO over them (runs in a worker)"""
+    from app.services.frame_sampler import FrameSampler
+
+    with FrameSampler(video_path, max_width=settings.FRAME_SAMPLER_MAX_WIDTH) as sampler:
+        fps, duration = sampler.fps, sampler.duration
+        indices = sampler.evenly_spaced(settings.ANALYSIS_SAMPLE_FRAMES)
+        frame_shape = sampler.output_shape()
+        if not settings.ANALYSIS_SHARED_FRAMES:
+            sample_frames = [frame for _, _, frame in sampler.iter_frames(indices)]
+
+    if settings.ANALYSIS_SHARED_FRAMES:
+        detections, frames = _detect_via_ring(video_path, indices, frame_shape)
+    else:
+        detections, frames = _worker_detector.detect(sample_frames), len(sample_frames)
+
+    return {
+        "duration": duration,
+        "fps": fps,
+        "detected_objects": detections.cls.tolist(),
+        "object_counts": detections.class_counts(),
+        "game_type": "unknown",  # Could be enhanced with game-specific detection
+        "action_density": len(detections) / frames if frames else 0
+    }
+
+
+def detect_highlights_job(video_path: str) -> Dict[str, Any]:
+    """Full highlight detection for one clip (runs in a worker)"""
+    from app.services.highlight_detector import HighlightDetector
+    return HighlightDetector().detect(video_path, _worker_detector)
+
+
+def generate_thumbnail_job(video_path: str, highlights: Optional[Dict[str, Any]] = None,
+                           digest: Optional[str] = None, duration: Optional[float] = None) -> Dict[str, Any]:
+    """Pick, encode and cache the best thumbnail frame (runs in a worker)"""
+    from app.services.thumbnail_engine import ThumbnailEngine
+    return ThumbnailEngine().generate(video_path, highlights, _worker_detector, digest=digest, duration=duration)
+
+
+class AnalysisPool:
+    """
+    Process pool for CPU-bound video analysis.
+
+    Every worker loads the YOLO model once in its initializer. Jobs carry
+    only a file path and return plain JSON-able dicts, so no frames cross
+    the process boundary. Workers are replaced after ``max_jobs_per_worker``
+    jobs to bound memory growth from OpenCV/torch. Workers are spawned, not
+    forked, so they never inherit the API's event loop or open sockets.
+    """
+
+    def __init__(self,
+                 workers: Optional[int] = None,
+                 max_jobs_per_worker: Optional[int] = None,
+                 threads_per_worker: Optional[int] = None,
+                 model_path: Optional[str] = None):
+        self.workers = workers or settings.ANALYSIS_WORKERS or max(1, (os.cpu_count() or 2) // 2)
+        self.max_jobs_per_worker = max_jobs_per_worker or settings.ANALYSIS_WORKER_MAX_JOBS
+        self.threads_per_worker = threads_per_worker or settings.ANALYSIS_WORKER_THREADS
+        self.model_path = model_path or settings.YOLO_MODEL_PATH
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.in_flight = 0
+        self.restarts = 0
+        self.busy_seconds = 0.0
+
+    def start(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.model_path, self.threads_per_worker),
+                max_tasks_per_child=self.max_jobs_per_worker,
+            )
+        return self._executor
+
+    async def submit(self, job: Callable[..., Any], *args) -> Any:
+        """Run a module-level job function in a worker and await its result"""
+        executor = self.start()
+        loop = asyncio.get_running_loop()
+        self.submitted += 1
+        self.in_flight += 1
+        start = time.monotonic()
+        try:
+            result = await loop.run_in_executor(executor, job, *args)
+            self.completed += 1
+            return result
+        except BrokenProcessPool:
+            # A worker died (OOM, segfault in a codec); start a fresh pool for later jobs
+            self.failed += 1
+            self._restart(executor)
+            raise
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.in_flight -= 1
+            self.busy_seconds += time.monotonic() - start
+
+    def _restart(self, broken: ProcessPoolExecutor) -> None:
+        if self._executor is broken:
+            logger.warning("Analysis pool broke, restarting workers")
+            broken.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self.restarts += 1
+
+    async def analyze_content(self, video_path: str) -> Dict[str, Any]:
+        return await self.submit(analyze_content_job, video_path)
+
+    async def detect_highlights(self, video_path: str) -> Dict[str, Any]:
+        return await self.submit(detect_highlights_job, video_path)
+
+    async def generate_thumbnail(self, video_path: str, highlights: Optional[Dict[str, Any]] = None,
+                                 digest: Optional[str] = None, duration: Optional[float] = None) -> Dict[str, Any]:
+        return await self.submit(generate_thumbnail_job, video_path, highlights, digest, duration)
+
+    def shutdown(self, wait: bool = True) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._executor is not None,
+            "workers": self.workers,
+            "max_jobs_per_worker": self.max_jobs_per_worker,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "in_flight": self.in_flight,
+            "restarts": self.restarts,
+            "busy_seconds": round(self.busy_seconds, 2),
+        }
+
+
+_analysis_pool: Optional[AnalysisPool] = None
+
+
+def get_analysis_pool() -> AnalysisPool:
+    """Return the process-wide analysis pool (workers start on first use)"""
+    global _analysis_pool
+    if _analysis_pool is None:
+        _analysis_pool = AnalysisPool()
+    return _analysis_pool
+
+
+def shutdown_analysis_pool() -> None:
+    if _analysis_pool is not None:
+        _analysis_pool.shutdown()
@@ -0,0 +1,140 @@
+"""
+ClipConductor AI - Batch Processor
+Bounded-concurrency async batch engine with per-item timeouts and throughput stats
+"""
+
+import asyncio
+import math
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile, 0.0 for an empty list"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100.0 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+class BatchProcessor:
+    """
+    Runs an async worker function over many items with a fixed number of
+    concurrent workers.
+
+    Items are fed through a bounded queue, so at most ``concurrency +
+    max_in_flight`` items are materialised at once regardless of batch size.
+    Each item gets its own timeout; a timeout or exception is reported as a
+    failed result instead of aborting the batch.
+    """
+
+    def __init__(self,
+                 worker: Callable[[Any], Awaitable[Any]],
+                 concurrency: int = 4,
+                 max_in_flight: Optional[int] = None,
+                 item_timeout: Optional[float] = None):
+        self.worker = worker
+        self.concurrency = max(1, concurrency)
+        self.max_in_flight = max(1, max_in_flight or self.concurrency * 2)
+        self.item_timeout = item_timeout
+        self.latencies: List[float] = []
+        self.failed = 0
+        self.timed_out = 0
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    async def _run_item(self, index: int, item: Any) -> Dict[str, Any]:
+        start = time.perf_counter()
+        try:
+            if self.item_timeout:
+                value = await asyncio.wait_for(self.worker(item), timeout=self.item_timeout)
+            else:
+                value = await self.worker(item)
+            outcome = {"index": index, "item": item, "result": value, "error": None}
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            outcome = {"index": index, "item": item, "result": None,
+                       "error": f"timed out after {self.item_timeout}s"}
+        except Exception as e:
+            outcome = {"index": index, "item": item, "result": None, "error": str(e)}
+
+        if outcome["error"] is not None:
+            self.failed += 1
+        latency = time.perf_counter() - start
+        self.latencies.append(latency)
+        outcome["latency"] = latency
+        return outcome
+
+    async def iter_results(self, items: Iterable[Any], ordered: bool = True) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield one outcome dict per item (index, item, result, error, latency).
+
+        With ``ordered=True`` outcomes are yielded in input order, otherwise as
+        soon as each item completes.
+        """
+        pending: asyncio.Queue = asyncio.Queue(maxsize=self.max_in_flight)
+        done: asyncio.Queue = asyncio.Queue()
+        self.started_at = time.perf_counter()
+
+        async def producer():
+            try:
+                for index, item in enumerate(items):
+                    await pending.put((index, item))
+            finally:
+                for _ in range(self.concurrency):
+                    await pending.put(None)
+
+        async def consumer():
+            while True:
+                job = await pending.get()
+                if job is None:
+                    await done.put(None)
+                    return
+                await done.put(await self._run_item(*job))
+
+        tasks = [asyncio.create_task(producer())]
+        tasks.extend(asyncio.create_task(consumer()) for _ in range(self.concurrency))
+
+        try:
+            finished_workers = 0
+            next_index = 0
+            buffered: Dict[int, Dict[str, Any]] = {}
+            while finished_workers < self.concurrency:
+                outcome = await done.get()
+                if outcome is None:
+                    finished_workers += 1
+                    continue
+                if not ordered:
+                    yield outcome
+                    continue
+                buffered[outcome["index"]] = outcome
+                while next_index in buffered:
+                    yield buffered.pop(next_index)
+                    next_index += 1
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self.finished_at = time.perf_counter()
+
+    async def run(self, items: Iterable[Any], ordered: bool = True) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """Process all items and return (outcomes, stats)"""
+        outcomes = [outcome async for outcome in self.iter_results(items, ordered=ordered)]
+        return outcomes, self.stats()
+
+    def stats(self) -> Dict[str, Any]:
+        """Throughput and latency summary of the last run"""
+        end = self.finished_at or time.perf_counter()
+        elapsed = (end - self.started_at) if self.started_at else 0.0
+        completed = len(self.latencies)
+        return {
+            "items": completed,
+            "failed": self.failed,
+            "timed_out": self.timed_out,
+            "concurrency": self.concurrency,
+            "elapsed_seconds": round(elapsed, 3),
+            "items_per_second": round(completed / elapsed, 3) if elapsed > 0 else 0.0,
+            "latency_p50_seconds": round(percentile(self.latencies, 50), 3),
+            "latency_p95_seconds": round(percentile(self.latencies, 95), 3),
+        }
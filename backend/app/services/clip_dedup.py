@@ -0,0 +1,261 @@
+"""
+ClipConductor AI - Clip Deduplication
+Perceptual fingerprints of clips and a BK-tree for near-duplicate lookups
+"""
+
+import json
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import cv2
+import numpy as np
+from app.core.config import settings
+from app.services.frame_sampler import FrameSampler
+
+try:
+    import fcntl
+except ImportError:  # Windows: saves are only serialized within the process
+    fcntl = None
+
+DEDUP_INDEX_FORMAT_VERSION = 1
+
+
+@contextmanager
+def _index_file_lock(index_path: Path):
+    """Exclusive lock on a sidecar of the index, held across processes while it is merged and written"""
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(index_path.with_name(index_path.name + ".lock"), "a") as fh:
+        if fcntl is not None:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+
+
+def phash(frame: np.ndarray) -> int:
+    """64-bit DCT perceptual hash of a BGR or grey frame"""
+    grey = frame if frame.ndim == 2 else cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(grey, (32, 32), interpolation=cv2.INTER_AREA).astype(np.float32)
+    low = cv2.dct(small)[:8, :8].flatten()
+    bits = low > np.median(low[1:])  # DC term skews the median
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+class BKTree:
+    """
+    Burkhard-Keller tree over 64-bit hashes with Hamming distance.
+
+    A radius query only descends into children whose edge distance lies in
+    ``[d - radius, d + radius]``, so lookups touch a small part of the tree
+    instead of comparing against every stored hash.
+    """
+
+    def __init__(self):
+        self._root: Optional[List[Any]] = None  # [hash, values, {distance: child}]
+        self.size = 0
+
+    def add(self, value: int, item: Any) -> None:
+        self.size += 1
+        if self._root is None:
+            self._root = [value, [item], {}]
+            return
+        node = self._root
+        while True:
+            distance = hamming(value, node[0])
+            if distance == 0:
+                node[1].append(item)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [value, [item], {}]
+                return
+            node = child
+
+    def search(self, value: int, radius: int) -> List[Tuple[int, Any]]:
+        """All (distance, item) within `radius` of value"""
+        if self._root is None:
+            return []
+        found = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            distance = hamming(value, node[0])
+            if distance <= radius:
+                found.extend((distance, item) for item in node[1])
+            for edge, child in node[2].items():
+                if distance - radius <= edge <= distance + radius:
+                    stack.append(child)
+        return found
+
+
+class ClipDeduplicator:
+    """
+    Near-duplicate detection for monitored clips.
+
+    A fingerprint is the pHash of ``frames`` frames at fixed relative
+    positions plus the duration. Every frame hash goes into a BK-tree, so a
+    clip that shares even one close frame becomes a candidate; candidates
+    are then confirmed on duration and the mean Hamming distance of the
+    aligned frames. Known clips keep the metadata generated for them so a
+    duplicate can reuse it. The index is persisted as JSON; processes that
+    share the file merge each other's entries when they save or refresh.
+    """
+
+    def __init__(self,
+                 index_path: Optional[str] = None,
+                 frames: Optional[int] = None,
+                 max_distance: Optional[int] = None,
+                 duration_tolerance: Optional[float] = None):
+        if index_path is None:
+            index_dir = settings.CLIP_INDEX_DIRECTORY or os.path.join(settings.OUTPUT_DIRECTORY, "index")
+            index_path = os.path.join(index_dir, "dedup_index.json")
+        self.index_path = Path(index_path)
+        self.frames = frames or settings.CLIP_DEDUP_FRAMES
+        self.max_distance = max_distance if max_distance is not None else settings.CLIP_DEDUP_MAX_DISTANCE
+        self.duration_tolerance = duration_tolerance if duration_tolerance is not None \
+            else settings.CLIP_DEDUP_DURATION_TOLERANCE
+        # key -> {"hashes": [int], "duration": float, "metadata": dict|None, "duplicate_of": str|None}
+        self._clips: Dict[str, Dict[str, Any]] = {}
+        self._tree = BKTree()
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()  # one writer of the index file at a time
+        self._pending: set = set()  # keys added since the last save
+        self._disk_signature: Optional[Tuple[int, int, int]] = None  # (inode, mtime, size) last read
+        self._loaded = False
+        self.duplicates_found = 0
+
+    def load(self) -> None:
+        self._loaded = True
+        self._merge_from_disk()
+
+    def _merge_from_disk(self) -> None:
+        """Take in entries other processes saved since the last read; call with _lock held"""
+        try:
+            st = os.stat(self.index_path)
+        except OSError:
+            return
+        signature = (st.st_ino, st.st_mtime_ns, st.st_size)
+        if signature == self._disk_signature:
+            return
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as fh:
+                data = json.load(fh)
+        except (OSError, ValueError):
+            return
+        self._disk_signature = signature
+        if data.get("format") != DEDUP_INDEX_FORMAT_VERSION or data.get("frames") != self.frames:
+            return
+        for key, entry in data.get("clips", {}).items():
+            if key in self._pending:
+                continue  # changed here since our last save, ours wins
+            entry["hashes"] = [int(h, 16) for h in entry["hashes"]]
+            if self._clips.get(key) != entry:
+                self._insert(key, entry)
+
+    def refresh(self) -> None:
+        """Pick up clips that other processes have added to the saved index"""
+        with self._lock:
+            self._loaded = True
+            self._merge_from_disk()
+
+    def save(self) -> None:
+        """Merge with the index on disk and atomically persist it"""
+        # Several processes share the file: under the cross-process lock re-read it and merge, so
+        # entries another worker saved are kept rather than overwritten by this process's snapshot
+        with self._save_lock, _index_file_lock(self.index_path):
+            with self._lock:
+                self._loaded = True
+                self._merge_from_disk()
+                clips = {key: dict(entry, hashes=[f"{h:016x}" for h in entry["hashes"]])
+                         for key, entry in self._clips.items()}
+                saved = set(self._pending)
+            tmp_path = self.index_path.with_name(self.index_path.name + ".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as fh:
+                json.dump({"format": DEDUP_INDEX_FORMAT_VERSION, "frames": self.frames, "clips": clips}, fh,
+                          separators=(",", ":"))
+            os.replace(tmp_path, self.index_path)
+            st = os.stat(self.index_path)
+            with self._lock:
+                self._pending -= saved
+                self._disk_signature = (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def _ensure_loaded(self) -> None:
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    self.load()
+
+    def _insert(self, key: str, entry: Dict[str, Any]) -> None:
+        self._clips[key] = entry
+        for position, value in enumerate(entry["hashes"]):
+            self._tree.add(value, (key, position))
+
+    def fingerprint(self, video_path: str, duration: Optional[float] = None) -> Dict[str, Any]:
+        """pHash of frames at evenly spaced positions (skipping the very start and end)"""
+        with FrameSampler(video_path, max_width=320) as sampler:
+            duration = duration or sampler.duration
+            positions = (np.arange(self.frames) + 1) / (self.frames + 1)
+            samples = sampler.sample(timestamps=(positions * sampler.duration).tolist())
+        return {"hashes": [phash(frame) for _, _, frame in samples], "duration": float(duration or 0.0)}
+
+    def find_duplicate(self, fingerprint: Dict[str, Any],
+                       exclude: Optional[str] = None) -> Optional[Tuple[str, float]]:
+        """Closest known clip within the thresholds as (key, mean frame distance)"""
+        self._ensure_loaded()
+        hashes = fingerprint["hashes"]
+        if not hashes:
+            return None
+
+        candidates = set()
+        for value in hashes:
+            for _, (key, _) in self._tree.search(value, self.max_distance):
+                if key != exclude:
+                    candidates.add(key)
+
+        best: Optional[Tuple[str, float]] = None
+        for key in candidates:
+            entry = self._clips[key]
+            if abs(entry["duration"] - fingerprint["duration"]) > self.duration_tolerance:
+                continue
+            if len(entry["hashes"]) != len(hashes):
+                continue
+            distance = sum(hamming(a, b) for a, b in zip(entry["hashes"], hashes)) / len(hashes)
+            if distance <= self.max_distance and (best is None or distance < best[1]):
+                best = (key, distance)
+        if best:
+            self.duplicates_found += 1
+        return best
+
+    def add(self, key: str, fingerprint: Dict[str, Any], metadata: Optional[Dict[str, Any]] = None,
+            duplicate_of: Optional[str] = None) -> None:
+        self._ensure_loaded()
+        with self._lock:
+            if key in self._clips:
+                # Re-fingerprinted file: the tree keeps stale hashes, they fail verification
+                del self._clips[key]
+            self._pending.add(key)
+            self._insert(key, {
+                "hashes": list(fingerprint["hashes"]),
+                "duration": fingerprint["duration"],
+                "metadata": metadata,
+                "duplicate_of": duplicate_of,
+            })
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        self._ensure_loaded()
+        return self._clips.get(key)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "clips": len(self._clips),
+            "tree_hashes": self._tree.size,
+            "duplicates_found": self.duplicates_found,
+        }
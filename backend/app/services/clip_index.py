@@ -0,0 +1,215 @@
+"""
+ClipConductor AI - Clip Index
+Persistent, incrementally refreshed index of the video files under a watch folder
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Any
+
+
+INDEX_FORMAT_VERSION = 1
+
+
+def _newest(files: Dict[str, List[int]]) -> int:
+    return max((f[0] for f in files.values()), default=0)
+
+
+class ClipIndex:
+    """
+    On-disk index of clip files keyed by path with (mtime, size, inode).
+
+    Every directory is remembered with its own mtime, so a refresh only lists
+    directories whose mtime changed (a file was added, removed or renamed in
+    them). Unchanged directories reuse their cached entries and are never
+    listed again, which turns a rescan of a large recording drive into one
+    ``stat()`` per directory.
+
+    Writing to a file does not touch its directory's mtime, so files that
+    were modified within ``settle_seconds`` of the last scan (a recording
+    still being written) are stat'ed again until they have settled.
+    """
+
+    def __init__(self, root: str, index_path: Optional[str] = None,
+                 extensions: Iterable[str] = (".mp4",), settle_seconds: float = 2.0):
+        self.root = Path(root)
+        self.index_path = Path(index_path) if index_path else None
+        self.extensions = {ext.lower() for ext in extensions}
+        self.settle_ns = int(settle_seconds * 1e9)
+        # dir path -> {"mtime": int, "scanned": int, "newest": int, "dirs": [names],
+        #              "files": {name: [mtime, size, inode]}}
+        self._dirs: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._dirty = False
+        self.version = 0
+
+    def load(self) -> bool:
+        """Load the persisted index, returns False when it is missing or stale"""
+        self._loaded = True
+        if not self.index_path or not self.index_path.exists():
+            return False
+
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as fh:
+                data = json.load(fh)
+        except (OSError, ValueError):
+            return False
+
+        if data.get("format") != INDEX_FORMAT_VERSION or data.get("root") != str(self.root):
+            return False
+        if sorted(data.get("extensions", [])) != sorted(self.extensions):
+            return False
+
+        self._dirs = data.get("dirs", {})
+        self.version += 1
+        return True
+
+    def save(self) -> None:
+        """Atomically persist the index if it changed since the last save"""
+        if not self.index_path or not self._dirty:
+            return
+
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_name(self.index_path.name + ".tmp")
+        data = {
+            "format": INDEX_FORMAT_VERSION,
+            "root": str(self.root),
+            "extensions": sorted(self.extensions),
+            "dirs": self._dirs,
+        }
+        with open(tmp_path, "w", encoding="utf-8") as fh:
+            json.dump(data, fh, separators=(",", ":"))
+        os.replace(tmp_path, self.index_path)
+        self._dirty = False
+
+    def refresh(self) -> bool:
+        """
+        Bring the index up to date with the filesystem.
+
+        Returns True when anything changed. Only directories whose mtime
+        differs from the recorded one are listed again.
+        """
+        with self._lock:
+            if not self._loaded:
+                self.load()
+
+            if not self.root.is_dir():
+                changed = bool(self._dirs)
+                self._dirs = {}
+            else:
+                seen: Dict[str, Dict[str, Any]] = {}
+                changed = self._refresh_dir(str(self.root), seen)
+                if set(seen) != set(self._dirs):
+                    changed = True
+                self._dirs = seen
+
+            if changed:
+                self.version += 1
+                self._dirty = True
+                try:
+                    self.save()
+                except OSError as e:
+                    print(f"⚠️ Could not persist clip index: {e}")
+            return changed
+
+    def _refresh_dir(self, dir_path: str, seen: Dict[str, Dict[str, Any]]) -> bool:
+        try:
+            dir_mtime = os.stat(dir_path).st_mtime_ns
+        except OSError:
+            return True
+
+        cached = self._dirs.get(dir_path)
+        changed = False
+
+        if cached is not None and cached["mtime"] == dir_mtime:
+            record, changed = self._restat_unsettled(dir_path, cached)
+        else:
+            record = self._scan_dir(dir_path, dir_mtime, cached)
+            changed = True
+
+        seen[dir_path] = record
+        for name in record["dirs"]:
+            if self._refresh_dir(os.path.join(dir_path, name), seen):
+                changed = True
+        return changed
+
+    def _restat_unsettled(self, dir_path: str, record: Dict[str, Any]):
+        """Stat again the files modified close to the last scan, returns (record, changed)"""
+        cutoff = record.get("scanned", 0) - self.settle_ns
+        if record.get("newest", cutoff) < cutoff:
+            return record, False  # settled directory, no need to look at its files
+        unsettled = [name for name, (mtime, _, _) in record["files"].items() if mtime >= cutoff]
+        if not unsettled:
+            return record, False
+
+        # A new record, readers may be iterating the cached one
+        files = dict(record["files"])
+        scanned = time.time_ns()
+        for name in unsettled:
+            try:
+                st = os.stat(os.path.join(dir_path, name))
+            except OSError:
+                continue  # removed: the directory mtime changes and the next refresh lists it
+            files[name] = [st.st_mtime_ns, st.st_size, st.st_ino]
+        changed = files != record["files"]
+        return dict(record, files=files, scanned=scanned, newest=_newest(files)), changed
+
+    def _scan_dir(self, dir_path: str, dir_mtime: int,
+                  cached: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        dirs: List[str] = []
+        files: Dict[str, List[int]] = {}
+        previous = cached["files"] if cached else {}
+        scanned = time.time_ns()
+
+        try:
+            with os.scandir(dir_path) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            dirs.append(entry.name)
+                        elif os.path.splitext(entry.name)[1].lower() in self.extensions:
+                            st = entry.stat()
+                            files[entry.name] = [st.st_mtime_ns, st.st_size, st.st_ino]
+                    except OSError:
+                        # File vanished between listing and stat
+                        if entry.name in previous:
+                            files[entry.name] = previous[entry.name]
+        except OSError as e:
+            print(f"⚠️ Could not list {dir_path}: {e}")
+
+        return {"mtime": dir_mtime, "scanned": scanned, "newest": _newest(files), "dirs": sorted(dirs),
+                "files": files}
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """Return all indexed files as dicts with path, mtime, size and inode"""
+        result = []
+        for dir_path, record in self._dirs.items():
+            for name, (mtime, size, inode) in record["files"].items():
+                result.append({
+                    "path": os.path.join(dir_path, name),
+                    "name": name,
+                    "mtime": mtime,
+                    "size": size,
+                    "inode": inode,
+                })
+        return result
+
+    def get(self, path: str) -> Optional[Dict[str, Any]]:
+        """Look up a single file in the index"""
+        dir_path, name = os.path.split(str(path))
+        record = self._dirs.get(dir_path)
+        if not record or name not in record["files"]:
+            return None
+        mtime, size, inode = record["files"][name]
+        return {"path": str(path), "name": name, "mtime": mtime, "size": size, "inode": inode}
+
+    def __len__(self) -> int:
+        return sum(len(record["files"]) for record in self._dirs.values())
+
+    @property
+    def total_size(self) -> int:
+        return sum(f[1] for record in self._dirs.values() for f in record["files"].values())
@@ -0,0 +1,246 @@
+"""
+ClipConductor AI - Clip Pipeline
+Per-clip processing as a stage graph: independent stages run concurrently, finished stages are skipped on reruns
+"""
+
+import asyncio
+import os
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+from sqlalchemy import select, update
+from app.core.config import settings
+from app.models.database import Clip as ClipModel
+from app.models.schemas import ClipStatus
+from app.services.ai_service import AIService
+from app.services.clip_dedup import ClipDeduplicator
+from app.services.highlight_detector import detect_clip_highlights
+from app.services.thumbnail_engine import generate_clip_thumbnail
+from app.services.video_probe import duration_seconds, get_video_probe
+from app.utils.hashtags import normalize_metadata_hashtags
+import logging
+
+logger = logging.getLogger(__name__)
+
+StageFn = Callable[["PipelineRun"], Awaitable[Optional[Dict[str, Any]]]]
+
+
+class Stage:
+    """One node of the graph: runs once all of `after` have completed, returns a JSON-able output"""
+
+    def __init__(self, name: str, fn: StageFn, after: Sequence[str] = ()):
+        self.name = name
+        self.fn = fn
+        self.after = tuple(after)
+
+
+class PipelineRun:
+    """State shared by the stages of one clip: the job context, the clip row and finished outputs"""
+
+    def __init__(self, ctx, clip: ClipModel, outputs: Dict[str, Any]):
+        self.ctx = ctx
+        self.clip_id = clip.id
+        self.video_path = clip.file_path
+        self.clip = clip
+        self.outputs = outputs
+
+    def output(self, stage: str) -> Dict[str, Any]:
+        return self.outputs.get(stage) or {}
+
+
+class ClipPipeline:
+    """
+    Runs a stage graph for one clip inside a ProcessingJob.
+
+    Every stage whose dependencies are done is started at once, so with the
+    default graph highlights and dedup run side by side after the probe, and
+    thumbnail and metadata after them. Each finished stage's output and
+    wall time are written to ``ProcessingJob.result_data`` immediately
+    (``stages`` and ``timings``); a retried or re-queued job skips stages
+    that already have an output. When a stage fails, the stages already
+    running are allowed to finish and persist before the job fails.
+    """
+
+    def __init__(self, stages: Sequence[Stage]):
+        names = {stage.name for stage in stages}
+        for stage in stages:
+            missing = set(stage.after) - names
+            if missing:
+                raise ValueError(f"Stage {stage.name} depends on unknown stages {sorted(missing)}")
+        self.stages = {stage.name: stage for stage in stages}
+        self._check_acyclic()
+
+    def _check_acyclic(self) -> None:
+        done: set = set()
+        remaining = dict(self.stages)
+        while remaining:
+            ready = [name for name, stage in remaining.items() if set(stage.after) <= done]
+            if not ready:
+                raise ValueError(f"Stage graph has a cycle among {sorted(remaining)}")
+            for name in ready:
+                done.add(name)
+                del remaining[name]
+
+    async def run(self, ctx) -> Dict[str, Any]:
+        async with ctx.session() as db:
+            clip = (await db.execute(select(ClipModel).where(ClipModel.id == ctx.clip_id))).scalar_one_or_none()
+        if clip is None:
+            raise LookupError(f"Clip {ctx.clip_id} not found")
+
+        stages_state: Dict[str, Any] = ctx.result_data.setdefault("stages", {})
+        timings: Dict[str, float] = ctx.result_data.setdefault("timings", {})
+        outputs = {name: state.get("output") for name, state in stages_state.items()
+                   if state.get("status") == "completed"}
+        run = PipelineRun(ctx, clip, outputs)
+        skipped = [name for name in self.stages if name in outputs]
+        if skipped:
+            logger.info(f"Clip {clip.id}: reusing stages {skipped} from an earlier attempt")
+
+        started = time.perf_counter()
+        running: Dict[str, asyncio.Task] = {}
+        error: Optional[BaseException] = None
+        try:
+            while True:
+                if error is None:
+                    for name, stage in self.stages.items():
+                        if name not in outputs and name not in running and \
+                                all(dep in outputs for dep in stage.after):
+                            running[name] = asyncio.create_task(self._run_stage(run, stage), name=f"stage-{name}")
+                if not running:
+                    break
+                finished, _ = await asyncio.wait(running.values(), return_when=asyncio.FIRST_COMPLETED)
+                for name in [name for name, task in running.items() if task in finished]:
+                    task = running.pop(name)
+                    exc = task.exception()
+                    if exc is not None:
+                        error = error or exc
+                        stages_state[name] = {"status": "failed", "error": f"{type(exc).__name__}: {exc}"}
+                        continue
+                    output, seconds = task.result()
+                    outputs[name] = output
+                    timings[name] = round(seconds, 3)
+                    stages_state[name] = {"status": "completed", "output": output, "seconds": round(seconds, 3),
+                                          "finished_at": datetime.now(timezone.utc).isoformat()}
+                done = sum(1 for name in self.stages if name in outputs)
+                await ctx.progress(int(100 * done / len(self.stages)), stages=stages_state, timings=timings)
+        finally:
+            # Cancelled job or lost lease: do not leave stages running
+            for task in running.values():
+                task.cancel()
+
+        if error is not None:
+            raise error
+        timings["total"] = round(time.perf_counter() - started, 3)
+        return {"stages": stages_state, "timings": timings}
+
+    @staticmethod
+    async def _run_stage(run: PipelineRun, stage: Stage):
+        started = time.perf_counter()
+        output = await stage.fn(run)
+        return output or {}, time.perf_counter() - started
+
+
+async def probe_stage(run: PipelineRun) -> Dict[str, Any]:
+    if not run.video_path or not await asyncio.to_thread(os.path.isfile, run.video_path):
+        raise FileNotFoundError(f"Video file missing for clip {run.clip_id}: {run.video_path}")
+    probe = get_video_probe()
+    info = await asyncio.to_thread(probe.probe, run.video_path)
+    # Workers only probe one clip at a time, nothing else would write their results to disk
+    await asyncio.to_thread(probe.save_quietly)
+    if info is None:
+        raise ValueError(f"Could not read container metadata of {run.video_path}")
+    if run.clip.duration is None:
+        async with run.ctx.session() as db:
+            await db.execute(
+                update(ClipModel)
+                .where(ClipModel.id == run.clip_id)
+                .values(duration=duration_seconds(info), file_size=info.get("size"))
+            )
+            await db.commit()
+    return {"duration": info.get("duration"), "fps": info.get("fps"), "width": info.get("width"),
+            "height": info.get("height"), "has_audio": info.get("has_audio")}
+
+
+async def highlights_stage(run: PipelineRun) -> Dict[str, Any]:
+    async with run.ctx.session() as db:
+        highlights = await detect_clip_highlights(run.clip_id, db, run.video_path)
+    if highlights.get("error"):
+        raise RuntimeError(highlights["error"])
+    return {"moments": len(highlights.get("best_moments", [])),
+            "events": len(highlights.get("detected_events", []))}
+
+
+_library_deduplicator: Optional[ClipDeduplicator] = None
+
+
+def get_library_deduplicator() -> ClipDeduplicator:
+    """Dedup index of stored clips (keyed by clip id), separate from the watch-folder index"""
+    global _library_deduplicator
+    if _library_deduplicator is None:
+        index_dir = settings.CLIP_INDEX_DIRECTORY or os.path.join(settings.OUTPUT_DIRECTORY, "index")
+        _library_deduplicator = ClipDeduplicator(index_path=os.path.join(index_dir, "dedup_library.json"))
+    return _library_deduplicator
+
+
+async def dedup_stage(run: PipelineRun) -> Dict[str, Any]:
+    if not settings.CLIP_DEDUP_ENABLED:
+        return {"duplicate_of": None, "skipped": True}
+    deduplicator = get_library_deduplicator()
+    key = str(run.clip_id)
+    fingerprint = await asyncio.to_thread(deduplicator.fingerprint, run.video_path,
+                                          run.output("probe").get("duration"))
+    # Other workers share the index file; see the clips they have stored before looking up
+    await asyncio.to_thread(deduplicator.refresh)
+    match = deduplicator.find_duplicate(fingerprint, exclude=key)
+    duplicate_of = int(match[0]) if match else None
+    deduplicator.add(key, fingerprint, duplicate_of=str(duplicate_of) if match else None)
+    await asyncio.to_thread(deduplicator.save)
+    return {"duplicate_of": duplicate_of, "distance": round(match[1], 2) if match else None}
+
+
+async def thumbnail_stage(run: PipelineRun) -> Dict[str, Any]:
+    async with run.ctx.session() as db:
+        thumbnails = await generate_clip_thumbnail(run.clip_id, db, run.video_path)
+    if not thumbnails:
+        raise RuntimeError("Thumbnail generation failed")
+    return {"primary": thumbnails["primary"]}
+
+
+async def metadata_stage(run: PipelineRun) -> Dict[str, Any]:
+    duplicate_of = run.output("dedup").get("duplicate_of")
+    async with run.ctx.session() as db:
+        metadata = None
+        if duplicate_of:
+            # Near-duplicate of a processed clip: reuse its metadata instead of another LLM call
+            result = await db.execute(select(ClipModel.ai_metadata).where(ClipModel.id == duplicate_of))
+            metadata = result.scalar_one_or_none()
+        reused = metadata is not None
+        if metadata is None:
+            metadata = normalize_metadata_hashtags(
+                await AIService().generate_metadata(run.clip_id, run.clip.game_detected)
+            )
+        await db.execute(update(ClipModel).where(ClipModel.id == run.clip_id).values(ai_metadata=metadata))
+        await db.commit()
+    return {"title": metadata.get("title"), "reused_from": duplicate_of if reused else None}
+
+
+async def publish_stage(run: PipelineRun) -> Dict[str, Any]:
+    """Mark the clip ready; platform uploads are triggered from the ready state"""
+    async with run.ctx.session() as db:
+        await db.execute(
+            update(ClipModel).where(ClipModel.id == run.clip_id).values(status=ClipStatus.READY.value)
+        )
+        await db.commit()
+    return {"status": ClipStatus.READY.value}
+
+
+CLIP_STAGES: List[Stage] = [
+    Stage("probe", probe_stage),
+    Stage("highlights", highlights_stage, after=["probe"]),
+    Stage("dedup", dedup_stage, after=["probe"]),
+    Stage("thumbnail", thumbnail_stage, after=["highlights"]),
+    Stage("metadata", metadata_stage, after=["highlights", "dedup"]),
+    Stage("publish", publish_stage, after=["thumbnail", "metadata"]),
+]
+
+clip_pipeline = ClipPipeline(CLIP_STAGES)
@@ -0,0 +1,165 @@
+"""
+ClipConductor AI - Clip Search
+Filters and facets clips by game, hashtag, status and highlight score in SQL: JSONB on PostgreSQL, json1 on SQLite
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import Float, String, and_, case, cast, exists, func, literal, literal_column, select, true, type_coerce
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.database import Clip as ClipModel
+from app.models.schemas import Clip
+from app.services.clip_service import ClipService
+from app.utils.hashtags import normalize_hashtag
+from app.utils.pagination import encode_cursor
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Highlight score facet, highest first: (label, lower bound); each bucket ends where the previous one starts
+SCORE_BUCKETS: List[Tuple[str, Optional[float]]] = [
+    ("0.9+", 0.9),
+    ("0.75-0.9", 0.75),
+    ("0.5-0.75", 0.5),
+    ("<0.5", None),
+]
+
+
+def highlight_score(dialect: str):
+    """highlights_detected.highlight_score as a number, the expression ix_clips_highlight_score indexes"""
+    if dialect == "postgresql":
+        return cast(
+            ClipModel.highlights_detected.op("->>", return_type=String)(literal_column("'highlight_score'")),
+            Float
+        )
+    return func.json_extract(ClipModel.highlights_detected, literal_column("'$.highlight_score'"))
+
+
+def has_hashtags(dialect: str, tags: List[str]):
+    """ai_metadata.hashtags contains every tag: JSONB containment (GIN-indexed) or json1 lookups"""
+    if dialect == "postgresql":
+        return type_coerce(ClipModel.ai_metadata, JSONB).contains({"hashtags": tags})
+    conditions = []
+    for tag in tags:
+        each = func.json_each(ClipModel.ai_metadata, literal_column("'$.hashtags'")).table_valued("value")
+        conditions.append(exists(select(literal(1)).select_from(each).where(each.c.value == tag)))
+    return and_(*conditions)
+
+
+class ClipSearch:
+    """
+    One clip search: the filters, a keyset page of matches, the total and facet counts.
+
+    All filtering and counting runs in the database. On PostgreSQL hashtags
+    are matched with JSONB containment (``ai_metadata @> {"hashtags": [...]}``,
+    served by the GIN index) and the highlight score is read with ``->>``;
+    on SQLite the same filters use json1 (``json_each``, ``json_extract``).
+
+    Facets are disjunctive: each facet is counted under every filter except
+    its own, so picking a status still shows the counts of the other statuses.
+    """
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        status: Optional[str] = None,
+        game: Optional[str] = None,
+        hashtags: Optional[Sequence[str]] = None,
+        min_score: Optional[float] = None,
+        max_score: Optional[float] = None,
+        owner_id: Optional[int] = None
+    ):
+        self.db = db
+        self.dialect = db.bind.dialect.name
+        self.hashtags = [tag for tag in map(normalize_hashtag, hashtags or []) if tag]
+
+        score = highlight_score(self.dialect)
+        self.criteria: Dict[str, list] = {
+            "owner": ClipService._clip_filters(owner_id=owner_id),
+            "status": ClipService._clip_filters(status=status),
+            "game": [ClipModel.game_detected == game] if game else [],
+            "hashtag": [has_hashtags(self.dialect, self.hashtags)] if self.hashtags else [],
+            "highlight_score": ([score >= min_score] if min_score is not None else []) +
+                               ([score < max_score] if max_score is not None else []),
+        }
+
+    def _where(self, exclude: Optional[str] = None) -> list:
+        return [condition for facet, conditions in self.criteria.items() if facet != exclude
+                for condition in conditions]
+
+    async def page(self, limit: int = 20, cursor: Optional[str] = None) -> Tuple[List[Clip], Optional[str]]:
+        """Matching clips newest first, with the cursor of the next page (None on the last page)"""
+        result = await self.db.execute(ClipService._page_query(limit + 1, cursor, filters=self._where()))
+        clips = result.scalars().all()
+
+        next_cursor = None
+        if len(clips) > limit:
+            last = clips[limit - 1]
+            next_cursor = encode_cursor(last.created_at, last.id)
+        return [Clip.from_orm(clip) for clip in clips[:limit]], next_cursor
+
+    async def count(self) -> int:
+        result = await self.db.execute(select(func.count()).select_from(ClipModel).where(*self._where()))
+        return result.scalar()
+
+    async def facets(self, limit: int = 20) -> Dict[str, List[Dict[str, Any]]]:
+        """Counts per status, game, hashtag (top `limit` each) and highlight score bucket"""
+        return {
+            "status": await self._value_counts(ClipModel.status, "status", limit),
+            "game": await self._value_counts(ClipModel.game_detected, "game", limit),
+            "hashtag": await self._hashtag_counts(limit),
+            "highlight_score": await self._score_counts(),
+        }
+
+    async def _value_counts(self, column, facet: str, limit: int) -> List[Dict[str, Any]]:
+        count = func.count().label("count")
+        result = await self.db.execute(
+            select(column, count)
+            .where(column.is_not(None), *self._where(exclude=facet))
+            .group_by(column)
+            .order_by(count.desc(), column)
+            .limit(limit)
+        )
+        return [{"value": value, "count": n} for value, n in result.all()]
+
+    async def _hashtag_counts(self, limit: int) -> List[Dict[str, Any]]:
+        if self.dialect == "postgresql":
+            hashtags = type_coerce(ClipModel.ai_metadata, JSONB)["hashtags"]
+            # jsonb_array_elements_text raises on non-arrays, so anything else unnests as []
+            tags = func.jsonb_array_elements_text(
+                case((func.jsonb_typeof(hashtags) == "array", hashtags), else_=cast(literal("[]"), JSONB))
+            ).table_valued("value").lateral()
+            conditions = []
+        else:
+            tags = func.json_each(ClipModel.ai_metadata, literal_column("'$.hashtags'")).table_valued("value")
+            conditions = [func.json_type(ClipModel.ai_metadata, literal_column("'$.hashtags'")) == "array"]
+
+        count = func.count().label("count")
+        result = await self.db.execute(
+            select(tags.c.value, count)
+            .select_from(ClipModel)
+            .join(tags, true())
+            .where(*conditions, *self._where(exclude="hashtag"))
+            .group_by(tags.c.value)
+            .order_by(count.desc(), tags.c.value)
+            .limit(limit)
+        )
+        return [{"value": value, "count": n} for value, n in result.all()]
+
+    async def _score_counts(self) -> List[Dict[str, Any]]:
+        score = highlight_score(self.dialect)
+        bucket = case(
+            *[(score >= lower, label) for label, lower in SCORE_BUCKETS if lower is not None],
+            else_=SCORE_BUCKETS[-1][0]
+        )
+        scored = select(bucket.label("bucket")) \
+            .where(score.is_not(None), *self._where(exclude="highlight_score")) \
+            .subquery()
+        result = await self.db.execute(select(scored.c.bucket, func.count()).group_by(scored.c.bucket))
+        counts = dict(result.all())
+
+        buckets, upper = [], None
+        for label, lower in SCORE_BUCKETS:
+            buckets.append({"value": label, "min": lower, "max": upper, "count": counts.get(label, 0)})
+            upper = lower
+        return buckets
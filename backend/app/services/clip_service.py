@@ -1,43 +1,142 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, delete, func
-from typing import List, Optional, Tuple
+from sqlalchemy import select, update, delete, func, text, tuple_
+from typing import AsyncIterator, List, Optional, Sequence, Tuple
 from fastapi import UploadFile
+import asyncio
+import json
 import os
-import shutil
+import uuid
 from datetime import datetime
 from app.models.database import Clip as ClipModel
 from app.models.schemas import ClipCreate, ClipUpdate, Clip
 from app.core.config import settings
+from app.services.clip_store import get_clip_store
+from app.services.upload_service import UploadTooLargeError, max_upload_bytes, safe_filename, stream_to_file
+from app.services.video_probe import duration_seconds, get_video_probe
+from app.utils.pagination import decode_cursor, encode_cursor
+
+UPLOAD_READ_CHUNK = 1024 * 1024
 
 
 class ClipService:
     def __init__(self, db: AsyncSession):
         self.db = db
     
+    @staticmethod
+    def _clip_filters(status: Optional[str] = None, owner_id: Optional[int] = None) -> list:
+        filters = []
+        if status:
+            filters.append(ClipModel.status == status)
+        if owner_id is not None:
+            filters.append(ClipModel.owner_id == owner_id)
+        return filters
+    
+    @classmethod
+    def _page_query(
+        cls,
+        limit: int,
+        cursor: Optional[str] = None,
+        status: Optional[str] = None,
+        owner_id: Optional[int] = None,
+        filters: Sequence = ()
+    ):
+        query = select(ClipModel).where(*cls._clip_filters(status, owner_id), *filters)
+        if cursor:
+            created_at, clip_id = decode_cursor(cursor)
+            # A plain tuple binds through the columns' types, so SQLite compares timestamps in storage format
+            query = query.where(tuple_(ClipModel.created_at, ClipModel.id) < (created_at, clip_id))
+        return query.order_by(ClipModel.created_at.desc(), ClipModel.id.desc()).limit(limit)
+    
     async def get_clips(
         self, 
         page: int = 1, 
         per_page: int = 20, 
         status: Optional[str] = None
     ) -> Tuple[List[Clip], int]:
-        """Get clips with pagination and filtering"""
+        """Get clips with OFFSET pagination and filtering (use list_clips for deep pages)"""
         offset = (page - 1) * per_page
+        filters = self._clip_filters(status)
         
-        query = select(ClipModel)
-        if status:
-            query = query.where(ClipModel.status == status)
-        
-        # Get total count
-        count_result = await self.db.execute(select(func.count(ClipModel.id)))
-        total = count_result.scalar()
+        total, _ = await self.count_clips(status=status)
         
-        # Get paginated results
-        query = query.offset(offset).limit(per_page).order_by(ClipModel.created_at.desc())
+        query = (
+            select(ClipModel)
+            .where(*filters)
+            .order_by(ClipModel.created_at.desc(), ClipModel.id.desc())
+            .offset(offset)
+            .limit(per_page)
+        )
         result = await self.db.execute(query)
         clips = result.scalars().all()
         
         return [Clip.from_orm(clip) for clip in clips], total
     
+    async def list_clips(
+        self,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        status: Optional[str] = None,
+        owner_id: Optional[int] = None
+    ) -> Tuple[List[Clip], Optional[str]]:
+        """
+        Keyset page of clips, newest first.
+        
+        Rows are ordered by (created_at, id) and a page starts strictly after
+        the cursor's row, so every page is an index range scan no matter how
+        deep, and rows inserted meanwhile do not shift later pages. Returns the
+        page and the cursor for the next one (None on the last page).
+        """
+        result = await self.db.execute(self._page_query(limit + 1, cursor, status, owner_id))
+        clips = result.scalars().all()
+        
+        next_cursor = None
+        if len(clips) > limit:
+            last = clips[limit - 1]
+            next_cursor = encode_cursor(last.created_at, last.id)
+        return [Clip.from_orm(clip) for clip in clips[:limit]], next_cursor
+    
+    async def count_clips(
+        self,
+        status: Optional[str] = None,
+        owner_id: Optional[int] = None,
+        estimate: bool = False
+    ) -> Tuple[int, bool]:
+        """
+        Number of clips matching the filters, as (count, is_estimate).
+        
+        With ``estimate`` on PostgreSQL, tables above CLIP_COUNT_ESTIMATE_THRESHOLD
+        rows answer from planner statistics (pg_class.reltuples, or the plan's
+        row estimate when filtered) instead of counting; filtered counts the
+        planner expects to be small are still counted exactly.
+        """
+        filters = self._clip_filters(status, owner_id)
+        if estimate and self.db.bind.dialect.name == "postgresql":
+            estimated = await self._estimate_count(filters)
+            if estimated is not None and estimated >= settings.CLIP_COUNT_ESTIMATE_THRESHOLD:
+                return estimated, True
+        
+        result = await self.db.execute(select(func.count()).select_from(ClipModel).where(*filters))
+        return result.scalar(), False
+    
+    async def _estimate_count(self, filters: list) -> Optional[int]:
+        result = await self.db.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = 'clips'::regclass")
+        )
+        reltuples = result.scalar()
+        if reltuples is None or reltuples < settings.CLIP_COUNT_ESTIMATE_THRESHOLD:
+            return None  # small or never analyzed (-1): counting is cheap enough
+        if not filters:
+            return int(reltuples)
+        
+        query = select(ClipModel.id).where(*filters).compile(
+            dialect=self.db.bind.dialect, compile_kwargs={"literal_binds": True}
+        )
+        result = await self.db.execute(text(f"EXPLAIN (FORMAT JSON) {query}"))
+        plan = result.scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+    
     async def get_clip(self, clip_id: int) -> Optional[Clip]:
         """Get a specific clip by ID"""
         result = await self.db.execute(select(ClipModel).where(ClipModel.id == clip_id))
@@ -49,11 +148,38 @@ class ClipService:
     
     async def create_clip(self, clip_data: ClipCreate) -> Clip:
         """Create a new clip"""
+        store = get_clip_store()
+        if not settings.CLIP_STORE_ENABLED or store.contains(clip_data.file_path) \
+                or not await asyncio.to_thread(os.path.isfile, clip_data.file_path):
+            return await self._insert_clip(clip_data.title, clip_data.description, clip_data.file_path,
+                                           clip_data.original_file_path)
+        
+        # Watch-folder file: link it into the store, the original stays where it is
+        async with store.ingesting(clip_data.file_path) as stored:
+            return await self._insert_clip(
+                clip_data.title, clip_data.description, stored["path"],
+                clip_data.original_file_path or clip_data.file_path,
+                file_size=stored["size"], content_hash=stored["content_hash"]
+            )
+    
+    async def _insert_clip(
+        self,
+        title: str,
+        description: Optional[str],
+        file_path: str,
+        original_file_path: Optional[str],
+        file_size: Optional[int] = None,
+        content_hash: Optional[str] = None
+    ) -> Clip:
+        probe = await asyncio.to_thread(get_video_probe().probe, file_path)
         clip = ClipModel(
-            title=clip_data.title,
-            description=clip_data.description,
-            file_path=clip_data.file_path,
-            original_file_path=clip_data.original_file_path,
+            title=title,
+            description=description,
+            file_path=file_path,
+            original_file_path=original_file_path,
+            duration=duration_seconds(probe),
+            file_size=file_size or (probe["size"] if probe else None),
+            content_hash=content_hash,
             status="processing",
             owner_id=1  # TODO: Get from authentication
         )
@@ -66,40 +192,44 @@ class ClipService:
     
     async def upload_clip(self, file: UploadFile, title: str) -> Clip:
         """Upload and save a video file"""
-        # Create upload directory if it doesn't exist
-        upload_dir = os.path.join(settings.OUTPUT_DIRECTORY, "uploads")
-        os.makedirs(upload_dir, exist_ok=True)
-        
-        # Generate unique filename
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"{timestamp}_{file.filename}"
-        file_path = os.path.join(upload_dir, filename)
-        
-        # Save file
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        # Reject by declared size before reading anything
+        if file.size is not None and file.size > max_upload_bytes():
+            raise UploadTooLargeError(max_upload_bytes())
         
-        # Get file size
-        file_size = os.path.getsize(file_path)
+        async def chunks():
+            while True:
+                chunk = await file.read(UPLOAD_READ_CHUNK)
+                if not chunk:
+                    return
+                yield chunk
         
-        # Create clip record
-        clip_data = ClipCreate(
-            title=title,
-            file_path=file_path,
-            original_file_path=file_path
-        )
-        
-        clip = await self.create_clip(clip_data)
+        return await self.upload_stream(chunks(), file.filename, title)
+    
+    async def upload_stream(self, chunks: AsyncIterator[bytes], filename: Optional[str], title: str) -> Clip:
+        """Stream request body chunks straight to disk and create the clip"""
+        filename = safe_filename(filename)
+        if settings.CLIP_STORE_ENABLED:
+            # Staged inside the store so the finished file is renamed into place
+            file_path = str(get_clip_store().temp_path(os.path.splitext(filename)[1]))
+        else:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            file_path = os.path.join(settings.OUTPUT_DIRECTORY, "uploads",
+                                     f"{timestamp}_{uuid.uuid4().hex[:8]}_{filename}")
+        await asyncio.to_thread(os.makedirs, os.path.dirname(file_path), exist_ok=True)
         
-        # Update file size
-        await self.db.execute(
-            update(ClipModel)
-            .where(ClipModel.id == clip.id)
-            .values(file_size=file_size)
-        )
-        await self.db.commit()
+        upload = await stream_to_file(chunks, file_path)
+        return await self.create_uploaded_clip(upload, title, filename)
+    
+    async def create_uploaded_clip(self, upload: dict, title: str, filename: Optional[str] = None) -> Clip:
+        """Create the clip record for a finished upload (path, size and content hash)"""
+        if not settings.CLIP_STORE_ENABLED:
+            return await self._insert_clip(title, None, upload["path"], upload["path"],
+                                           file_size=upload["size"], content_hash=upload["content_hash"])
         
-        return clip
+        # The upload is ours: moved into the store, or dropped if the content is already stored
+        async with get_clip_store().ingesting(upload["path"], upload["content_hash"], move=True) as stored:
+            return await self._insert_clip(title, None, stored["path"], filename or upload["path"],
+                                           file_size=stored["size"], content_hash=stored["content_hash"])
     
     async def update_clip(self, clip_id: int, clip_update: ClipUpdate) -> Optional[Clip]:
         """Update a clip"""
@@ -123,13 +253,59 @@ class ClipService:
         return Clip.from_orm(clip)
     
     async def delete_clip(self, clip_id: int) -> bool:
-        """Delete a clip"""
+        """Delete a clip, and its stored file once no other clip references it"""
         result = await self.db.execute(
-            delete(ClipModel).where(ClipModel.id == clip_id)
+            select(ClipModel.file_path, ClipModel.content_hash).where(ClipModel.id == clip_id)
         )
-        await self.db.commit()
+        row = result.one_or_none()
+        if row is None:
+            return False
+        file_path, content_hash = row
+        
+        store = get_clip_store()
+        if not content_hash or not store.contains(file_path):
+            await self.db.execute(delete(ClipModel).where(ClipModel.id == clip_id))
+            await self.db.commit()
+            return True
+        
+        async with store.lock(content_hash):
+            await self.db.execute(delete(ClipModel).where(ClipModel.id == clip_id))
+            await self.db.commit()
+            
+            # The clips table is the reference count
+            remaining = await self.db.execute(
+                select(func.count(ClipModel.id)).where(
+                    ClipModel.content_hash == content_hash,
+                    ClipModel.file_path == file_path
+                )
+            )
+            if remaining.scalar() == 0:
+                await store.release(file_path)
+        
+        return True
+    
+    async def backfill_durations(self, limit: int = 10000) -> int:
+        """Probe clips without a duration and store duration and size in one bulk update"""
+        result = await self.db.execute(
+            select(ClipModel.id, ClipModel.file_path)
+            .where(ClipModel.duration.is_(None))
+            .limit(limit)
+        )
+        rows = result.all()
+        if not rows:
+            return 0
         
-        return result.rowcount > 0
+        probes = await asyncio.to_thread(get_video_probe().probe_many, [path for _, path in rows])
+        values = [
+            {"id": clip_id, "duration": duration_seconds(probes[path]), "file_size": probes[path]["size"]}
+            for clip_id, path in rows
+            if probes.get(path) and probes[path].get("duration")
+        ]
+        if values:
+            # ORM bulk UPDATE by primary key, executed as one executemany
+            await self.db.execute(update(ClipModel), values)
+            await self.db.commit()
+        return len(values)
     
     async def get_clip_file_path(self, clip_id: int) -> Optional[str]:
         """Get the file path for a clip"""
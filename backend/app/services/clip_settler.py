@@ -0,0 +1,172 @@
+"""
+ClipConductor AI - Clip Settler
+Coalesces file system events per clip and releases each clip once its recording has finished
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class _PendingClip:
+    __slots__ = ("first_seen", "last_event", "last_change", "size", "mtime", "events")
+
+    def __init__(self, now: float):
+        self.first_seen = now
+        self.last_event = now
+        self.last_change = now
+        self.size = -1
+        self.mtime = -1
+        self.events = 0
+
+
+class ClipSettler:
+    """
+    Debounce stage in front of clip processing.
+
+    created/modified/moved events are coalesced per path. A background
+    thread polls pending paths and releases a clip to ``on_settled`` exactly
+    once, when its size and mtime have not changed for ``quiet_period``
+    seconds and the recorder no longer holds it open. Clips still growing
+    after ``max_wait`` seconds are released anyway so nothing is stuck
+    forever. Events for a clip that was already released unchanged are
+    ignored, which drops the trailing modify burst Outplayed produces.
+    """
+
+    def __init__(self,
+                 on_settled: Callable[[Path], Any],
+                 quiet_period: float = 2.0,
+                 max_wait: float = 300.0,
+                 poll_interval: float = 0.5,
+                 remember: int = 4096):
+        self.on_settled = on_settled
+        self.quiet_period = quiet_period
+        self.max_wait = max_wait
+        self.poll_interval = poll_interval
+        self.remember = remember
+        self._pending: Dict[str, _PendingClip] = {}
+        self._released: "OrderedDict[str, Tuple[int, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.coalesced = 0
+        self.released = 0
+        self.forced = 0
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="clip-settler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.poll_interval * 4)
+        self._thread = None
+
+    def touch(self, path: Path) -> None:
+        """Record a created/modified event for a path, safe from any thread"""
+        key = str(path)
+        now = time.monotonic()
+        with self._lock:
+            pending = self._pending.get(key)
+            if pending is None:
+                self._pending[key] = _PendingClip(now)
+            else:
+                pending.last_event = now
+                pending.events += 1
+                self.coalesced += 1
+
+    def moved(self, src_path: Path, dest_path: Path) -> None:
+        """Follow a rename: forget the source and settle the destination"""
+        with self._lock:
+            self._pending.pop(str(src_path), None)
+        self.touch(dest_path)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.poll_interval):
+            for path in self._collect_settled():
+                try:
+                    self.on_settled(path)
+                except Exception as e:
+                    print(f"❌ Error releasing settled clip {path.name}: {e}")
+
+    def _collect_settled(self) -> List[Path]:
+        now = time.monotonic()
+        settled = []
+        with self._lock:
+            items = list(self._pending.items())
+
+        for key, pending in items:
+            try:
+                st = os.stat(key)
+            except OSError:
+                # Deleted or renamed away before it settled
+                with self._lock:
+                    self._pending.pop(key, None)
+                continue
+
+            signature = (st.st_size, st.st_mtime_ns)
+            if self._released.get(key) == signature:
+                with self._lock:
+                    self._pending.pop(key, None)
+                continue
+
+            if (st.st_size, st.st_mtime_ns) != (pending.size, pending.mtime):
+                pending.size, pending.mtime = signature
+                pending.last_change = now
+                continue
+
+            quiet = now - max(pending.last_change, pending.last_event) >= self.quiet_period
+            timed_out = now - pending.first_seen >= self.max_wait
+            if not timed_out and not (quiet and st.st_size > 0 and self._is_released_by_writer(key)):
+                continue
+
+            if timed_out and not quiet:
+                self.forced += 1
+                print(f"⚠️ Clip still changing after {self.max_wait}s, processing anyway: {Path(key).name}")
+
+            with self._lock:
+                self._pending.pop(key, None)
+                self._released[key] = signature
+                self._released.move_to_end(key)
+                while len(self._released) > self.remember:
+                    self._released.popitem(last=False)
+            self.released += 1
+            settled.append(Path(key))
+
+        return settled
+
+    @staticmethod
+    def _is_released_by_writer(path: str) -> bool:
+        """
+        Best-effort check that no other process still has the file open.
+
+        Windows refuses to rename a file another process holds open, so an
+        in-place rename is a cheap exclusivity probe there. POSIX has no
+        equivalent, so size stability alone decides.
+        """
+        if os.name != "nt":
+            return True
+        try:
+            os.rename(path, path)
+            return True
+        except OSError:
+            return False
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            pending = len(self._pending)
+        return {
+            "pending": pending,
+            "coalesced_events": self.coalesced,
+            "released": self.released,
+            "forced_after_max_wait": self.forced,
+            "quiet_period_seconds": self.quiet_period,
+            "max_wait_seconds": self.max_wait,
+        }
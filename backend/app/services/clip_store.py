@@ -0,0 +1,196 @@
+"""
+ClipConductor AI - Clip Store
+Content-addressed storage for clip files with zero-copy ingest and reference-counted removal
+"""
+
+import asyncio
+import errno
+import os
+import shutil
+import sys
+import uuid
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, Dict, Optional
+from app.core.config import settings
+from app.services.upload_service import new_content_hasher
+import logging
+
+logger = logging.getLogger(__name__)
+
+FICLONE = 0x40049409  # linux/fs.h, clone a whole file (btrfs, XFS with reflink, overlay on those)
+HASH_BLOCK_SIZE = 4 * 1024 * 1024
+
+
+def hash_file(path: str) -> str:
+    """blake2b-256 of a file, same digest as uploads compute while streaming"""
+    hasher = new_content_hasher()
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(HASH_BLOCK_SIZE)
+            if not block:
+                return hasher.hexdigest()
+            hasher.update(block)
+
+
+def _reflink(src: str, dst: str) -> None:
+    if sys.platform != "linux":
+        raise OSError(errno.EOPNOTSUPP, "reflink not supported on this platform")
+    import fcntl
+    with open(src, "rb") as s, open(dst, "wb") as d:
+        try:
+            fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+        except OSError:
+            d.close()
+            os.remove(dst)
+            raise
+
+
+class ClipStore:
+    """
+    Clip files stored once per content hash.
+
+    Objects live at ``<root>/<hash[:2]>/<hash>``, so the same content under
+    another name or extension is still one object; the clip row keeps the
+    original name (``original_file_path``). Ingest never copies
+    bytes when it can avoid it: a file we own (a finished upload) is renamed
+    into place, a file that must stay where it is (a watch folder) is
+    reflinked, else hardlinked, and only copied across filesystems. Ingesting
+    content that is already stored leaves the existing object alone.
+
+    The database is the reference count: an object is removed once no Clip
+    row points at it. Ingest and release of the same hash are serialised
+    with a per-hash lock so a delete cannot race a new reference in this
+    process.
+    """
+
+    def __init__(self, root: Optional[str] = None, link_mode: Optional[str] = None):
+        self.root = Path(root or settings.CLIP_STORE_DIRECTORY or os.path.join(settings.OUTPUT_DIRECTORY, "store"))
+        self.link_mode = link_mode or settings.CLIP_STORE_LINK_MODE
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._lock_users: Dict[str, int] = {}  # holders and waiters per hash, the lock is dropped at zero
+        self.stats_counts = {"ingested": 0, "deduplicated": 0, "released": 0,
+                             "rename": 0, "reflink": 0, "hardlink": 0, "copy": 0}
+
+    def object_path(self, content_hash: str) -> Path:
+        return self.root / content_hash[:2] / content_hash
+
+    def temp_path(self, suffix: str = "") -> Path:
+        """Staging path on the store's filesystem, so a finished upload is renamed, not copied"""
+        return self.root / "tmp" / f"{uuid.uuid4().hex}{suffix.lower()}"
+
+    def contains(self, path: Optional[str]) -> bool:
+        if not path:
+            return False
+        try:
+            resolved = Path(path).resolve()
+            return resolved.parent.parent == self.root.resolve() and resolved.name[:2] == resolved.parent.name
+        except OSError:
+            return False
+
+    @asynccontextmanager
+    async def lock(self, content_hash: str):
+        """Hold the per-hash lock; the entry is removed once nobody holds or waits for it"""
+        lock = self._locks.get(content_hash)
+        if lock is None:
+            lock = self._locks[content_hash] = asyncio.Lock()
+        self._lock_users[content_hash] = self._lock_users.get(content_hash, 0) + 1
+        try:
+            async with lock:
+                yield
+        finally:
+            self._lock_users[content_hash] -= 1
+            if not self._lock_users[content_hash]:
+                del self._lock_users[content_hash]
+                del self._locks[content_hash]
+
+    def _place(self, src: str, dst: Path, move: bool) -> str:
+        """Materialise src at dst with the cheapest method available, returns the method used"""
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        if move:
+            try:
+                os.replace(src, dst)
+                return "rename"
+            except OSError as e:
+                if e.errno != errno.EXDEV:
+                    raise
+        # Link into a temp name first so a half-made object is never visible
+        tmp = dst.with_name(f".{dst.name}.{uuid.uuid4().hex[:8]}")
+        methods = ["copy"] if self.link_mode == "copy" else ["reflink", "hardlink", "copy"]
+        for method in methods:
+            try:
+                if method == "reflink":
+                    _reflink(src, str(tmp))
+                elif method == "hardlink":
+                    os.link(src, tmp)
+                else:
+                    shutil.copyfile(src, tmp)
+                break
+            except OSError as e:
+                if method == "copy":
+                    raise
+                logger.debug(f"{method} failed for {src}: {e}")
+        os.replace(tmp, dst)
+        if move:
+            os.remove(src)
+        return method
+
+    def _ingest(self, src: str, content_hash: Optional[str], move: bool) -> Dict[str, Any]:
+        content_hash = content_hash or hash_file(src)
+        size = os.path.getsize(src)
+        dst = self.object_path(content_hash)
+        deduplicated = dst.exists()
+        if deduplicated:
+            method = "existing"
+            if move:
+                os.remove(src)
+        else:
+            method = self._place(src, dst, move)
+            self.stats_counts[method] += 1
+        self.stats_counts["deduplicated" if deduplicated else "ingested"] += 1
+        return {"path": str(dst), "content_hash": content_hash, "size": size,
+                "method": method, "deduplicated": deduplicated}
+
+    async def ingest(self, src: str, content_hash: Optional[str] = None, move: bool = False) -> Dict[str, Any]:
+        """
+        Store a file by content hash.
+
+        ``move=True`` hands the file over to the store (uploads); otherwise
+        the source is left in place (watched folders). Pass the hash when it
+        is already known to skip reading the file.
+        """
+        async with self.ingesting(src, content_hash, move) as stored:
+            return stored
+
+    @asynccontextmanager
+    async def ingesting(self, src: str, content_hash: Optional[str] = None, move: bool = False):
+        """Like ingest, but keeps the hash locked until the caller has committed its reference"""
+        if content_hash is None:
+            content_hash = await asyncio.to_thread(hash_file, src)
+        async with self.lock(content_hash):
+            yield await asyncio.to_thread(self._ingest, src, content_hash, move)
+
+    async def release(self, path: str) -> bool:
+        """Remove a stored object; call with lock(hash) held, after the last referencing row is gone"""
+        if not self.contains(path):
+            return False
+        try:
+            await asyncio.to_thread(os.remove, path)
+        except FileNotFoundError:
+            return False
+        self.stats_counts["released"] += 1
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        return {"root": str(self.root), **self.stats_counts}
+
+
+_clip_store: Optional[ClipStore] = None
+
+
+def get_clip_store() -> ClipStore:
+    """Return the process-wide clip store"""
+    global _clip_store
+    if _clip_store is None:
+        _clip_store = ClipStore()
+    return _clip_store
@@ -4,13 +4,24 @@ Monitors the Outplayed folder for new gaming clips and processes them automatica
 """
 
 import asyncio
+import copy
+import hashlib
+import os
 import re
 from pathlib import Path
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Tuple
 from datetime import datetime
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
-from app.services.ai_service_ollama import AIService
+from app.core.config import settings
+from app.services.admission import Priority
+from app.services.ai_service_ollama import AIService, OllamaService
+from app.services.batch_processor import BatchProcessor
+from app.services.clip_dedup import ClipDeduplicator
+from app.services.clip_index import ClipIndex
+from app.services.clip_settler import ClipSettler
+from app.services.event_bridge import ThreadToLoopBridge
+from app.services.video_probe import duration_seconds, get_video_probe
 from app.models.schemas import ClipStatus
 
 
@@ -21,14 +32,28 @@ class OutplayedClipHandler(FileSystemEventHandler):
         self.clip_processor = clip_processor
         self.video_extensions = {'.mp4', '.mov', '.avi', '.mkv'}
     
+    def _is_clip(self, path: str) -> bool:
+        return Path(path).suffix.lower() in self.video_extensions
+    
     def on_created(self, event):
         """Handle new file creation"""
-        if not event.is_directory:
+        if not event.is_directory and self._is_clip(event.src_path):
             file_path = Path(event.src_path)
-            if file_path.suffix.lower() in self.video_extensions:
-                print(f"📹 New clip detected: {file_path.name}")
-                # Queue for processing
-                asyncio.create_task(self.clip_processor.process_new_clip(file_path))
+            print(f"📹 New clip detected: {file_path.name}")
+            # Runs on the observer thread; the settler releases it once written
+            self.clip_processor.clip_settler.touch(file_path)
+    
+    def on_modified(self, event):
+        """Coalesce write bursts while the recorder is still writing"""
+        if not event.is_directory and self._is_clip(event.src_path):
+            self.clip_processor.clip_settler.touch(Path(event.src_path))
+    
+    def on_moved(self, event):
+        """Handle recorders that write to a temp name and rename when done"""
+        if event.is_directory:
+            return
+        if self._is_clip(event.dest_path):
+            self.clip_processor.clip_settler.moved(Path(event.src_path), Path(event.dest_path))
 
 
 class ClipsMonitor:
@@ -36,9 +61,36 @@ class ClipsMonitor:
     
     def __init__(self, outplayed_path: str = "E:\\contentio\\Outplayed"):
         self.outplayed_path = Path(outplayed_path)
-        self.ai_service = AIService()
+        # Monitor and batch work must never starve interactive dashboard calls
+        self.ai_service = AIService(OllamaService(priority=Priority.BACKGROUND))
         self.observer = Observer()
         self.is_monitoring = False
+        self.clip_index = ClipIndex(
+            str(self.outplayed_path),
+            index_path=self._index_path_for(self.outplayed_path),
+            settle_seconds=settings.CLIP_SETTLE_QUIET_PERIOD
+        )
+        self.video_probe = get_video_probe()
+        self.deduplicator = ClipDeduplicator() if settings.CLIP_DEDUP_ENABLED else None
+        self._clips: List[Dict[str, Any]] = []
+        self._clips_version = -1
+        self.event_bridge: Optional[ThreadToLoopBridge] = None
+        self.clip_settler = ClipSettler(
+            self.enqueue_clip,
+            quiet_period=settings.CLIP_SETTLE_QUIET_PERIOD,
+            max_wait=settings.CLIP_SETTLE_MAX_WAIT,
+            poll_interval=settings.CLIP_SETTLE_POLL_INTERVAL
+        )
+    
+    @staticmethod
+    def _index_path_for(root: Path) -> str:
+        """Location of the persisted clip index for a watch folder"""
+        if settings.CLIP_INDEX_DIRECTORY:
+            index_dir = settings.CLIP_INDEX_DIRECTORY
+        else:
+            index_dir = os.path.join(settings.OUTPUT_DIRECTORY, "index")
+        digest = hashlib.sha1(str(root).encode("utf-8")).hexdigest()[:12]
+        return os.path.join(index_dir, f"clips_{digest}.json")
         
     def parse_outplayed_filename(self, filename: str) -> Dict[str, Any]:
         """
@@ -94,23 +146,31 @@ class ClipsMonitor:
     
     async def scan_existing_clips(self) -> List[Dict[str, Any]]:
         """Scan existing clips in the Outplayed folder"""
-        clips = []
-        
         if not self.outplayed_path.exists():
             print(f"❌ Outplayed path not found: {self.outplayed_path}")
-            return clips
-            
-        print(f"🔍 Scanning for clips in: {self.outplayed_path}")
+            return []
         
-        for file_path in self.outplayed_path.rglob("*.mp4"):
-            clip_info = self.parse_outplayed_filename(file_path.name)
-            clip_info["file_path"] = str(file_path)
-            clip_info["file_size"] = file_path.stat().st_size
-            clip_info["status"] = ClipStatus.READY
-            clips.append(clip_info)
+        # Incremental refresh only lists directories whose mtime changed
+        await asyncio.to_thread(self.clip_index.refresh)
+        
+        if self._clips_version != self.clip_index.version:
+            entries = self.clip_index.entries()
+            # Container metadata for all clips at once, cached by (path, size, mtime)
+            probes = await asyncio.to_thread(self.video_probe.probe_many, entries)
+            clips = []
+            for entry in entries:
+                clip_info = self.parse_outplayed_filename(entry["name"])
+                clip_info["file_path"] = entry["path"]
+                clip_info["file_size"] = entry["size"]
+                clip_info["duration"] = duration_seconds(probes.get(entry["path"]))
+                clip_info["video"] = probes.get(entry["path"])
+                clip_info["status"] = ClipStatus.READY
+                clips.append(clip_info)
+            self._clips = clips
+            self._clips_version = self.clip_index.version
+            print(f"📊 Indexed {len(clips)} video clips in: {self.outplayed_path}")
         
-        print(f"📊 Found {len(clips)} video clips")
-        return clips
+        return list(self._clips)
     
     async def generate_clip_metadata(self, clip_info: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Generate AI metadata for a gaming clip"""
@@ -128,7 +188,7 @@ class ClipsMonitor:
             metadata = await self.ai_service.metadata_service.generate_gaming_metadata(
                 clip_title=clip_title,
                 game_name=game_name,
-                clip_duration=None  # Could extract from video file later
+                clip_duration=clip_info.get("duration")
             )
             
             return metadata
@@ -137,6 +197,39 @@ class ClipsMonitor:
             print(f"❌ Error generating metadata for {clip_info['original_filename']}: {e}")
             return None
     
+    async def generate_or_reuse_metadata(self, clip_info: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Reuse the metadata of a near-duplicate clip, otherwise generate it"""
+        if not self.deduplicator:
+            return await self.generate_clip_metadata(clip_info)
+        
+        file_path = clip_info["file_path"]
+        try:
+            fingerprint = await asyncio.to_thread(
+                self.deduplicator.fingerprint, file_path, clip_info.get("duration")
+            )
+        except Exception as e:
+            print(f"⚠️ Could not fingerprint {clip_info['original_filename']}: {e}")
+            return await self.generate_clip_metadata(clip_info)
+        
+        match = self.deduplicator.find_duplicate(fingerprint, exclude=file_path)
+        original = self.deduplicator.get(match[0]) if match else None
+        if original and original.get("metadata"):
+            source = original.get("duplicate_of") or match[0]
+            clip_info["duplicate_of"] = source
+            print(f"♻️ Near-duplicate of {Path(source).name} (distance {match[1]:.1f}), reusing metadata")
+            self.deduplicator.add(file_path, fingerprint, original["metadata"], duplicate_of=source)
+            metadata = copy.deepcopy(original["metadata"])
+        else:
+            metadata = await self.generate_clip_metadata(clip_info)
+            if metadata:
+                self.deduplicator.add(file_path, fingerprint, metadata)
+        
+        try:
+            await asyncio.to_thread(self.deduplicator.save)
+        except OSError as e:
+            print(f"⚠️ Could not persist dedup index: {e}")
+        return metadata
+    
     async def process_new_clip(self, file_path: Path) -> Optional[Dict[str, Any]]:
         """Process a newly detected clip"""
         try:
@@ -145,9 +238,11 @@ class ClipsMonitor:
             clip_info = self.parse_outplayed_filename(file_path.name)
             clip_info["file_path"] = str(file_path)
             clip_info["file_size"] = file_path.stat().st_size
+            clip_info["video"] = await asyncio.to_thread(self.video_probe.probe, str(file_path))
+            clip_info["duration"] = duration_seconds(clip_info["video"])
             
-            # Generate AI metadata
-            metadata = await self.generate_clip_metadata(clip_info)
+            # Generate AI metadata (or link to a near-duplicate's)
+            metadata = await self.generate_or_reuse_metadata(clip_info)
             
             if metadata:
                 print(f"✅ Generated metadata for: {clip_info['game_name']} clip")
@@ -158,7 +253,7 @@ class ClipsMonitor:
                 return {
                     "clip_info": clip_info,
                     "metadata": metadata,
-                    "status": "processed"
+                    "status": "duplicate" if clip_info.get("duplicate_of") else "processed"
                 }
             else:
                 print(f"⚠️ Failed to generate metadata for: {file_path.name}")
@@ -168,12 +263,47 @@ class ClipsMonitor:
             print(f"❌ Error processing clip {file_path.name}: {e}")
             return None
     
-    def start_monitoring(self):
-        """Start monitoring the Outplayed folder"""
+    def enqueue_clip(self, file_path: Path) -> bool:
+        """Queue a settled clip for processing, safe to call from any thread"""
+        if not self.event_bridge:
+            print(f"⚠️ Monitor not running, ignoring: {file_path.name}")
+            return False
+        return self.event_bridge.submit(file_path)
+    
+    def get_event_metrics(self) -> Dict[str, Any]:
+        """Queue depth and drop counters of the new-clip pipeline"""
+        if not self.event_bridge:
+            return {"running": False, "settler": self.clip_settler.metrics()}
+        metrics = self.event_bridge.metrics()
+        metrics["settler"] = self.clip_settler.metrics()
+        if self.deduplicator:
+            metrics["dedup"] = self.deduplicator.stats()
+        return metrics
+    
+    def start_monitoring(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        """Start monitoring the Outplayed folder, call from the event loop thread"""
         if not self.outplayed_path.exists():
             print(f"❌ Cannot monitor - path does not exist: {self.outplayed_path}")
             return False
         
+        if loop is None:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                print("❌ Cannot monitor - no running event loop to process clips on")
+                return False
+        
+        self.event_bridge = ThreadToLoopBridge(
+            self.process_new_clip,
+            loop,
+            workers=settings.CLIP_EVENT_WORKERS,
+            maxsize=settings.CLIP_EVENT_QUEUE_SIZE,
+            enqueue_timeout=settings.CLIP_EVENT_ENQUEUE_TIMEOUT,
+            name="clip events"
+        )
+        self.event_bridge.start()
+        self.clip_settler.start()
+        
         handler = OutplayedClipHandler(self)
         self.observer.schedule(handler, str(self.outplayed_path), recursive=True)
         self.observer.start()
@@ -188,19 +318,36 @@ class ClipsMonitor:
         if self.observer.is_alive():
             self.observer.stop()
             self.observer.join()
+        self.clip_settler.stop()
+        if self.event_bridge:
+            self.event_bridge.stop()
         self.is_monitoring = False
         print("⏹️ Stopped clip monitoring")
     
-    async def process_clip_batch(self, limit: int = 5) -> List[Dict[str, Any]]:
-        """Process a batch of existing clips for testing"""
+    async def run_clip_batch(
+        self,
+        limit: int = 5,
+        concurrency: Optional[int] = None,
+        item_timeout: Optional[float] = None,
+        ordered: bool = True
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """Generate metadata for a batch of existing clips concurrently, returns (results, stats)"""
         clips = await self.scan_existing_clips()
-        processed = []
+        batch = clips[:limit]
         
-        print(f"🔄 Processing {min(limit, len(clips))} clips...")
+        processor = BatchProcessor(
+            self.generate_or_reuse_metadata,
+            concurrency=concurrency or settings.CLIP_BATCH_CONCURRENCY,
+            max_in_flight=settings.CLIP_BATCH_MAX_IN_FLIGHT,
+            item_timeout=item_timeout or settings.CLIP_BATCH_ITEM_TIMEOUT
+        )
         
-        for clip_info in clips[:limit]:
-            print(f"\n📹 Processing: {clip_info['original_filename']}")
-            metadata = await self.generate_clip_metadata(clip_info)
+        print(f"🔄 Processing {len(batch)} clips with {processor.concurrency} workers...")
+        
+        processed = []
+        async for outcome in processor.iter_results(batch, ordered=ordered):
+            clip_info = outcome["item"]
+            metadata = outcome["result"]
             
             if metadata:
                 processed.append({
@@ -209,12 +356,31 @@ class ClipsMonitor:
                 })
                 print(f"✅ Generated: {metadata.get('title', 'N/A')}")
             else:
-                print(f"❌ Failed to process: {clip_info['original_filename']}")
+                reason = outcome["error"] or "no metadata"
+                print(f"❌ Failed to process: {clip_info['original_filename']} ({reason})")
         
-        print(f"\n🎯 Successfully processed {len(processed)}/{limit} clips")
+        stats = processor.stats()
+        print(f"\n🎯 Successfully processed {len(processed)}/{len(batch)} clips "
+              f"({stats['items_per_second']} clips/s)")
+        return processed, stats
+    
+    async def process_clip_batch(self, limit: int = 5) -> List[Dict[str, Any]]:
+        """Process a batch of existing clips for testing"""
+        processed, _ = await self.run_clip_batch(limit=limit)
         return processed
 
 
+_shared_monitor: Optional[ClipsMonitor] = None
+
+
+def get_clips_monitor() -> ClipsMonitor:
+    """Return the process-wide monitor so the clip index stays warm between requests"""
+    global _shared_monitor
+    if _shared_monitor is None:
+        _shared_monitor = ClipsMonitor()
+    return _shared_monitor
+
+
 # Example usage
 if __name__ == "__main__":
     async def main():
@@ -0,0 +1,131 @@
+"""
+ClipConductor AI - Event Bridge
+Hands items from foreign threads (e.g. the watchdog observer) to async workers on an asyncio loop
+"""
+
+import asyncio
+import concurrent.futures
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+
+class ThreadToLoopBridge:
+    """
+    Bounded queue between a producer thread and a pool of async workers.
+
+    ``submit()`` is safe to call from any thread. It schedules the put on the
+    loop with ``run_coroutine_threadsafe`` and blocks the calling thread while
+    the queue is full, so bursts are absorbed by backpressure on the producer
+    (watchdog keeps buffering events meanwhile) instead of being lost. Only
+    when the queue stays full for ``enqueue_timeout`` seconds is an item
+    dropped and counted.
+    """
+
+    def __init__(self,
+                 handler: Callable[[Any], Awaitable[Any]],
+                 loop: asyncio.AbstractEventLoop,
+                 workers: int = 2,
+                 maxsize: int = 256,
+                 enqueue_timeout: float = 5.0,
+                 name: str = "events"):
+        self.handler = handler
+        self.loop = loop
+        self.workers = max(1, workers)
+        self.maxsize = maxsize
+        self.enqueue_timeout = enqueue_timeout
+        self.name = name
+        self.queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self.enqueued = 0
+        self.processed = 0
+        self.failed = 0
+        self.dropped = 0
+        self.max_depth = 0
+        self.last_latency = 0.0
+
+    def start(self) -> None:
+        """Create the queue and workers, must be called on the loop thread"""
+        if self._tasks:
+            return
+        self.queue = asyncio.Queue(maxsize=self.maxsize)
+        self._tasks = [
+            self.loop.create_task(self._worker(i)) for i in range(self.workers)
+        ]
+
+    def stop(self) -> None:
+        """Cancel the workers, safe to call from any thread"""
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            self.loop.call_soon_threadsafe(task.cancel)
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    async def _put(self, item: Any) -> None:
+        await self.queue.put((time.monotonic(), item))
+        self.enqueued += 1
+        self.max_depth = max(self.max_depth, self.queue.qsize())
+
+    def _on_loop_thread(self) -> bool:
+        try:
+            return asyncio.get_running_loop() is self.loop
+        except RuntimeError:
+            return False
+
+    def submit(self, item: Any) -> bool:
+        """Enqueue an item from a non-loop thread, returns False if it was dropped"""
+        if not self.running or self.loop.is_closed():
+            self.dropped += 1
+            return False
+
+        if self._on_loop_thread():
+            # Blocking here would deadlock the loop, so only take free slots
+            try:
+                self.queue.put_nowait((time.monotonic(), item))
+            except asyncio.QueueFull:
+                self.dropped += 1
+                return False
+            self.enqueued += 1
+            self.max_depth = max(self.max_depth, self.queue.qsize())
+            return True
+
+        future = asyncio.run_coroutine_threadsafe(self._put(item), self.loop)
+        try:
+            future.result(timeout=self.enqueue_timeout)
+            return True
+        except (concurrent.futures.TimeoutError, concurrent.futures.CancelledError, RuntimeError):
+            future.cancel()
+            self.dropped += 1
+            print(f"⚠️ {self.name} queue full, dropped: {item}")
+            return False
+
+    async def _worker(self, worker_id: int) -> None:
+        while True:
+            queued_at, item = await self.queue.get()
+            try:
+                await self.handler(item)
+                self.processed += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failed += 1
+                print(f"❌ {self.name} worker {worker_id} failed on {item}: {e}")
+            finally:
+                self.last_latency = time.monotonic() - queued_at
+                self.queue.task_done()
+
+    def metrics(self) -> Dict[str, Any]:
+        """Queue depth and counters for health/metrics endpoints"""
+        return {
+            "running": self.running,
+            "workers": self.workers,
+            "queue_depth": self.queue.qsize() if self.queue else 0,
+            "queue_capacity": self.maxsize,
+            "max_queue_depth": self.max_depth,
+            "enqueued": self.enqueued,
+            "processed": self.processed,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "last_latency_seconds": round(self.last_latency, 3),
+        }
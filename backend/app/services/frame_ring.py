@@ -0,0 +1,211 @@
+"""
+ClipConductor AI - Shared-Memory Frame Ring
+Fixed-slot frame buffer in shared memory so decoder and inference processes exchange frames without pickling
+"""
+
+import multiprocessing
+import queue
+import time
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+
+RingItem = Tuple[int, np.ndarray, Any]  # (slot, frame view, metadata)
+
+
+class FrameRing:
+    """
+    Ring of ``slots`` frame buffers of ``frame_shape`` in one shared memory block.
+
+    Ownership of a slot moves through two queues that only carry small
+    tuples: a writer takes a slot id from ``free``, copies its frame into
+    the slot and announces it on ``ready``; a reader gets a NumPy view of
+    the slot (no copy), uses it and hands the id back with ``release``.
+    When every slot is in use the writer blocks, which is the backpressure
+    from slow inference to the decoder.
+
+    The ring is picklable and must reach other processes as a ``Process``
+    argument (or pool initializer argument), like any multiprocessing queue.
+    """
+
+    def __init__(self, slots: int, frame_shape: Tuple[int, ...], dtype=np.uint8, context=None):
+        context = context or multiprocessing.get_context("spawn")
+        self.slots = slots
+        self.frame_shape = tuple(frame_shape)
+        self.dtype = np.dtype(dtype)
+        self.slot_bytes = int(np.prod(self.frame_shape)) * self.dtype.itemsize
+        self.shm = SharedMemory(create=True, size=max(1, self.slot_bytes * slots))
+        self.free = context.Queue()
+        self.ready = context.Queue()
+        self._owner = True
+        self.write_stalls = 0
+        for slot in range(slots):
+            self.free.put(slot)
+        self._array = self._map()
+
+    def _map(self) -> np.ndarray:
+        return np.ndarray((self.slots,) + self.frame_shape, dtype=self.dtype, buffer=self.shm.buf)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {
+            "name": self.shm.name,
+            "slots": self.slots,
+            "frame_shape": self.frame_shape,
+            "dtype": self.dtype.str,
+            "slot_bytes": self.slot_bytes,
+            "free": self.free,
+            "ready": self.ready,
+        }
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.slots = state["slots"]
+        self.frame_shape = tuple(state["frame_shape"])
+        self.dtype = np.dtype(state["dtype"])
+        self.slot_bytes = state["slot_bytes"]
+        self.free = state["free"]
+        self.ready = state["ready"]
+        # Spawned children share the parent's resource tracker, so attaching
+        # here does not make the block go away when this process exits
+        self.shm = SharedMemory(name=state["name"])
+        self._owner = False
+        self.write_stalls = 0
+        self._array = self._map()
+
+    # Writer side
+
+    def write(self, frame: np.ndarray, meta: Any = None, timeout: Optional[float] = None) -> int:
+        """Copy a frame into a free slot, blocking while the ring is full"""
+        h, w = frame.shape[:2]
+        if h > self.frame_shape[0] or w > self.frame_shape[1] or frame.shape[2:] != self.frame_shape[2:]:
+            raise ValueError(f"Frame of shape {frame.shape} does not fit ring slots of {self.frame_shape}")
+        try:
+            slot = self.free.get_nowait()
+        except queue.Empty:
+            self.write_stalls += 1
+            slot = self.free.get(timeout=timeout)
+        self._array[slot, :h, :w] = frame
+        self.ready.put((slot, h, w, meta))
+        return slot
+
+    def close_writer(self, error: Optional[BaseException] = None) -> None:
+        """Tell the reader no more frames will come; after an `error` the reader raises instead"""
+        self.ready.put(None if error is None else (f"{type(error).__name__}: {error}",))
+
+    # Reader side
+
+    def read(self, timeout: Optional[float] = None) -> Optional[RingItem]:
+        """Next (slot, view, meta), or None at end of stream; raises queue.Empty on timeout"""
+        item = self.ready.get(timeout=timeout)
+        if item is None:
+            return None
+        if len(item) == 1:
+            raise Exception(f"Frame writer failed: {item[0]}")
+        slot, h, w, meta = item
+        return slot, self._array[slot, :h, :w], meta
+
+    def release(self, slot: int) -> None:
+        """Return a slot to the writer; views of it must not be used afterwards"""
+        self.free.put(slot)
+
+    def close(self) -> None:
+        self._array = None
+        try:
+            self.shm.close()
+        except BufferError:
+            # A caller still holds a view; the mapping goes away with it
+            pass
+        if self._owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def decode_into_ring(video_path: str, indices: Sequence[int], ring: FrameRing,
+                     max_width: Optional[int], strategy: str = "auto") -> None:
+    """Decoder process target: sample frames straight into ring slots"""
+    from app.services.frame_sampler import FrameSampler
+    error = None
+    try:
+        with FrameSampler(video_path, max_width=max_width) as sampler:
+            for index, timestamp, frame in sampler.iter_frames(indices, strategy=strategy):
+                ring.write(frame, (index, timestamp))
+    except Exception as e:
+        # e.g. a frame larger than the slots: fail the job rather than end the stream early
+        error = e
+        raise
+    finally:
+        ring.close_writer(error)
+        ring.close()
+
+
+class SharedFrameDecoder:
+    """
+    Decode sampled frames in a separate process while the caller consumes them.
+
+    Used as a context manager by inference code::
+
+        with SharedFrameDecoder(path, indices, shape, max_width) as source:
+            for batch in source.batches(8):
+                run_model([view for _, view, _ in batch])
+                source.release(batch)
+    """
+
+    def __init__(self, video_path: str, indices: Sequence[int], frame_shape: Tuple[int, ...],
+                 max_width: Optional[int] = None, slots: int = 16, read_timeout: float = 30.0):
+        self.video_path = video_path
+        self.indices = list(indices)
+        self.max_width = max_width
+        self.read_timeout = read_timeout
+        context = multiprocessing.get_context("spawn")
+        self.ring = FrameRing(slots, frame_shape, context=context)
+        self.process = context.Process(
+            target=decode_into_ring,
+            args=(video_path, self.indices, self.ring, max_width),
+            daemon=True,
+            name="frame-decoder",
+        )
+        self.frames = 0
+
+    def __enter__(self) -> "SharedFrameDecoder":
+        self.process.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process.join(timeout=5)
+        self.ring.close()
+
+    def __iter__(self) -> Iterator[RingItem]:
+        deadline = time.monotonic() + self.read_timeout
+        while True:
+            try:
+                item = self.ring.read(timeout=0.5)
+            except queue.Empty:
+                if not self.process.is_alive() and self.ring.ready.empty():
+                    raise Exception(f"Frame decoder exited early for {self.video_path}")
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"No frame from decoder within {self.read_timeout}s")
+                continue
+            if item is None:
+                return
+            self.frames += 1
+            deadline = time.monotonic() + self.read_timeout
+            yield item
+
+    def batches(self, size: int) -> Iterator[List[RingItem]]:
+        """Group frames into batches; at most `slots` frames can be held at once"""
+        size = max(1, min(size, self.ring.slots))
+        batch: List[RingItem] = []
+        for item in self:
+            batch.append(item)
+            if len(batch) == size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def release(self, batch: Sequence[RingItem]) -> None:
+        for slot, _, _ in batch:
+            self.ring.release(slot)
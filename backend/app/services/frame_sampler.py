@@ -0,0 +1,149 @@
+"""
+ClipConductor AI - Frame Sampler
+Reads sample frames from a video with the cheapest decode strategy for the sampling density
+"""
+
+from typing import Iterator, List, Optional, Sequence, Tuple
+import cv2
+import numpy as np
+from app.core.config import settings
+
+
+SampledFrame = Tuple[int, float, np.ndarray]  # (frame index, timestamp in seconds, BGR frame)
+
+
+class FrameSampler:
+    """
+    Sample frames from a video file without paying a keyframe decode per sample.
+
+    ``cap.set(CAP_PROP_POS_FRAMES)`` on H.264/HEVC decodes forward from the
+    previous keyframe, so seeking to many nearby samples decodes the same GOP
+    over and over. The sampler walks the targets in order and, for each gap,
+    either ``grab()``s forward (decode only, no colour conversion) or seeks:
+
+    * ``"sequential"`` - one forward pass, never seeks
+    * ``"seek"`` - always seeks, best for a handful of samples in a long clip
+    * ``"auto"`` - grabs forward when the gap is shorter than
+      ``seek_threshold`` seconds (about a GOP or two), seeks otherwise
+
+    Frames can be downscaled right after decode (``max_width``) so
+    full-resolution frames are never kept around.
+    """
+
+    STRATEGIES = ("auto", "sequential", "seek")
+
+    def __init__(self, video_path: str, max_width: Optional[int] = None,
+                 seek_threshold: Optional[float] = None):
+        self.video_path = video_path
+        self.max_width = max_width
+        self.seek_threshold = seek_threshold if seek_threshold is not None \
+            else settings.FRAME_SAMPLER_SEEK_THRESHOLD_SECONDS
+        self.cap = cv2.VideoCapture(video_path)
+        if not self.cap.isOpened():
+            raise Exception(f"Could not open video file: {video_path}")
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self.frame_count = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        self.duration = self.frame_count / self.fps if self.fps else 0.0
+        self.frames_decoded = 0
+        self.seeks = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+    def release(self) -> None:
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+
+    # Target selection
+
+    def evenly_spaced(self, count: int) -> List[int]:
+        """Indices of `count` frames spread across the whole clip"""
+        if self.frame_count <= 0 or count <= 0:
+            return []
+        step = max(1, self.frame_count // count)
+        return list(range(0, self.frame_count, step))[:count]
+
+    def every(self, interval_seconds: float, start: float = 0.0, end: Optional[float] = None) -> List[int]:
+        """Indices of one frame every `interval_seconds` between start and end"""
+        end = self.duration if end is None else min(end, self.duration)
+        times = np.arange(start, end, interval_seconds)
+        return self.at_times(times)
+
+    def at_times(self, timestamps: Sequence[float]) -> List[int]:
+        """Indices of the frames shown at the given timestamps"""
+        indices = np.clip(np.round(np.asarray(timestamps, dtype=np.float64) * self.fps), 0,
+                          max(0, self.frame_count - 1)).astype(np.int64)
+        return sorted(set(indices.tolist()))
+
+    # Decoding
+
+    def choose_threshold(self, strategy: str) -> int:
+        """Largest gap in frames that is cheaper to grab through than to seek over"""
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"Unknown sampling strategy: {strategy}")
+        if strategy == "sequential":
+            return max(1, self.frame_count)
+        if strategy == "seek":
+            return 0
+        return max(1, int(self.seek_threshold * self.fps))
+
+    def iter_frames(self, indices: Sequence[int], strategy: str = "auto",
+                    max_width: Optional[int] = None) -> Iterator[SampledFrame]:
+        """Yield (index, timestamp, frame) for the requested frame indices in order"""
+        threshold = self.choose_threshold(strategy)
+        max_width = max_width or self.max_width
+        position = int(self.cap.get(cv2.CAP_PROP_POS_FRAMES))
+
+        for index in sorted(set(int(i) for i in indices)):
+            gap = index - position
+            if gap < 0 or gap > threshold:
+                self.cap.set(cv2.CAP_PROP_POS_FRAMES, index)
+                self.seeks += 1
+            else:
+                for _ in range(gap):
+                    if not self.cap.grab():
+                        return
+                    self.frames_decoded += 1
+
+            ok, frame = self.cap.read()
+            if not ok:
+                return
+            self.frames_decoded += 1
+            position = index + 1
+            yield index, index / self.fps, self._resize(frame, max_width)
+
+    def sample(self, count: Optional[int] = None, interval_seconds: Optional[float] = None,
+               timestamps: Optional[Sequence[float]] = None, strategy: str = "auto",
+               max_width: Optional[int] = None) -> List[SampledFrame]:
+        """Read samples selected by count, fixed interval or explicit timestamps"""
+        if timestamps is not None:
+            indices = self.at_times(timestamps)
+        elif interval_seconds:
+            indices = self.every(interval_seconds)
+        else:
+            indices = self.evenly_spaced(count or 10)
+        return list(self.iter_frames(indices, strategy=strategy, max_width=max_width))
+
+    def output_shape(self, max_width: Optional[int] = None) -> Tuple[int, int, int]:
+        """(height, width, channels) of the frames iter_frames will yield"""
+        width, height = self._scaled_size(self.width, self.height, max_width or self.max_width)
+        return height, width, 3
+
+    @staticmethod
+    def _scaled_size(width: int, height: int, max_width: Optional[int]) -> Tuple[int, int]:
+        if not max_width or width <= max_width:
+            return width, height
+        return max_width, int(round(height * max_width / width))
+
+    @classmethod
+    def _resize(cls, frame: np.ndarray, max_width: Optional[int]) -> np.ndarray:
+        size = cls._scaled_size(frame.shape[1], frame.shape[0], max_width)
+        if size == (frame.shape[1], frame.shape[0]):
+            return frame
+        return cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
@@ -0,0 +1,293 @@
+"""
+ClipConductor AI - Highlight Detector
+Scores a clip from motion, audio and object-density signals and picks highlight moments
+"""
+
+import shutil
+import subprocess
+from typing import Any, Dict, List, Optional, Tuple
+import cv2
+import numpy as np
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.models.database import Clip as ClipModel
+from app.services.analysis_pool import get_analysis_pool
+from app.services.detector import BatchDetector, Detections
+from app.services.frame_sampler import FrameSampler
+import logging
+
+logger = logging.getLogger(__name__)
+
+EVENT_TYPES = {"motion": "action", "audio": "audio_peak", "objects": "fight"}
+CLIP_TITLES = {"motion": "Intense Action", "audio": "Big Moment", "objects": "Team Fight"}
+
+
+def find_ffmpeg() -> Optional[str]:
+    """ffmpeg on PATH, or the binary bundled with moviepy's imageio-ffmpeg"""
+    path = shutil.which("ffmpeg")
+    if path:
+        return path
+    try:
+        import imageio_ffmpeg
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    except Exception:
+        return None
+
+
+def normalize(signal: np.ndarray) -> np.ndarray:
+    """Scale to 0..1 between the 5th and 95th percentile, robust to a few extreme frames"""
+    if signal.size == 0:
+        return signal.astype(np.float32)
+    low, high = np.percentile(signal, [5, 95])
+    if high - low < 1e-9:
+        return np.zeros_like(signal, dtype=np.float32)
+    return np.clip((signal - low) / (high - low), 0.0, 1.0).astype(np.float32)
+
+
+def smooth(signal: np.ndarray, window: int) -> np.ndarray:
+    if window <= 1 or signal.size < window:
+        return signal
+    kernel = np.ones(window, dtype=np.float32) / window
+    return np.convolve(signal, kernel, mode="same")
+
+
+def pick_peaks(score: np.ndarray, min_distance: int, threshold: float, top_k: int) -> np.ndarray:
+    """
+    Indices of local maxima above `threshold`, best first, with non-maximum
+    suppression: a peak closer than `min_distance` samples to a stronger one
+    is dropped.
+    """
+    if score.size < 3:
+        return np.empty(0, dtype=np.int64)
+    interior = (score[1:-1] >= score[:-2]) & (score[1:-1] > score[2:]) & (score[1:-1] >= threshold)
+    candidates = np.flatnonzero(interior) + 1
+    candidates = candidates[np.argsort(-score[candidates], kind="stable")]
+
+    kept: List[int] = []
+    for index in candidates:
+        if all(abs(index - k) >= min_distance for k in kept):
+            kept.append(int(index))
+            if len(kept) >= top_k:
+                break
+    return np.asarray(kept, dtype=np.int64)
+
+
+class HighlightDetector:
+    """
+    CPU highlight detection on a low-rate timeline.
+
+    The clip is sampled at ``sample_fps`` with frames downscaled to
+    ``analysis_width``. Three signals are computed over the whole timeline
+    at once:
+
+    * motion - mean absolute difference between consecutive grey frames
+    * audio - RMS per sample window plus positive RMS jumps (onsets),
+      read through ffmpeg; skipped when ffmpeg is not available
+    * objects - YOLO detections per frame on every ``object_stride``-th
+      sample, interpolated onto the timeline
+
+    Signals are normalized, smoothed and fused with ``weights``; peaks are
+    chosen with non-maximum suppression.
+    """
+
+    def __init__(self,
+                 sample_fps: Optional[float] = None,
+                 analysis_width: Optional[int] = None,
+                 object_stride: Optional[int] = None,
+                 weights: Optional[Dict[str, float]] = None,
+                 moment_padding: Tuple[float, float] = (3.0, 2.0),
+                 clip_length: Optional[float] = None,
+                 min_gap: Optional[float] = None,
+                 max_moments: Optional[int] = None,
+                 audio_rate: int = 16000):
+        self.sample_fps = sample_fps or settings.HIGHLIGHT_SAMPLE_FPS
+        self.analysis_width = analysis_width or settings.HIGHLIGHT_ANALYSIS_WIDTH
+        self.object_stride = max(1, object_stride or settings.HIGHLIGHT_OBJECT_STRIDE)
+        self.weights = weights or dict(settings.HIGHLIGHT_SIGNAL_WEIGHTS)
+        self.moment_padding = moment_padding
+        self.clip_length = clip_length or settings.HIGHLIGHT_CLIP_LENGTH
+        self.min_gap = min_gap or settings.HIGHLIGHT_MIN_GAP
+        self.max_moments = max_moments or settings.HIGHLIGHT_MAX_MOMENTS
+        self.audio_rate = audio_rate
+
+    # Signal extraction
+
+    def sample_video(self, video_path: str) -> Tuple[np.ndarray, np.ndarray, List[np.ndarray], float]:
+        """Return (timestamps, grey frames, frames for object detection, duration)"""
+        times, greys, colour = [], [], []
+        with FrameSampler(video_path, max_width=self.analysis_width) as sampler:
+            duration = sampler.duration
+            for n, (_, timestamp, frame) in enumerate(
+                    sampler.iter_frames(sampler.every(1.0 / self.sample_fps))):
+                times.append(timestamp)
+                greys.append(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY))
+                if n % self.object_stride == 0:
+                    colour.append(frame)
+        if not greys:
+            raise Exception(f"No frames could be decoded from {video_path}")
+        return np.asarray(times, dtype=np.float32), np.stack(greys), colour, duration
+
+    @staticmethod
+    def motion_signal(greys: np.ndarray) -> np.ndarray:
+        """Mean absolute difference to the previous frame, first frame gets 0"""
+        diffs = np.abs(np.diff(greys.astype(np.int16), axis=0)).mean(axis=(1, 2))
+        return np.concatenate([[0.0], diffs]).astype(np.float32)
+
+    def read_audio(self, video_path: str) -> Optional[np.ndarray]:
+        """Mono PCM as float32 in -1..1, None when the clip has no audio or ffmpeg is missing"""
+        ffmpeg = find_ffmpeg()
+        if not ffmpeg:
+            return None
+        command = [ffmpeg, "-nostdin", "-v", "error", "-i", video_path, "-vn", "-ac", "1",
+                   "-ar", str(self.audio_rate), "-f", "s16le", "-"]
+        try:
+            result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                    check=True, timeout=settings.HIGHLIGHT_AUDIO_TIMEOUT)
+        except (subprocess.SubprocessError, OSError) as e:
+            logger.warning(f"Could not read audio from {video_path}: {e}")
+            return None
+        if not result.stdout:
+            return None
+        return np.frombuffer(result.stdout, dtype=np.int16).astype(np.float32) / 32768.0
+
+    def audio_signal(self, samples: np.ndarray, times: np.ndarray) -> np.ndarray:
+        """RMS of the window around each timestamp plus onset strength (positive RMS jumps)"""
+        hop = max(1, int(self.audio_rate / self.sample_fps))
+        windows = samples.size // hop
+        if windows == 0:
+            return np.zeros_like(times)
+        frames = samples[:windows * hop].reshape(windows, hop)
+        rms = np.sqrt(np.mean(frames * frames, axis=1))
+        log_rms = np.log1p(rms * 100.0)
+        onset = np.maximum(np.diff(log_rms, prepend=log_rms[0]), 0.0)
+        energy = normalize(log_rms) + normalize(onset)
+        indices = np.clip((times * self.sample_fps).astype(np.int64), 0, windows - 1)
+        return energy[indices]
+
+    def object_signal(self, detections: Detections, times: np.ndarray) -> np.ndarray:
+        counts = detections.per_frame_counts().astype(np.float32)
+        if counts.size == 0:
+            return np.zeros_like(times)
+        object_times = times[::self.object_stride][:counts.size]
+        return np.interp(times, object_times, counts).astype(np.float32)
+
+    # Scoring
+
+    def score(self, times: np.ndarray, signals: Dict[str, np.ndarray]) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """Fuse the available signals into one 0..1 score timeline"""
+        window = max(1, int(round(self.sample_fps)))
+        normalized = {name: smooth(normalize(values), window) for name, values in signals.items()}
+        weights = {name: self.weights.get(name, 0.0) for name in normalized}
+        total = sum(weights.values()) or 1.0
+        fused = np.zeros_like(times, dtype=np.float32)
+        for name, values in normalized.items():
+            fused += values * (weights[name] / total)
+        return fused, normalized
+
+    def build_result(self, times: np.ndarray, fused: np.ndarray, normalized: Dict[str, np.ndarray],
+                     duration: float) -> Dict[str, Any]:
+        threshold = float(max(settings.HIGHLIGHT_MIN_SCORE, fused.mean() + fused.std()))
+        min_distance = max(1, int(self.min_gap * self.sample_fps))
+        peaks = pick_peaks(fused, min_distance, threshold, self.max_moments)
+
+        names = list(normalized)
+        stacked = np.stack([normalized[n] for n in names]) if names else np.zeros((0, times.size))
+        pre, post = self.moment_padding
+
+        events, moments, clips = [], [], []
+        for rank, index in enumerate(peaks):
+            t = float(times[index])
+            score = float(fused[index])
+            dominant = names[int(np.argmax(stacked[:, index]))] if names else "motion"
+            events.append({"type": EVENT_TYPES.get(dominant, dominant), "timestamp": round(t, 2),
+                           "confidence": round(score, 3)})
+            moments.append({"start": round(max(0.0, t - pre), 2), "end": round(min(duration, t + post), 2),
+                            "score": round(score, 3)})
+            start = min(max(0.0, t - self.clip_length * 0.6), max(0.0, duration - self.clip_length))
+            clips.append({"start": round(start, 2), "end": round(min(duration, start + self.clip_length), 2),
+                          "title": f"{CLIP_TITLES.get(dominant, 'Highlight')} #{rank + 1}",
+                          "score": round(score, 3)})
+
+        return {
+            "detected_events": sorted(events, key=lambda e: e["timestamp"]),
+            "best_moments": moments,
+            "recommended_clips": clips,
+            # Peak moment score, indexed for search (ix_clips_highlight_score)
+            "highlight_score": max((moment["score"] for moment in moments), default=0.0),
+            "analysis": {
+                "duration": round(duration, 2),
+                "sample_fps": self.sample_fps,
+                "samples": int(times.size),
+                "signals": names,
+                "threshold": round(threshold, 3),
+            },
+        }
+
+    # Entry points
+
+    def analyze_signals(self, video_path: str) -> Tuple[np.ndarray, Dict[str, np.ndarray], List[np.ndarray], float]:
+        """Decode the clip once and compute motion and audio signals"""
+        times, greys, object_frames, duration = self.sample_video(video_path)
+        signals = {"motion": self.motion_signal(greys)}
+        del greys
+        audio = self.read_audio(video_path)
+        if audio is not None:
+            signals["audio"] = self.audio_signal(audio, times)
+        return times, signals, object_frames, duration
+
+    def finish(self, times: np.ndarray, signals: Dict[str, np.ndarray], detections: Optional[Detections],
+               duration: float) -> Dict[str, Any]:
+        if detections is not None and self.weights.get("objects"):
+            signals["objects"] = self.object_signal(detections, times)
+        fused, normalized = self.score(times, signals)
+        return self.build_result(times, fused, normalized, duration)
+
+    def detect(self, video_path: str, detector: Optional[BatchDetector] = None) -> Dict[str, Any]:
+        """Synchronous detection, for worker threads and processes"""
+        times, signals, object_frames, duration = self.analyze_signals(video_path)
+        detections = detector.detect(object_frames) if detector and self.weights.get("objects") else None
+        return self.finish(times, signals, detections, duration)
+
+
+_highlight_detector: Optional[HighlightDetector] = None
+
+
+def get_highlight_detector() -> HighlightDetector:
+    """Return the process-wide highlight detector"""
+    global _highlight_detector
+    if _highlight_detector is None:
+        _highlight_detector = HighlightDetector()
+    return _highlight_detector
+
+
+def empty_highlights(error: Optional[str] = None) -> Dict[str, Any]:
+    result: Dict[str, Any] = {"detected_events": [], "best_moments": [], "recommended_clips": []}
+    if error:
+        result["error"] = error
+    return result
+
+
+async def detect_clip_highlights(clip_id: int, db: AsyncSession = None,
+                                 video_path: Optional[str] = None) -> Dict[str, Any]:
+    """Detect highlights for a stored clip and save them on its row"""
+    if video_path is None and db:
+        result = await db.execute(select(ClipModel.file_path).where(ClipModel.id == clip_id))
+        video_path = result.scalar_one_or_none()
+    if not video_path:
+        return empty_highlights(f"No video file for clip {clip_id}")
+
+    try:
+        highlights = await get_analysis_pool().detect_highlights(video_path)
+    except Exception as e:
+        logger.error(f"Error detecting highlights for clip {clip_id}: {e}")
+        return empty_highlights(str(e))
+
+    if db:
+        await db.execute(
+            update(ClipModel)
+            .where(ClipModel.id == clip_id)
+            .values(highlights_detected=highlights)
+        )
+        await db.commit()
+    return highlights
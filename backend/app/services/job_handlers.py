@@ -0,0 +1,57 @@
+"""
+ClipConductor AI - Job Handlers
+The clip processing steps that run as queued ProcessingJobs
+"""
+
+from typing import Any, Dict, Optional
+from sqlalchemy import select, update
+from app.models.database import Clip as ClipModel
+from app.services.ai_service import AIService
+from app.services.clip_pipeline import clip_pipeline
+from app.services.highlight_detector import detect_clip_highlights
+from app.services.job_queue import JobContext, job_handler
+from app.services.thumbnail_engine import generate_clip_thumbnail
+from app.utils.hashtags import normalize_metadata_hashtags
+
+
+async def _require_clip(ctx: JobContext, db) -> ClipModel:
+    clip = (await db.execute(select(ClipModel).where(ClipModel.id == ctx.clip_id))).scalar_one_or_none()
+    if clip is None:
+        raise LookupError(f"Clip {ctx.clip_id} not found")
+    return clip
+
+
+@job_handler("highlight_detection")
+async def run_highlight_detection(ctx: JobContext) -> Optional[Dict[str, Any]]:
+    async with ctx.session() as db:
+        await _require_clip(ctx, db)
+        highlights = await detect_clip_highlights(ctx.clip_id, db)
+    if highlights.get("error"):
+        raise RuntimeError(highlights["error"])
+    return {"highlights": len(highlights.get("best_moments", []))}
+
+
+@job_handler("metadata_generation")
+async def run_metadata_generation(ctx: JobContext) -> Optional[Dict[str, Any]]:
+    async with ctx.session() as db:
+        clip = await _require_clip(ctx, db)
+        metadata = normalize_metadata_hashtags(await AIService().generate_metadata(ctx.clip_id, clip.game_detected))
+        await db.execute(update(ClipModel).where(ClipModel.id == ctx.clip_id).values(ai_metadata=metadata))
+        await db.commit()
+    return {"title": metadata.get("title")}
+
+
+@job_handler("thumbnail_creation")
+async def run_thumbnail_creation(ctx: JobContext) -> Optional[Dict[str, Any]]:
+    async with ctx.session() as db:
+        await _require_clip(ctx, db)
+        thumbnails = await generate_clip_thumbnail(ctx.clip_id, db)
+    if not thumbnails:
+        raise RuntimeError("Thumbnail generation failed")
+    return {"thumbnail": thumbnails["primary"]}
+
+
+@job_handler("clip_processing", fails_clip=True)
+async def run_clip_processing(ctx: JobContext) -> Optional[Dict[str, Any]]:
+    """Full processing of a new clip through the stage graph (probe, highlights, dedup, thumbnail, metadata, publish)"""
+    return await clip_pipeline.run(ctx)
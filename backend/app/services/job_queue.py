@@ -0,0 +1,406 @@
+"""
+ClipConductor AI - Job Queue
+Durable ProcessingJob queue: leased claims with SKIP LOCKED, heartbeats, retries with backoff and progress
+"""
+
+import asyncio
+import os
+import random
+import socket
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Set
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.database import Clip as ClipModel, ProcessingJob as ProcessingJobModel
+from app.models.schemas import ClipStatus, JobStatus
+import logging
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[["JobContext"], Awaitable[Optional[Dict[str, Any]]]]
+
+JOB_HANDLERS: Dict[str, JobHandler] = {}
+CLIP_FAILING_JOB_TYPES: Set[str] = set()
+
+
+def job_handler(job_type: str, fails_clip: bool = False):
+    """Register the coroutine that runs jobs of `job_type`; with `fails_clip` its final failure errors the clip"""
+    def register(fn: JobHandler) -> JobHandler:
+        JOB_HANDLERS[job_type] = fn
+        if fails_clip:
+            CLIP_FAILING_JOB_TYPES.add(job_type)
+        return fn
+    return register
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class LeaseLostError(Exception):
+    """The job was cancelled or reclaimed by another worker while running"""
+
+
+class JobContext:
+    """What a handler gets: the claimed job, progress reporting and a database session factory"""
+
+    def __init__(self, queue: "JobQueue", job: ProcessingJobModel):
+        self.queue = queue
+        self.job_id = job.id
+        self.job_type = job.job_type
+        self.clip_id = job.clip_id
+        self.attempt = job.attempts
+        self.max_attempts = job.max_attempts
+        self.result_data: Dict[str, Any] = dict(job.result_data or {})
+
+    def session(self) -> AsyncSession:
+        return self.queue.session_factory()
+
+    async def progress(self, percent: int, **result: Any) -> None:
+        """Report progress (0-100) and merge partial results; raises LeaseLostError if cancelled"""
+        self.result_data.update(result)
+        if not await self.queue.heartbeat(self.job_id, progress=percent,
+                                          result_data=self.result_data if result else None):
+            raise LeaseLostError(f"Job {self.job_id} is no longer leased by this worker")
+
+
+class JobQueue:
+    """
+    ProcessingJob rows as a work queue.
+
+    Workers claim the oldest runnable job with ``SELECT ... FOR UPDATE SKIP
+    LOCKED`` so concurrent workers never block on each other, then take a
+    lease (``locked_by`` + ``lease_expires_at``) and keep extending it with
+    heartbeats while the handler runs. A job whose lease runs out (crashed
+    worker) becomes claimable again. Failures are retried with exponential
+    backoff through ``run_after`` until ``max_attempts``.
+
+    The claim is also a compare-and-set on (status, attempts), which is what
+    keeps SQLite, where FOR UPDATE is a no-op, correct for local runs.
+    """
+
+    def __init__(self, session_factory=None, worker_id: Optional[str] = None):
+        self.session_factory = session_factory or AsyncSessionLocal
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.lease = timedelta(seconds=settings.JOB_LEASE_SECONDS)
+
+    async def enqueue(self, db: AsyncSession, job_type: str, clip_id: Optional[int] = None,
+                      payload: Optional[Dict[str, Any]] = None, max_attempts: Optional[int] = None,
+                      delay: float = 0.0) -> ProcessingJobModel:
+        """Persist a pending job in the caller's session and commit"""
+        if job_type not in JOB_HANDLERS:
+            raise ValueError(f"Unknown job type: {job_type}")
+        job = ProcessingJobModel(
+            job_type=job_type,
+            clip_id=clip_id,
+            status=JobStatus.PENDING.value,
+            progress=0,
+            result_data={"payload": payload} if payload else None,
+            attempts=0,
+            max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+            run_after=utcnow() + timedelta(seconds=delay) if delay else None,
+        )
+        db.add(job)
+        await db.commit()
+        await db.refresh(job)
+        return job
+
+    @staticmethod
+    def _exhausted_leases_update(now: datetime):
+        # Crashed on its last attempt: give up instead of handing it out again
+        return update(ProcessingJobModel) \
+            .where(
+                ProcessingJobModel.status == JobStatus.PROCESSING.value,
+                ProcessingJobModel.lease_expires_at < now,
+                ProcessingJobModel.attempts >= ProcessingJobModel.max_attempts,
+            ) \
+            .values(status=JobStatus.FAILED.value, error_message="Lease expired on the last attempt",
+                    locked_by=None, lease_expires_at=None, completed_at=now) \
+            .returning(ProcessingJobModel.clip_id, ProcessingJobModel.job_type)
+
+    @staticmethod
+    def _candidates_query(now: datetime, job_types: Optional[Iterable[str]] = None, candidates: int = 8):
+        """Oldest runnable jobs: due pending jobs and expired leases (served by the partial indexes)"""
+        runnable = or_(
+            and_(
+                ProcessingJobModel.status == JobStatus.PENDING.value,
+                or_(ProcessingJobModel.run_after.is_(None), ProcessingJobModel.run_after <= now),
+            ),
+            and_(
+                ProcessingJobModel.status == JobStatus.PROCESSING.value,
+                ProcessingJobModel.lease_expires_at < now,
+            ),
+        )
+        query = select(ProcessingJobModel.id, ProcessingJobModel.status, ProcessingJobModel.attempts) \
+            .where(runnable)
+        if job_types:
+            query = query.where(ProcessingJobModel.job_type.in_(list(job_types)))
+        return query.order_by(ProcessingJobModel.id).limit(candidates).with_for_update(skip_locked=True)
+
+    async def claim(self, job_types: Optional[Iterable[str]] = None,
+                    candidates: int = 8) -> Optional[ProcessingJobModel]:
+        """Lease the oldest runnable job, or None when the queue is empty"""
+        async with self.session_factory() as db:
+            now = utcnow()
+            exhausted = await db.execute(self._exhausted_leases_update(now))
+            await self._fail_clips(db, exhausted.all())
+            rows = (await db.execute(self._candidates_query(now, job_types, candidates))).all()
+
+            for job_id, status, attempts in rows:
+                result = await db.execute(
+                    update(ProcessingJobModel)
+                    .where(
+                        ProcessingJobModel.id == job_id,
+                        ProcessingJobModel.status == status,
+                        ProcessingJobModel.attempts == attempts,
+                    )
+                    .values(status=JobStatus.PROCESSING.value, attempts=attempts + 1,
+                            locked_by=self.worker_id, lease_expires_at=now + self.lease,
+                            heartbeat_at=now, started_at=now, run_after=None)
+                )
+                if result.rowcount == 1:
+                    await db.commit()
+                    job = (await db.execute(
+                        select(ProcessingJobModel).where(ProcessingJobModel.id == job_id)
+                    )).scalar_one()
+                    return job
+            await db.commit()
+            return None
+
+    @staticmethod
+    async def _fail_clips(db: AsyncSession, failed_jobs) -> None:
+        """Move the clips of finally failed (clip_id, job_type) jobs out of processing, to error"""
+        clip_ids = {clip_id for clip_id, job_type in failed_jobs
+                    if clip_id is not None and job_type in CLIP_FAILING_JOB_TYPES}
+        if clip_ids:
+            await db.execute(
+                update(ClipModel)
+                .where(ClipModel.id.in_(clip_ids), ClipModel.status == ClipStatus.PROCESSING.value)
+                .values(status=ClipStatus.ERROR.value)
+            )
+            logger.warning(f"Clips {sorted(clip_ids)} failed processing, status set to error")
+
+    def _owned(self, job_id: int):
+        return and_(
+            ProcessingJobModel.id == job_id,
+            ProcessingJobModel.status == JobStatus.PROCESSING.value,
+            ProcessingJobModel.locked_by == self.worker_id,
+        )
+
+    async def heartbeat(self, job_id: int, progress: Optional[int] = None,
+                        result_data: Optional[Dict[str, Any]] = None) -> bool:
+        """Extend the lease; False if the job was cancelled or taken over"""
+        now = utcnow()
+        values: Dict[str, Any] = {"lease_expires_at": now + self.lease, "heartbeat_at": now}
+        if progress is not None:
+            values["progress"] = max(0, min(100, int(progress)))
+        if result_data is not None:
+            values["result_data"] = result_data
+        async with self.session_factory() as db:
+            result = await db.execute(update(ProcessingJobModel).where(self._owned(job_id)).values(**values))
+            await db.commit()
+            return result.rowcount == 1
+
+    async def complete(self, job_id: int, result_data: Optional[Dict[str, Any]] = None) -> bool:
+        now = utcnow()
+        async with self.session_factory() as db:
+            result = await db.execute(
+                update(ProcessingJobModel).where(self._owned(job_id)).values(
+                    status=JobStatus.COMPLETED.value, progress=100, result_data=result_data,
+                    error_message=None, locked_by=None, lease_expires_at=None, completed_at=now)
+            )
+            await db.commit()
+            return result.rowcount == 1
+
+    def backoff(self, attempt: int) -> float:
+        delay = min(settings.JOB_RETRY_BACKOFF_MAX, settings.JOB_RETRY_BACKOFF_BASE * 2 ** max(0, attempt - 1))
+        return delay * random.uniform(0.8, 1.2)
+
+    async def fail(self, job_id: int, error: str, attempt: int, max_attempts: int,
+                   result_data: Optional[Dict[str, Any]] = None) -> str:
+        """Schedule a retry with backoff, or mark the job failed after its last attempt"""
+        now = utcnow()
+        values: Dict[str, Any] = {"error_message": error[:2000], "locked_by": None, "lease_expires_at": None}
+        if result_data is not None:
+            values["result_data"] = result_data
+        if attempt < max_attempts:
+            values.update(status=JobStatus.PENDING.value, run_after=now + timedelta(seconds=self.backoff(attempt)))
+        else:
+            values.update(status=JobStatus.FAILED.value, completed_at=now)
+        async with self.session_factory() as db:
+            result = await db.execute(
+                update(ProcessingJobModel).where(self._owned(job_id)).values(**values)
+                .returning(ProcessingJobModel.clip_id, ProcessingJobModel.job_type)
+            )
+            if values["status"] == JobStatus.FAILED.value:
+                await self._fail_clips(db, result.all())
+            await db.commit()
+        return values["status"]
+
+    async def requeue(self, job_id: int) -> None:
+        """Hand a job back without spending an attempt (worker shutting down)"""
+        async with self.session_factory() as db:
+            await db.execute(
+                update(ProcessingJobModel).where(self._owned(job_id)).values(
+                    status=JobStatus.PENDING.value, attempts=ProcessingJobModel.attempts - 1,
+                    locked_by=None, lease_expires_at=None, run_after=None)
+            )
+            await db.commit()
+
+    async def cancel(self, db: AsyncSession, job_id: int) -> bool:
+        """Cancel a pending or running job; a running handler stops at its next heartbeat"""
+        result = await db.execute(
+            update(ProcessingJobModel)
+            .where(
+                ProcessingJobModel.id == job_id,
+                ProcessingJobModel.status.in_([JobStatus.PENDING.value, JobStatus.PROCESSING.value]),
+            )
+            .values(status=JobStatus.CANCELLED.value, locked_by=None, lease_expires_at=None,
+                    completed_at=utcnow())
+        )
+        await db.commit()
+        return result.rowcount == 1
+
+    async def retry(self, db: AsyncSession, job_id: int) -> bool:
+        """Put a failed or cancelled job back in the queue with a fresh attempt budget"""
+        result = await db.execute(
+            update(ProcessingJobModel)
+            .where(
+                ProcessingJobModel.id == job_id,
+                ProcessingJobModel.status.in_([JobStatus.FAILED.value, JobStatus.CANCELLED.value]),
+            )
+            .values(status=JobStatus.PENDING.value, attempts=0, progress=0, run_after=None,
+                    error_message=None, completed_at=None)
+        )
+        await db.commit()
+        return result.rowcount == 1
+
+
+class JobWorker:
+    """Claims jobs and runs their handlers, up to `concurrency` at a time"""
+
+    def __init__(self, queue: Optional[JobQueue] = None, concurrency: Optional[int] = None,
+                 job_types: Optional[Iterable[str]] = None):
+        self.queue = queue or get_job_queue()
+        self.concurrency = concurrency or settings.JOB_WORKER_CONCURRENCY
+        self.job_types = list(job_types) if job_types else None
+        self.heartbeat_interval = settings.JOB_HEARTBEAT_INTERVAL
+        self.poll_interval = settings.JOB_POLL_INTERVAL
+        self._running: Dict[int, asyncio.Task] = {}
+        self.completed = 0
+        self.failed = 0
+
+    async def _heartbeat(self, job_id: int, task: asyncio.Task) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                alive = await self.queue.heartbeat(job_id)
+            except Exception as e:
+                logger.warning(f"Heartbeat for job {job_id} failed: {e}")
+                continue
+            if not alive:
+                logger.info(f"Job {job_id} cancelled or reclaimed, stopping it")
+                task.cancel()
+                return
+
+    async def _run_job(self, job: ProcessingJobModel) -> None:
+        ctx = JobContext(self.queue, job)
+        handler = JOB_HANDLERS.get(job.job_type)
+        if handler is None:
+            await self.queue.fail(job.id, f"No handler for job type {job.job_type}", job.max_attempts,
+                                  job.max_attempts)
+            return
+
+        task = asyncio.current_task()
+        heartbeat = asyncio.create_task(self._heartbeat(job.id, task))
+        try:
+            result = await handler(ctx)
+            if result is not None:
+                ctx.result_data.update(result)
+            await self.queue.complete(job.id, ctx.result_data)
+            self.completed += 1
+        except LeaseLostError:
+            logger.info(f"Job {job.id} cancelled or reclaimed, stopped")
+        except Exception as e:
+            self.failed += 1
+            status = await self.queue.fail(job.id, f"{type(e).__name__}: {e}", ctx.attempt,
+                                           ctx.max_attempts, ctx.result_data)
+            logger.warning(f"Job {job.id} ({job.job_type}) attempt {ctx.attempt} failed, now {status}: {e}")
+        finally:
+            heartbeat.cancel()
+
+    async def run(self, stop: Optional[asyncio.Event] = None, shutdown_grace: float = 30.0) -> None:
+        """Claim and run jobs until `stop` is set, then drain or hand back running jobs"""
+        stop = stop or asyncio.Event()
+        slots = asyncio.Semaphore(self.concurrency)
+        logger.info(f"Job worker {self.queue.worker_id} started with concurrency {self.concurrency}")
+
+        while not stop.is_set():
+            if not await self._wait_for_slot(slots, stop):
+                break
+            try:
+                job = await self.queue.claim(self.job_types)
+            except Exception as e:
+                logger.error(f"Claiming a job failed: {e}")
+                job = None
+            if job is None:
+                slots.release()
+                try:
+                    await asyncio.wait_for(stop.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            task = asyncio.create_task(self._run_job(job), name=f"job-{job.id}")
+            self._running[job.id] = task
+            task.add_done_callback(lambda t, job_id=job.id: (self._running.pop(job_id, None), slots.release()))
+
+        await self.drain(shutdown_grace)
+
+    @staticmethod
+    async def _wait_for_slot(slots: asyncio.Semaphore, stop: asyncio.Event) -> bool:
+        """Take a free slot; False if `stop` is set first (all slots busy must not delay shutdown)"""
+        acquire = asyncio.ensure_future(slots.acquire())
+        stopping = asyncio.ensure_future(stop.wait())
+        await asyncio.wait({acquire, stopping}, return_when=asyncio.FIRST_COMPLETED)
+        stopping.cancel()
+        if not acquire.done():
+            acquire.cancel()
+            return False
+        if stop.is_set():
+            slots.release()
+            return False
+        return True
+
+    async def drain(self, grace: float) -> None:
+        if not self._running:
+            return
+        _, pending = await asyncio.wait(list(self._running.values()), timeout=grace)
+        for job_id, task in list(self._running.items()):
+            if task in pending:
+                task.cancel()
+                await self.queue.requeue(job_id)
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "worker_id": self.queue.worker_id,
+            "running": sorted(self._running),
+            "concurrency": self.concurrency,
+            "completed": self.completed,
+            "failed": self.failed,
+        }
+
+
+_job_queue: Optional[JobQueue] = None
+
+
+def get_job_queue() -> JobQueue:
+    """Return the process-wide job queue"""
+    global _job_queue
+    if _job_queue is None:
+        _job_queue = JobQueue()
+    return _job_queue
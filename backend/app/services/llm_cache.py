@@ -0,0 +1,221 @@
+"""
+ClipConductor AI - LLM Response Cache
+Content-addressed cache for Ollama generations with an in-memory LRU tier and an optional persistent tier
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+import logging
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def make_cache_key(namespace: str, prompt: str, model: str,
+                   options: Optional[Dict[str, Any]] = None) -> str:
+    """Hash of the whitespace-normalised prompt, model and sampling options"""
+    normalized = _WHITESPACE.sub(" ", prompt).strip()
+    material = json.dumps(
+        {"ns": namespace, "prompt": normalized, "model": model, "options": options or {}},
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class SQLiteCacheTier:
+    """Persistent tier backed by a local SQLite file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+        self._lock = asyncio.Lock()
+
+    def _get(self, key: str) -> Optional[Tuple[Any, float]]:
+        row = self._conn.execute(
+            "SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        if row[1] < time.time():
+            self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            self._conn.commit()
+            return None
+        return json.loads(row[0]), row[1]
+
+    def _set(self, key: str, value: Any, expires_at: float) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO llm_cache (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, json.dumps(value), expires_at),
+        )
+        self._conn.commit()
+
+    def _clear(self) -> None:
+        self._conn.execute("DELETE FROM llm_cache")
+        self._conn.commit()
+
+    async def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        async with self._lock:
+            return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key: str, value: Any, expires_at: float) -> None:
+        async with self._lock:
+            await asyncio.to_thread(self._set, key, value, expires_at)
+
+    async def clear(self) -> None:
+        async with self._lock:
+            await asyncio.to_thread(self._clear)
+
+
+class RedisCacheTier:
+    """Persistent tier backed by the Redis configured as REDIS_URL"""
+
+    prefix = "clipconductor:llm:"
+
+    def __init__(self, url: str):
+        import redis.asyncio as redis_asyncio
+        self._redis = redis_asyncio.from_url(url)
+
+    async def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        raw = await self._redis.get(self.prefix + key)
+        if raw is None:
+            return None
+        entry = json.loads(raw)
+        return entry["value"], entry["expires_at"]
+
+    async def set(self, key: str, value: Any, expires_at: float) -> None:
+        ttl = max(1, int(expires_at - time.time()))
+        payload = json.dumps({"value": value, "expires_at": expires_at})
+        await self._redis.set(self.prefix + key, payload, ex=ttl)
+
+    async def clear(self) -> None:
+        async for key in self._redis.scan_iter(match=self.prefix + "*"):
+            await self._redis.delete(key)
+
+
+class LLMCache:
+    """
+    Two-tier cache for LLM outputs.
+
+    Lookups hit the size-bounded in-memory LRU first, then the optional
+    persistent tier (promoting hits back into memory). Every entry carries
+    an absolute expiry so the TTL survives promotion between tiers.
+    Persistent tier failures are logged and treated as misses.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 86400.0, persistent=None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.persistent = persistent
+        self._memory: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        self.hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+        self.bypassed = 0
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._memory.get(key)
+        if entry is not None:
+            if entry[1] >= time.time():
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            del self._memory[key]
+
+        if self.persistent is not None:
+            try:
+                entry = await self.persistent.get(key)
+            except Exception as e:
+                logger.warning(f"LLM cache persistent tier read failed: {e}")
+                entry = None
+            if entry is not None:
+                self._remember(key, entry[0], entry[1])
+                self.hits += 1
+                self.persistent_hits += 1
+                return entry[0]
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        expires_at = time.time() + (ttl_seconds or self.ttl_seconds)
+        self._remember(key, value, expires_at)
+        if self.persistent is not None:
+            try:
+                await self.persistent.set(key, value, expires_at)
+            except Exception as e:
+                logger.warning(f"LLM cache persistent tier write failed: {e}")
+
+    def _remember(self, key: str, value: Any, expires_at: float) -> None:
+        self._memory[key] = (value, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def record_bypass(self) -> None:
+        self.bypassed += 1
+
+    async def clear(self) -> None:
+        self._memory.clear()
+        if self.persistent is not None:
+            await self.persistent.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._memory),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "persistent_tier": type(self.persistent).__name__ if self.persistent else None,
+            "hits": self.hits,
+            "persistent_hits": self.persistent_hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+_llm_cache: Optional[LLMCache] = None
+
+
+def _create_persistent_tier():
+    backend = (settings.LLM_CACHE_BACKEND or "memory").lower()
+    if backend == "sqlite":
+        path = settings.LLM_CACHE_SQLITE_PATH or os.path.join(
+            settings.OUTPUT_DIRECTORY, "cache", "llm_cache.sqlite3"
+        )
+        return SQLiteCacheTier(path)
+    if backend == "redis":
+        try:
+            return RedisCacheTier(settings.REDIS_URL)
+        except ImportError:
+            logger.warning("LLM_CACHE_BACKEND=redis but the redis package is missing, using memory only")
+    return None
+
+
+def get_llm_cache() -> LLMCache:
+    """Return the process-wide LLM cache"""
+    global _llm_cache
+    if _llm_cache is None:
+        _llm_cache = LLMCache(
+            max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
+            persistent=_create_persistent_tier(),
+        )
+    return _llm_cache
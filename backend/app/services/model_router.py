@@ -0,0 +1,206 @@
+"""
+ClipConductor AI - Model Router
+Picks an Ollama model per task, keeps the chosen models warm and fails over to lighter models on SLO breaches
+"""
+
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+import logging
+import httpx
+from app.core.config import settings
+from app.core.http_client import get_ollama_client
+from app.services.batch_processor import percentile
+
+logger = logging.getLogger(__name__)
+
+
+def model_tag(name: str) -> str:
+    """Canonical name:tag form, as /api/ps reports it (an untagged name means :latest)"""
+    return name if ":" in name.rsplit("/", 1)[-1] else f"{name}:latest"
+
+
+class _ModelHealth:
+    __slots__ = ("latencies", "failures", "breached_at", "requests")
+
+    def __init__(self, window: int):
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self.failures = 0
+        self.breached_at: Optional[float] = None
+        self.requests = 0
+
+
+class ModelRouter:
+    """
+    Task-aware model selection.
+
+    Each task maps to an ordered list of models, heaviest/best first. The
+    first model that is not in breach is used. A model breaches its SLO when
+    the p95 of its recent latencies exceeds ``latency_slo`` or it fails
+    several times in a row; it is then skipped for ``cooldown`` seconds,
+    after which its history is cleared and it gets traffic again.
+    """
+
+    def __init__(self,
+                 task_models: Dict[str, List[str]],
+                 default_model: str,
+                 latency_slo: float = 30.0,
+                 cooldown: float = 120.0,
+                 window: int = 20,
+                 min_samples: int = 5,
+                 max_failures: int = 3):
+        self.task_models = task_models
+        self.default_model = default_model
+        self.latency_slo = latency_slo
+        self.cooldown = cooldown
+        self.window = window
+        self.min_samples = min_samples
+        self.max_failures = max_failures
+        self._health: Dict[str, _ModelHealth] = {}
+        self.loaded: Dict[str, Dict[str, Any]] = {}  # by model_tag()
+        self._pinned: Optional[set] = None
+        self.loaded_checked_at: Optional[float] = None
+        self.failovers = 0
+
+    def _state(self, model: str) -> _ModelHealth:
+        state = self._health.get(model)
+        if state is None:
+            state = self._health[model] = _ModelHealth(self.window)
+        return state
+
+    def candidates(self, task: str) -> List[str]:
+        return self.task_models.get(task) or [self.default_model]
+
+    def is_available(self, model: str) -> bool:
+        state = self._state(model)
+        if state.breached_at is None:
+            return True
+        if time.monotonic() - state.breached_at >= self.cooldown:
+            # Half-open: give the model a fresh window
+            state.breached_at = None
+            state.latencies.clear()
+            state.failures = 0
+            return True
+        return False
+
+    def _pick(self, task: str) -> str:
+        models = self.candidates(task)
+        for model in models:
+            if self.is_available(model):
+                return model
+        # Everything is in breach, the lightest model is the safest bet
+        return models[-1]
+
+    def select(self, task: str) -> str:
+        """Best model for a task that is currently meeting its SLO"""
+        model = self._pick(task)
+        if model != self.candidates(task)[0]:
+            self.failovers += 1
+        return model
+
+    def record(self, model: str, latency: float, ok: bool = True) -> None:
+        """Feed back the outcome of one generation"""
+        state = self._state(model)
+        state.requests += 1
+        if ok:
+            state.failures = 0
+            state.latencies.append(latency)
+        else:
+            state.failures += 1
+
+        breached = state.failures >= self.max_failures or (
+            len(state.latencies) >= self.min_samples
+            and percentile(list(state.latencies), 95) > self.latency_slo
+        )
+        if breached and state.breached_at is None:
+            state.breached_at = time.monotonic()
+            logger.warning(f"Model {model} breached its latency SLO, failing over for {self.cooldown}s")
+
+    def warmup_models(self) -> List[str]:
+        """Models to load at startup: configured list or the first choice of every task"""
+        if settings.OLLAMA_WARMUP_MODELS:
+            return list(settings.OLLAMA_WARMUP_MODELS)
+        models = [self.default_model] + [m[0] for m in self.task_models.values() if m]
+        return list(dict.fromkeys(models))
+
+    def keep_alive(self, model: str):
+        """keep_alive to send with a request: every request resets it, so warm-up models stay pinned"""
+        if self._pinned is None:
+            self._pinned = {model_tag(m) for m in self.warmup_models()}
+        if model_tag(model) in self._pinned:
+            return settings.OLLAMA_WARMUP_KEEP_ALIVE
+        return settings.OLLAMA_KEEP_ALIVE
+
+    async def warm_up(self, client: Optional[httpx.AsyncClient] = None) -> Dict[str, bool]:
+        """Load models into Ollama and pin them with keep_alive"""
+        client = client or get_ollama_client()
+        results = {}
+        for model in self.warmup_models():
+            start = time.monotonic()
+            try:
+                # An empty prompt only loads the model
+                response = await client.post(
+                    f"{settings.OLLAMA_BASE_URL}/api/generate",
+                    json={"model": model, "prompt": "", "keep_alive": self.keep_alive(model)},
+                    timeout=settings.OLLAMA_WARMUP_TIMEOUT
+                )
+                results[model] = response.status_code == 200
+                logger.info(f"Warmed up {model} in {time.monotonic() - start:.1f}s "
+                            f"(status {response.status_code})")
+            except Exception as e:
+                results[model] = False
+                logger.warning(f"Could not warm up {model}: {e}")
+        await self.refresh_loaded(client)
+        return results
+
+    async def refresh_loaded(self, client: Optional[httpx.AsyncClient] = None) -> Dict[str, Dict[str, Any]]:
+        """Read which models Ollama currently holds in memory (/api/ps)"""
+        client = client or get_ollama_client()
+        try:
+            response = await client.get(f"{settings.OLLAMA_BASE_URL}/api/ps")
+            if response.status_code == 200:
+                self.loaded = {
+                    model_tag(m.get("name", "")): {"size_vram": m.get("size_vram"), "expires_at": m.get("expires_at")}
+                    for m in response.json().get("models", [])
+                }
+                self.loaded_checked_at = time.time()
+        except Exception as e:
+            logger.warning(f"Could not read loaded models: {e}")
+        return self.loaded
+
+    def stats(self) -> Dict[str, Any]:
+        models = {}
+        for name in dict.fromkeys([self.default_model] + [m for ms in self.task_models.values() for m in ms]):
+            state = self._state(name)
+            samples = list(state.latencies)
+            models[name] = {
+                "loaded": model_tag(name) in self.loaded,
+                "available": self.is_available(name),
+                "requests": state.requests,
+                "consecutive_failures": state.failures,
+                "latency_p50_seconds": round(percentile(samples, 50), 3),
+                "latency_p95_seconds": round(percentile(samples, 95), 3),
+            }
+        return {
+            "tasks": {task: self._pick(task) for task in self.task_models},
+            "latency_slo_seconds": self.latency_slo,
+            "failovers": self.failovers,
+            "models": models,
+            "loaded_checked_at": self.loaded_checked_at,
+        }
+
+
+_model_router: Optional[ModelRouter] = None
+
+
+def get_model_router() -> ModelRouter:
+    """Return the process-wide model router"""
+    global _model_router
+    if _model_router is None:
+        _model_router = ModelRouter(
+            task_models=settings.OLLAMA_TASK_MODELS,
+            default_model=settings.OLLAMA_MODEL,
+            latency_slo=settings.OLLAMA_TASK_LATENCY_SLO,
+            cooldown=settings.OLLAMA_FAILOVER_COOLDOWN,
+        )
+    return _model_router
@@ -0,0 +1,67 @@
+"""
+ClipConductor AI - Single Flight
+Deduplicates identical concurrent async calls so only one runs and all callers share its result
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+
+class _Flight:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Per-key in-flight call registry.
+
+    The first caller for a key starts the call as its own task; later
+    callers with the same key await that task instead of starting another.
+    Waiters await it through ``asyncio.shield`` so cancelling one caller
+    never cancels the shared call. The call is cancelled only when every
+    waiter has gone away.
+    """
+
+    def __init__(self):
+        self._flights: Dict[str, _Flight] = {}
+        self.started = 0
+        self.deduplicated = 0
+        self.abandoned = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(fn()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _task, key=key, flight=flight: self._forget(key, flight))
+            self.started += 1
+        else:
+            self.deduplicated += 1
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if not flight.task.done() and flight.waiters == 1:
+                # Last interested caller left, stop the shared call
+                flight.task.cancel()
+                self.abandoned += 1
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def _forget(self, key: str, flight: _Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": len(self._flights),
+            "started": self.started,
+            "deduplicated": self.deduplicated,
+            "abandoned": self.abandoned,
+        }
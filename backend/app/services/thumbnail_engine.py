@@ -0,0 +1,256 @@
+"""
+ClipConductor AI - Thumbnail Engine
+Picks the best frame near detected highlights and writes cached thumbnails in several sizes and formats
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+import cv2
+import numpy as np
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.models.database import Clip as ClipModel
+from app.services.analysis_pool import get_analysis_pool
+from app.services.detector import BatchDetector
+from app.services.frame_sampler import FrameSampler
+from app.services.video_probe import get_video_probe
+from app.utils.file_hash import sample_hash
+import logging
+
+logger = logging.getLogger(__name__)
+
+IMAGE_PARAMS = {
+    "jpg": [cv2.IMWRITE_JPEG_QUALITY, 90, cv2.IMWRITE_JPEG_OPTIMIZE, 1],
+    "webp": [cv2.IMWRITE_WEBP_QUALITY, 85],
+}
+MEDIA_TYPES = {"jpg": "image/jpeg", "webp": "image/webp"}
+
+
+class ThumbnailEngine:
+    """
+    Best-frame thumbnails, content-addressed on disk.
+
+    Candidate frames are taken around each ``best_moments`` entry (or across
+    the middle of the clip when there are none) and scored on:
+
+    * sharpness - variance of the Laplacian, relative to the sharpest candidate
+    * brightness - closeness of the mean luma to mid-grey, dark frames lose
+    * detections - YOLO boxes in the frame, relative to the busiest candidate
+
+    The winner is written once per size and format to
+    ``<root>/<hash[:2]>/<hash>/t<ms>_<size>.<ext>``, where the hash is the
+    clip's content hash (or a sampled fingerprint when it has none) and
+    ``ms`` the frame time. A small
+    manifest per candidate set records which frame won, so asking again for
+    the same clip and highlights only reads the manifest.
+    """
+
+    def __init__(self,
+                 root: Optional[str] = None,
+                 sizes: Optional[Dict[str, int]] = None,
+                 formats: Optional[Sequence[str]] = None,
+                 candidates_per_moment: Optional[int] = None,
+                 weights: Optional[Dict[str, float]] = None):
+        self.root = Path(root or os.path.join(settings.OUTPUT_DIRECTORY, "thumbnails"))
+        self.sizes = sizes or dict(settings.THUMBNAIL_SIZES)
+        self.formats = list(formats or settings.THUMBNAIL_FORMATS)
+        self.candidates_per_moment = candidates_per_moment or settings.THUMBNAIL_CANDIDATES_PER_MOMENT
+        self.weights = weights or {"sharpness": 0.5, "brightness": 0.3, "detections": 0.2}
+
+    # Paths and cache
+
+    def clip_dir(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest
+
+    def variant_path(self, digest: str, time_ms: int, size: str, fmt: str) -> Path:
+        return self.clip_dir(digest) / f"t{time_ms}_{size}.{fmt}"
+
+    @staticmethod
+    def etag_for(path: str) -> str:
+        """Strong ETag from the content-addressed path (hash directory + frame/size/format)"""
+        p = Path(path)
+        return f'"{p.parent.name[:16]}-{p.name}"'
+
+    def _manifest_path(self, digest: str, times: Sequence[float]) -> Path:
+        key = hashlib.sha1(json.dumps([round(t, 2) for t in times]).encode()).hexdigest()[:16]
+        return self.clip_dir(digest) / f"manifest_{key}.json"
+
+    def _result(self, digest: str, time_ms: int, score: float) -> Dict[str, Any]:
+        files = {size: {fmt: str(self.variant_path(digest, time_ms, size, fmt)) for fmt in self.formats}
+                 for size in self.sizes}
+        primary_size = max(self.sizes, key=self.sizes.get)
+        return {
+            "clip_hash": digest,
+            "time": time_ms / 1000.0,
+            "score": round(score, 4),
+            "files": files,
+            "primary": files[primary_size][self.formats[0]],
+        }
+
+    def cached(self, video_path: str, duration: float, highlights: Optional[Dict[str, Any]] = None,
+               digest: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Previously generated thumbnails for this clip and candidate set, if all files exist"""
+        digest = digest or sample_hash(video_path)
+        manifest = self._manifest_path(digest, self.candidate_times(duration, highlights))
+        try:
+            data = json.loads(manifest.read_text())
+        except (OSError, ValueError):
+            return None
+        result = self._result(digest, data["time_ms"], data["score"])
+        if all(os.path.exists(p) for variants in result["files"].values() for p in variants.values()):
+            return result
+        return None
+
+    def from_primary(self, primary: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Rebuild the result for a stored primary path without touching the video"""
+        if not primary:
+            return None
+        path = Path(primary)
+        stem = path.stem.split("_", 1)[0]
+        if not stem.startswith("t") or not stem[1:].isdigit():
+            return None
+        result = self._result(path.parent.name, int(stem[1:]), 0.0)
+        if all(os.path.exists(p) for variants in result["files"].values() for p in variants.values()):
+            return result
+        return None
+
+    # Selection
+
+    def candidate_times(self, duration: float, highlights: Optional[Dict[str, Any]] = None) -> List[float]:
+        moments = (highlights or {}).get("best_moments") or []
+        times: List[float] = []
+        for moment in moments[:settings.THUMBNAIL_MAX_MOMENTS]:
+            start, end = float(moment.get("start", 0.0)), float(moment.get("end", 0.0))
+            if end > start:
+                times.extend(np.linspace(start, end, self.candidates_per_moment).tolist())
+        if not times and duration > 0:
+            times = np.linspace(duration * 0.1, duration * 0.9, self.candidates_per_moment * 2).tolist()
+        return sorted({round(min(max(t, 0.0), max(duration - 0.05, 0.0)), 2) for t in times})
+
+    def score_frames(self, frames: List[np.ndarray], detection_counts: Optional[np.ndarray] = None) -> np.ndarray:
+        greys = [cv2.cvtColor(f, cv2.COLOR_BGR2GRAY) for f in frames]
+        sharpness = np.array([cv2.Laplacian(g, cv2.CV_64F).var() for g in greys])
+        brightness = np.array([g.mean() for g in greys]) / 255.0
+
+        sharp_score = sharpness / sharpness.max() if sharpness.max() > 0 else np.zeros_like(sharpness)
+        bright_score = np.clip(1.0 - np.abs(brightness - 0.5) * 2.0, 0.0, 1.0)
+        bright_score[brightness < 0.12] *= 0.25  # near-black frames (loading screens, fades)
+        score = self.weights["sharpness"] * sharp_score + self.weights["brightness"] * bright_score
+        if detection_counts is not None and detection_counts.size and detection_counts.max() > 0:
+            score += self.weights["detections"] * detection_counts / detection_counts.max()
+        return score
+
+    # Output
+
+    def _write(self, frame: np.ndarray, path: Path, width: int, fmt: str) -> None:
+        if frame.shape[1] > width:
+            height = int(round(frame.shape[0] * width / frame.shape[1]))
+            frame = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+        ok, encoded = cv2.imencode(f".{fmt}", frame, IMAGE_PARAMS.get(fmt, []))
+        if not ok:
+            raise Exception(f"Could not encode thumbnail as {fmt}")
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp.write_bytes(encoded.tobytes())
+        os.replace(tmp, path)
+
+    def generate(self, video_path: str, highlights: Optional[Dict[str, Any]] = None,
+                 detector: Optional[BatchDetector] = None, digest: Optional[str] = None,
+                 duration: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Select, encode and cache the best frame (CPU-bound, run in a worker).
+
+        With the clip's content hash and duration a cached result is returned
+        without hashing or opening the video.
+        """
+        digest = digest or sample_hash(video_path)
+        cached = self.cached(video_path, duration, highlights, digest=digest) if duration else None
+        if cached:
+            return cached
+        with FrameSampler(video_path, max_width=max(self.sizes.values())) as sampler:
+            if not duration:
+                duration = sampler.duration
+                cached = self.cached(video_path, duration, highlights, digest=digest)
+                if cached:
+                    return cached
+            times = self.candidate_times(duration, highlights)
+            samples = sampler.sample(timestamps=times)
+        if not samples:
+            raise Exception(f"No frames could be decoded from {video_path}")
+
+        frames = [frame for _, _, frame in samples]
+        counts = detector.detect(frames).per_frame_counts() if detector and self.weights.get("detections") else None
+        scores = self.score_frames(frames, counts)
+        best = int(np.argmax(scores))
+        time_ms = int(round(samples[best][1] * 1000))
+
+        self.clip_dir(digest).mkdir(parents=True, exist_ok=True)
+        for size, width in self.sizes.items():
+            for fmt in self.formats:
+                self._write(frames[best], self.variant_path(digest, time_ms, size, fmt), width, fmt)
+        self._manifest_path(digest, times).write_text(
+            json.dumps({"time_ms": time_ms, "score": float(scores[best])}))
+        return self._result(digest, time_ms, float(scores[best]))
+
+
+_thumbnail_engine: Optional[ThumbnailEngine] = None
+
+
+def get_thumbnail_engine() -> ThumbnailEngine:
+    """Return the process-wide thumbnail engine"""
+    global _thumbnail_engine
+    if _thumbnail_engine is None:
+        _thumbnail_engine = ThumbnailEngine()
+    return _thumbnail_engine
+
+
+async def generate_clip_thumbnail(clip_id: int, db: AsyncSession = None,
+                                  video_path: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Generate (or reuse) thumbnails for a stored clip and save the primary path on its row"""
+    engine = get_thumbnail_engine()
+    highlights = digest = clip_duration = None
+    if db:
+        result = await db.execute(
+            select(ClipModel.file_path, ClipModel.highlights_detected, ClipModel.thumbnail_path,
+                   ClipModel.content_hash, ClipModel.duration)
+            .where(ClipModel.id == clip_id)
+        )
+        row = result.first()
+        if row:
+            if video_path is None or video_path == row[0]:
+                existing = engine.from_primary(row[2])
+                if existing:
+                    return existing
+                digest, clip_duration = row[3], row[4]
+            video_path = video_path or row[0]
+            highlights = row[1]
+    if not video_path:
+        return None
+
+    # Exact duration from the probe cache (clips.duration is whole seconds), so the candidate set
+    # and its manifest match across runs without decoding the video
+    info = await asyncio.to_thread(get_video_probe().probe, video_path)
+    duration = (info or {}).get("duration") or clip_duration
+
+    try:
+        thumbnails = None
+        if digest and duration:
+            thumbnails = await asyncio.to_thread(engine.cached, video_path, duration, highlights, digest)
+        if thumbnails is None:
+            thumbnails = await get_analysis_pool().generate_thumbnail(video_path, highlights, digest, duration)
+    except Exception as e:
+        logger.error(f"Error generating thumbnail for clip {clip_id}: {e}")
+        return None
+
+    if db:
+        await db.execute(
+            update(ClipModel)
+            .where(ClipModel.id == clip_id)
+            .values(thumbnail_path=thumbnails["primary"])
+        )
+        await db.commit()
+    return thumbnails
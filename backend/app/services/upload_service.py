@@ -0,0 +1,309 @@
+"""
+ClipConductor AI - Streaming Uploads
+Writes uploaded video bytes straight to disk off the event loop, hashing on the fly, with resumable upload sessions
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+import uuid
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+from app.core.config import settings
+
+
+def new_content_hasher():
+    """Hasher used for clip content hashes everywhere (uploads, clip store)"""
+    return hashlib.blake2b(digest_size=32)
+
+
+class UploadTooLargeError(Exception):
+    """Raised as soon as an upload exceeds MAX_FILE_SIZE_MB"""
+
+    def __init__(self, limit: int):
+        super().__init__(f"File exceeds the {limit // (1024 * 1024)} MB upload limit")
+        self.limit = limit
+
+
+class UploadOffsetError(Exception):
+    """Raised when a chunk does not start where the stored upload ends"""
+
+    def __init__(self, expected: int, received: int):
+        super().__init__(f"Upload offset mismatch: expected {expected}, got {received}")
+        self.expected = expected
+        self.received = received
+
+
+def max_upload_bytes() -> int:
+    return settings.MAX_FILE_SIZE_MB * 1024 * 1024
+
+
+def safe_filename(filename: Optional[str]) -> str:
+    name = os.path.basename(filename or "upload.mp4")
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", name).strip("._") or "upload.mp4"
+
+
+class StreamingFileWriter:
+    """
+    Async file writer for request bodies.
+
+    Incoming chunks (typically 64 KB from the ASGI server) are coalesced into
+    ``flush_bytes`` buffers; each buffer is written and fed to the content
+    hasher in a worker thread, so the event loop only ever copies bytes into
+    the buffer. ``max_bytes`` is checked before anything is buffered, so an
+    oversized upload fails on the first byte over the limit.
+    """
+
+    def __init__(self, path: str, offset: int = 0, hasher=None,
+                 max_bytes: Optional[int] = None, flush_bytes: Optional[int] = None):
+        self.path = path
+        self.offset = offset
+        self.hasher = hasher if hasher is not None else new_content_hasher()
+        self.max_bytes = max_bytes if max_bytes is not None else max_upload_bytes()
+        self.flush_bytes = flush_bytes or settings.UPLOAD_FLUSH_BYTES
+        self.bytes_written = 0
+        self._buffer = bytearray()
+        self._file = None
+
+    async def open(self) -> "StreamingFileWriter":
+        def _open():
+            f = open(self.path, "r+b" if self.offset else "wb")
+            f.seek(self.offset)
+            f.truncate()
+            return f
+        self._file = await asyncio.to_thread(_open)
+        return self
+
+    async def write(self, chunk: bytes) -> None:
+        if self.offset + self.bytes_written + len(self._buffer) + len(chunk) > self.max_bytes:
+            raise UploadTooLargeError(self.max_bytes)
+        self._buffer += chunk
+        if len(self._buffer) >= self.flush_bytes:
+            await self.flush()
+
+    def _write_block(self, block: bytearray) -> None:
+        self._file.write(block)
+        self.hasher.update(block)
+
+    async def flush(self) -> None:
+        if not self._buffer:
+            return
+        block, self._buffer = self._buffer, bytearray()
+        await asyncio.to_thread(self._write_block, block)
+        self.bytes_written += len(block)
+
+    async def close(self, fsync: bool = False) -> None:
+        try:
+            await self.flush()
+        finally:
+            if self._file is not None:
+                f, self._file = self._file, None
+
+                def _close():
+                    if fsync:
+                        f.flush()
+                        os.fsync(f.fileno())
+                    f.close()
+                await asyncio.to_thread(_close)
+
+    async def abort(self) -> None:
+        self._buffer = bytearray()
+        if self._file is not None:
+            f, self._file = self._file, None
+            await asyncio.to_thread(f.close)
+
+    @property
+    def size(self) -> int:
+        return self.offset + self.bytes_written
+
+
+async def stream_to_file(chunks: AsyncIterator[bytes], path: str,
+                         max_bytes: Optional[int] = None) -> Dict[str, Any]:
+    """Write an async byte stream to `path`, returns size and content hash; removes the file on failure"""
+    writer = await StreamingFileWriter(path, max_bytes=max_bytes).open()
+    try:
+        async for chunk in chunks:
+            if chunk:
+                await writer.write(chunk)
+        await writer.close()
+    except BaseException:
+        await writer.abort()
+        await asyncio.to_thread(_remove_quietly, path)
+        raise
+    return {"path": path, "size": writer.size, "content_hash": writer.hasher.hexdigest()}
+
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class UploadSessionStore:
+    """
+    Resumable uploads: a partial file plus a small JSON sidecar per session.
+
+    A client creates a session, then sends the body in any number of chunks,
+    each tagged with the offset it starts at. A chunk whose offset is not the
+    current size of the partial file is rejected with the expected offset,
+    so an interrupted client asks for the offset and continues from there.
+    The running hash lives in memory; after a restart it is rebuilt from the
+    partial file on the next chunk.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = Path(directory or os.path.join(settings.OUTPUT_DIRECTORY, "uploads", ".partial"))
+        self._hashers: Dict[str, Tuple[int, Any]] = {}  # upload_id -> (bytes hashed, hasher)
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    def _meta_path(self, upload_id: str) -> Path:
+        return self.directory / f"{upload_id}.json"
+
+    def _data_path(self, upload_id: str) -> Path:
+        return self.directory / f"{upload_id}.part"
+
+    def _save(self, session: Dict[str, Any]) -> None:
+        tmp = self._meta_path(session["upload_id"]).with_suffix(".tmp")
+        tmp.write_text(json.dumps(session))
+        os.replace(tmp, self._meta_path(session["upload_id"]))
+
+    async def create(self, filename: str, title: str, total_size: Optional[int] = None) -> Dict[str, Any]:
+        if total_size is not None and total_size > max_upload_bytes():
+            raise UploadTooLargeError(max_upload_bytes())
+        session = {
+            "upload_id": uuid.uuid4().hex,
+            "filename": safe_filename(filename),
+            "title": title,
+            "total_size": total_size,
+            "offset": 0,
+            "created_at": time.time(),
+        }
+
+        def _create():
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._data_path(session["upload_id"]).touch()
+            self._save(session)
+        await asyncio.to_thread(_create)
+        self._hashers[session["upload_id"]] = (0, new_content_hasher())
+        return session
+
+    async def get(self, upload_id: str) -> Optional[Dict[str, Any]]:
+        if not re.fullmatch(r"[0-9a-f]{32}", upload_id):
+            return None
+        try:
+            text = await asyncio.to_thread(self._meta_path(upload_id).read_text)
+        except OSError:
+            return None
+        session = json.loads(text)
+        # The data file is the source of truth if we died between write and sidecar update
+        session["offset"] = await asyncio.to_thread(os.path.getsize, self._data_path(upload_id))
+        return session
+
+    def _lock(self, upload_id: str) -> asyncio.Lock:
+        lock = self._locks.get(upload_id)
+        if lock is None:
+            lock = self._locks[upload_id] = asyncio.Lock()
+        return lock
+
+    def _rehash(self, upload_id: str, length: int):
+        hasher = new_content_hasher()
+        with open(self._data_path(upload_id), "rb") as f:
+            remaining = length
+            while remaining > 0:
+                block = f.read(min(settings.UPLOAD_FLUSH_BYTES, remaining))
+                if not block:
+                    break
+                hasher.update(block)
+                remaining -= len(block)
+        return hasher
+
+    async def append(self, upload_id: str, offset: int, chunks: AsyncIterator[bytes]) -> Dict[str, Any]:
+        """Write one chunk stream at `offset`, returns the updated session"""
+        async with self._lock(upload_id):
+            session = await self.get(upload_id)
+            if session is None:
+                raise KeyError(upload_id)
+            if offset != session["offset"]:
+                raise UploadOffsetError(session["offset"], offset)
+
+            limit = max_upload_bytes()
+            if session.get("total_size"):
+                limit = min(limit, session["total_size"])
+            hashed_to, hasher = self._hashers.get(upload_id, (None, None))
+            if hasher is None or hashed_to != offset:
+                hasher = await asyncio.to_thread(self._rehash, upload_id, offset)
+
+            writer = await StreamingFileWriter(str(self._data_path(upload_id)), offset=offset,
+                                               hasher=hasher, max_bytes=limit).open()
+            try:
+                async for chunk in chunks:
+                    if chunk:
+                        await writer.write(chunk)
+                await writer.close()
+            except BaseException:
+                # Keep what reached the disk, drop the hash state so it is rebuilt from the file
+                await writer.close()
+                self._hashers.pop(upload_id, None)
+                raise
+
+            self._hashers[upload_id] = (writer.size, hasher)
+            session["offset"] = writer.size
+            await asyncio.to_thread(self._save, session)
+            return session
+
+    async def complete(self, upload_id: str, target_dir: Optional[str] = None) -> Dict[str, Any]:
+        """Move the finished upload into place, returns path, size and content hash"""
+        async with self._lock(upload_id):
+            session = await self.get(upload_id)
+            if session is None:
+                raise KeyError(upload_id)
+            if session.get("total_size") and session["offset"] != session["total_size"]:
+                raise UploadOffsetError(session["total_size"], session["offset"])
+
+            hashed_to, hasher = self._hashers.pop(upload_id, (None, None))
+            if hasher is None or hashed_to != session["offset"]:
+                hasher = await asyncio.to_thread(self._rehash, upload_id, session["offset"])
+            target_dir = target_dir or os.path.join(settings.OUTPUT_DIRECTORY, "uploads")
+            final_path = os.path.join(target_dir, f"{upload_id[:8]}_{session['filename']}")
+
+            def _finish():
+                os.makedirs(target_dir, exist_ok=True)
+                os.replace(self._data_path(upload_id), final_path)
+                self._meta_path(upload_id).unlink(missing_ok=True)
+            await asyncio.to_thread(_finish)
+            self._locks.pop(upload_id, None)
+            return {
+                "path": final_path,
+                "size": session["offset"],
+                "content_hash": hasher.hexdigest(),
+                "title": session["title"],
+                "filename": session["filename"],
+            }
+
+    async def abort(self, upload_id: str) -> bool:
+        # Wait for an in-flight append or complete rather than deleting under it
+        async with self._lock(upload_id):
+            session = await self.get(upload_id)
+            if session is None:
+                self._locks.pop(upload_id, None)
+                return False
+            self._hashers.pop(upload_id, None)
+            await asyncio.to_thread(_remove_quietly, str(self._data_path(upload_id)))
+            await asyncio.to_thread(_remove_quietly, str(self._meta_path(upload_id)))
+            self._locks.pop(upload_id, None)
+            return True
+
+
+_upload_sessions: Optional[UploadSessionStore] = None
+
+
+def get_upload_sessions() -> UploadSessionStore:
+    """Return the process-wide upload session store"""
+    global _upload_sessions
+    if _upload_sessions is None:
+        _upload_sessions = UploadSessionStore()
+    return _upload_sessions
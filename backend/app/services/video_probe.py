@@ -0,0 +1,345 @@
+"""
+ClipConductor AI - Video Probe
+Reads container metadata (duration, fps, resolution, codecs, bitrate) without decoding frames, cached per file version
+"""
+
+import json
+import os
+import shutil
+import struct
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from app.core.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+PROBE_CACHE_FORMAT_VERSION = 1
+
+CODEC_NAMES = {
+    "avc1": "h264", "avc3": "h264", "hvc1": "hevc", "hev1": "hevc", "av01": "av1",
+    "vp09": "vp9", "mp4v": "mpeg4", "mp4a": "aac", "Opus": "opus", "ac-3": "ac3", "ec-3": "eac3",
+}
+
+_CONTAINER_BOXES = {b"moov", b"trak", b"mdia", b"minf", b"stbl"}
+_MAX_MOOV_BYTES = 64 * 1024 * 1024
+
+
+def _iter_boxes(data: bytes, start: int = 0, end: Optional[int] = None):
+    """Yield (type, payload_start, payload_end) for the boxes in data[start:end]"""
+    end = len(data) if end is None else end
+    pos = start
+    while pos + 8 <= end:
+        size, box_type = struct.unpack_from(">I4s", data, pos)
+        header = 8
+        if size == 1:
+            if pos + 16 > end:
+                return
+            size = struct.unpack_from(">Q", data, pos + 8)[0]
+            header = 16
+        elif size == 0:
+            size = end - pos
+        if size < header:
+            return
+        yield box_type, pos + header, min(pos + size, end)
+        pos += size
+
+
+def _read_moov(path: str) -> Optional[bytes]:
+    """Find the moov box by walking top-level box headers (seeks, never reads media data)"""
+    with open(path, "rb") as f:
+        file_size = os.fstat(f.fileno()).st_size
+        pos = 0
+        while pos + 8 <= file_size:
+            f.seek(pos)
+            header = f.read(16)
+            if len(header) < 8:
+                return None
+            size, box_type = struct.unpack_from(">I4s", header)
+            header_size = 8
+            if size == 1:
+                size = struct.unpack_from(">Q", header, 8)[0]
+                header_size = 16
+            elif size == 0:
+                size = file_size - pos
+            if size < header_size:
+                return None
+            if box_type == b"moov":
+                if size > _MAX_MOOV_BYTES:
+                    return None
+                f.seek(pos + header_size)
+                return f.read(size - header_size)
+            pos += size
+    return None
+
+
+def _full_box_times(data: bytes, start: int) -> Tuple[int, int]:
+    """(timescale, duration) from an mvhd/mdhd payload"""
+    if data[start] == 1:
+        return struct.unpack_from(">IQ", data, start + 20)
+    return struct.unpack_from(">II", data, start + 12)
+
+
+def _parse_track(data: bytes, start: int, end: int, track: Dict[str, Any]) -> None:
+    for box_type, p_start, p_end in _iter_boxes(data, start, end):
+        if box_type in _CONTAINER_BOXES:
+            _parse_track(data, p_start, p_end, track)
+        elif box_type == b"tkhd" and p_end - p_start >= 8:
+            width, height = struct.unpack_from(">II", data, p_end - 8)
+            track["width"], track["height"] = width >> 16, height >> 16
+        elif box_type == b"mdhd":
+            track["timescale"], track["duration"] = _full_box_times(data, p_start)
+        elif box_type == b"hdlr":
+            track["handler"] = data[p_start + 8:p_start + 12]
+        elif box_type == b"stsd" and p_end - p_start >= 16:
+            track["codec"] = data[p_start + 12:p_start + 16].decode("latin-1")
+        elif box_type == b"stts":
+            count = struct.unpack_from(">I", data, p_start + 4)[0]
+            entries = data[p_start + 8:p_start + 8 + count * 8]
+            track["samples"] = sum(n for n, _ in struct.iter_unpack(">II", entries))
+
+
+def probe_mp4(path: str) -> Optional[Dict[str, Any]]:
+    """Parse mvhd/trak boxes of an MP4/MOV; None when the file is not a plain MP4"""
+    moov = _read_moov(path)
+    if not moov:
+        return None
+
+    timescale, duration = 0, 0
+    tracks: List[Dict[str, Any]] = []
+    for box_type, p_start, p_end in _iter_boxes(moov):
+        if box_type == b"mvhd":
+            timescale, duration = _full_box_times(moov, p_start)
+        elif box_type == b"trak":
+            track: Dict[str, Any] = {}
+            _parse_track(moov, p_start, p_end, track)
+            tracks.append(track)
+
+    video = next((t for t in tracks if t.get("handler") == b"vide"), None)
+    audio = next((t for t in tracks if t.get("handler") == b"soun"), None)
+    if not timescale or not duration or video is None:
+        return None  # fragmented MP4 or no video track
+
+    seconds = duration / timescale
+    fps = None
+    if video.get("samples") and video.get("timescale") and video.get("duration"):
+        fps = video["samples"] / (video["duration"] / video["timescale"])
+    return {
+        "duration": round(seconds, 3),
+        "fps": round(fps, 3) if fps else None,
+        "width": video.get("width"),
+        "height": video.get("height"),
+        "codec": CODEC_NAMES.get(video.get("codec"), video.get("codec")),
+        "audio_codec": CODEC_NAMES.get(audio.get("codec"), audio.get("codec")) if audio else None,
+        "has_audio": audio is not None,
+        "bitrate": int(os.path.getsize(path) * 8 / seconds) if seconds else None,
+        "probed_with": "mp4",
+    }
+
+
+def probe_ffprobe(path: str) -> Optional[Dict[str, Any]]:
+    ffprobe = shutil.which("ffprobe")
+    if not ffprobe:
+        return None
+    command = [ffprobe, "-v", "error", "-print_format", "json", "-show_format", "-show_streams", path]
+    try:
+        result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                check=True, timeout=30)
+        data = json.loads(result.stdout)
+    except (subprocess.SubprocessError, OSError, ValueError):
+        return None
+
+    streams = data.get("streams", [])
+    video = next((s for s in streams if s.get("codec_type") == "video"), None)
+    audio = next((s for s in streams if s.get("codec_type") == "audio"), None)
+    fmt = data.get("format", {})
+    if video is None or not fmt.get("duration"):
+        return None
+    fps = None
+    if video.get("avg_frame_rate", "0/0") != "0/0":
+        num, den = video["avg_frame_rate"].split("/")
+        fps = float(num) / float(den) if float(den) else None
+    return {
+        "duration": round(float(fmt["duration"]), 3),
+        "fps": round(fps, 3) if fps else None,
+        "width": video.get("width"),
+        "height": video.get("height"),
+        "codec": video.get("codec_name"),
+        "audio_codec": audio.get("codec_name") if audio else None,
+        "has_audio": audio is not None,
+        "bitrate": int(fmt["bit_rate"]) if fmt.get("bit_rate") else None,
+        "probed_with": "ffprobe",
+    }
+
+
+def probe_opencv(path: str) -> Optional[Dict[str, Any]]:
+    """Last resort: container properties through OpenCV (opens the demuxer, decodes nothing)"""
+    import cv2
+    cap = cv2.VideoCapture(path)
+    try:
+        if not cap.isOpened():
+            return None
+        fps = cap.get(cv2.CAP_PROP_FPS) or None
+        frames = cap.get(cv2.CAP_PROP_FRAME_COUNT)
+        fourcc = int(cap.get(cv2.CAP_PROP_FOURCC))
+        width, height = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    finally:
+        cap.release()
+    seconds = frames / fps if fps and frames > 0 else None
+    codec = "".join(chr((fourcc >> (8 * i)) & 0xFF) for i in range(4)).strip("\x00") or None
+    return {
+        "duration": round(seconds, 3) if seconds else None,
+        "fps": round(fps, 3) if fps else None,
+        "width": width or None,
+        "height": height or None,
+        "codec": CODEC_NAMES.get(codec, codec),
+        "audio_codec": None,
+        "has_audio": None,
+        "bitrate": int(os.path.getsize(path) * 8 / seconds) if seconds else None,
+        "probed_with": "opencv",
+    }
+
+
+class VideoProbe:
+    """
+    Probe results cached by (path, size, mtime).
+
+    The MP4 box parser only seeks between top-level box headers and reads
+    the ``moov`` box, so a probe costs a few small reads. ffprobe and OpenCV
+    are fallbacks for other containers and fragmented files. Results are
+    persisted as JSON next to the clip indexes; a changed size or mtime
+    invalidates an entry.
+    """
+
+    def __init__(self, cache_path: Optional[str] = None, workers: int = 8):
+        if cache_path is None:
+            index_dir = settings.CLIP_INDEX_DIRECTORY or os.path.join(settings.OUTPUT_DIRECTORY, "index")
+            cache_path = os.path.join(index_dir, "probe_cache.json")
+        self.cache_path = Path(cache_path)
+        self.workers = workers
+        # path -> {"key": [size, mtime_ns], "info": {...}}
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._loaded = False
+        self._dirty = False
+        self.hits = 0
+        self.misses = 0
+
+    def load(self) -> None:
+        self._loaded = True
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as fh:
+                data = json.load(fh)
+        except (OSError, ValueError):
+            return
+        if data.get("format") == PROBE_CACHE_FORMAT_VERSION:
+            self._entries = data.get("entries", {})
+
+    def save(self) -> None:
+        """Atomically persist the cache if it changed"""
+        # One writer at a time, and each writes the snapshot it took, so an older snapshot can
+        # never replace a newer file; if the write fails the changes stay dirty for the next save
+        with self._save_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                data = {"format": PROBE_CACHE_FORMAT_VERSION, "entries": dict(self._entries)}
+                self._dirty = False
+            try:
+                self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = self.cache_path.with_name(self.cache_path.name + ".tmp")
+                with open(tmp_path, "w", encoding="utf-8") as fh:
+                    json.dump(data, fh, separators=(",", ":"))
+                os.replace(tmp_path, self.cache_path)
+            except BaseException:
+                with self._lock:
+                    self._dirty = True
+                raise
+
+    def save_quietly(self) -> None:
+        """save(), logging I/O errors instead of raising: a lost cache only costs re-probing"""
+        try:
+            self.save()
+        except OSError as e:
+            logger.warning(f"Could not persist probe cache: {e}")
+
+    def probe(self, path: str, size: Optional[int] = None, mtime_ns: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Metadata for one file; pass size/mtime from an index to skip the stat"""
+        path = str(path)
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    self.load()
+        if size is None or mtime_ns is None:
+            try:
+                st = os.stat(path)
+            except OSError:
+                return None
+            size, mtime_ns = st.st_size, st.st_mtime_ns
+
+        key = [size, mtime_ns]
+        cached = self._entries.get(path)
+        if cached and cached["key"] == key:
+            self.hits += 1
+            return cached["info"]
+
+        self.misses += 1
+        info = None
+        for prober in (probe_mp4, probe_ffprobe, probe_opencv):
+            try:
+                info = prober(path)
+            except Exception as e:
+                logger.debug(f"{prober.__name__} failed for {path}: {e}")
+                info = None
+            if info and info.get("duration"):
+                break
+        if info is None:
+            return None
+        info["size"] = size
+        with self._lock:
+            self._entries[path] = {"key": key, "info": info}
+            self._dirty = True
+        return info
+
+    def probe_many(self, files: Iterable[Any]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Probe many files in parallel threads (probing is I/O bound) and persist once.
+
+        Accepts paths or ClipIndex entries (dicts with path, size and mtime).
+        """
+        jobs = []
+        for item in files:
+            if isinstance(item, dict):
+                jobs.append((item["path"], item.get("size"), item.get("mtime")))
+            else:
+                jobs.append((str(item), None, None))
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            results = list(executor.map(lambda job: self.probe(*job), jobs))
+        self.save_quietly()
+        return {job[0]: result for job, result in zip(jobs, results)}
+
+    def stats(self) -> Dict[str, Any]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+_video_probe: Optional[VideoProbe] = None
+
+
+def get_video_probe() -> VideoProbe:
+    """Return the process-wide probe cache"""
+    global _video_probe
+    if _video_probe is None:
+        _video_probe = VideoProbe()
+    return _video_probe
+
+
+def duration_seconds(info: Optional[Dict[str, Any]]) -> Optional[int]:
+    """Whole seconds for Clip.duration and prompts"""
+    if not info or not info.get("duration"):
+        return None
+    return max(1, int(round(info["duration"])))
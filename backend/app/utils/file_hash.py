@@ -0,0 +1,27 @@
+"""
+ClipConductor AI - File Hashing
+Cheap content fingerprints for large video files
+"""
+
+import hashlib
+import os
+
+
+def sample_hash(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """
+    SHA-256 over the file size and three chunks (head, middle, tail).
+
+    Reads at most ``3 * chunk_size`` bytes whatever the file size, which is
+    enough to tell recordings apart and to notice a re-encode or trim. Files
+    smaller than three chunks are hashed in full.
+    """
+    size = os.path.getsize(path)
+    digest = hashlib.sha256(str(size).encode())
+    with open(path, "rb") as f:
+        if size <= 3 * chunk_size:
+            digest.update(f.read())
+        else:
+            for offset in (0, size // 2 - chunk_size // 2, size - chunk_size):
+                f.seek(offset)
+                digest.update(f.read(chunk_size))
+    return digest.hexdigest()
@@ -0,0 +1,20 @@
+"""
+ClipConductor AI - Hashtags
+One spelling per hashtag, so stored metadata and search filters match
+"""
+
+from typing import Any
+
+
+def normalize_hashtag(tag: str) -> str:
+    """'#Clutch', 'clutch' and ' #clutch ' all become '#clutch'"""
+    tag = tag.strip().lstrip("#").strip().lower()
+    return f"#{tag}" if tag else ""
+
+
+def normalize_metadata_hashtags(metadata: Any) -> Any:
+    """Normalize and deduplicate metadata["hashtags"] in place, however the LLM spelled them"""
+    if isinstance(metadata, dict) and isinstance(metadata.get("hashtags"), list):
+        tags = (normalize_hashtag(tag) for tag in metadata["hashtags"] if isinstance(tag, str))
+        metadata["hashtags"] = list(dict.fromkeys(tag for tag in tags if tag))
+    return metadata
@@ -0,0 +1,122 @@
+"""
+Incremental extraction of top-level JSON string fields from streamed LLM output
+"""
+
+import json
+from typing import Dict, List, Tuple
+
+
+class JSONFieldStream:
+    """
+    Feeds streamed text through a small JSON tokenizer and reports each
+    top-level ``"key": "string"`` pair as soon as its closing quote arrives.
+
+    Text before the first ``{`` is ignored, as is a leading
+    ``<think>...</think>`` block emitted by reasoning models such as
+    deepseek-r1. Nested objects and arrays are skipped over, only their
+    nesting depth is tracked.
+    """
+
+    def __init__(self):
+        self.text: List[str] = []
+        self.fields: Dict[str, str] = {}
+        self._depth = 0
+        self._started = False
+        self._in_think = False
+        self._prefix = ""
+        self._in_string = False
+        self._escape = False
+        self._string: List[str] = []
+        self._key = None
+        self._expect_value = False
+
+    def feed(self, chunk: str) -> List[Tuple[str, str]]:
+        """Consume a chunk, return the (key, value) pairs completed by it"""
+        self.text.append(chunk)
+        completed = []
+        for ch in chunk:
+            if not self._started:
+                self._scan_preamble(ch)
+                continue
+            pair = self._consume(ch)
+            if pair:
+                self.fields[pair[0]] = pair[1]
+                completed.append(pair)
+        return completed
+
+    def _scan_preamble(self, ch: str) -> None:
+        self._prefix = (self._prefix + ch)[-8:]
+        if self._in_think:
+            if self._prefix.endswith("</think>"):
+                self._in_think = False
+            return
+        if self._prefix.endswith("<think>"):
+            self._in_think = True
+        elif ch == "{":
+            self._started = True
+            self._depth = 1
+
+    def _consume(self, ch: str):
+        if self._in_string:
+            if self._escape:
+                self._escape = False
+                self._string.append("\\" + ch)
+            elif ch == "\\":
+                self._escape = True
+            elif ch == '"':
+                self._in_string = False
+                return self._string_done(self._decode("".join(self._string)))
+            else:
+                self._string.append(ch)
+            return None
+
+        if ch == '"':
+            self._in_string = True
+            self._string = []
+        elif ch in "{[":
+            self._depth += 1
+            self._expect_value = False
+        elif ch in "}]":
+            self._depth -= 1
+            if self._depth == 1:
+                self._key = None
+        elif ch == ":" and self._depth == 1:
+            self._expect_value = True
+        elif ch == "," and self._depth == 1:
+            self._key = None
+            self._expect_value = False
+        return None
+
+    @staticmethod
+    def _decode(raw: str) -> str:
+        """Unescape a string body; invalid escapes such as \\' or \\x keep the raw text"""
+        try:
+            # strict=False: LLMs emit raw newlines and tabs inside string values
+            return json.loads('"' + raw + '"', strict=False)
+        except json.JSONDecodeError:
+            return raw
+
+    def _string_done(self, value: str):
+        if self._depth != 1:
+            return None
+        if self._expect_value and self._key is not None:
+            key, self._key, self._expect_value = self._key, None, False
+            return key, value
+        self._key = value
+        return None
+
+    @property
+    def complete(self) -> bool:
+        return self._started and self._depth == 0
+
+    def full_text(self) -> str:
+        return "".join(self.text)
+
+    def json_text(self) -> str:
+        """The raw text starting at the first top-level object, without any think block"""
+        text = self.full_text()
+        if "</think>" in text:
+            text = text.split("</think>", 1)[1]
+        start = text.find("{")
+        end = text.rfind("}")
+        return text[start:end + 1] if start != -1 and end != -1 else text
@@ -0,0 +1,45 @@
+"""
+ClipConductor AI - Job Worker
+Runs queued ProcessingJobs outside the API process: python -m app.worker
+"""
+
+import argparse
+import asyncio
+import logging
+import signal
+from app.core.http_client import close_ollama_client, init_ollama_client
+from app.services.analysis_pool import shutdown_analysis_pool
+from app.services.job_queue import JobWorker
+import app.services.job_handlers  # noqa: F401  (registers the handlers)
+
+logger = logging.getLogger(__name__)
+
+
+async def run_worker(concurrency=None, job_types=None) -> None:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:  # Windows
+            pass
+
+    await init_ollama_client()
+    worker = JobWorker(concurrency=concurrency, job_types=job_types)
+    try:
+        await worker.run(stop)
+    finally:
+        logger.info(f"Job worker stopped: {worker.stats()}")
+        await asyncio.to_thread(shutdown_analysis_pool)
+        await close_ollama_client()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ClipConductor AI job worker")
+    parser.add_argument("--concurrency", type=int, default=None)
+    parser.add_argument("--job-type", action="append", dest="job_types",
+                        help="only run these job types (repeatable)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run_worker(args.concurrency, args.job_types))
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+"""
+ClipConductor AI - Clip Index Benchmark
+Compares a full rglob scan with cold and warm ClipIndex refreshes on synthetic clip folders
+
+Usage: python benchmarks/bench_clip_index.py [--sizes 10000 100000] [--per-dir 500]
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.clip_index import ClipIndex  # noqa: E402
+
+
+def build_tree(root: Path, count: int, per_dir: int) -> None:
+    """Create `count` empty clips spread over game/day folders, recorded an hour ago (settled)"""
+    recorded = time.time() - 3600
+    for i in range(count):
+        folder = root / f"Game{i // (per_dir * 10)}" / f"day{(i // per_dir) % 10}"
+        if i % per_dir == 0:
+            folder.mkdir(parents=True, exist_ok=True)
+        clip = folder / f"Game_07-12-2025_23-41-{i % 60:02d}-{i % 1000:03d}_{i}.mp4"
+        clip.touch()
+        os.utime(clip, (recorded, recorded))
+
+
+def rglob_scan(root: Path) -> int:
+    return sum(1 for p in root.rglob("*.mp4") if p.stat().st_size >= 0)
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def run(count: int, per_dir: int) -> None:
+    workdir = Path(tempfile.mkdtemp(prefix="clipindex_bench_"))
+    try:
+        root = workdir / "clips"
+        build_tree(root, count, per_dir)
+        index_path = workdir / "index.json"
+
+        found, rglob_ms = timed(lambda: rglob_scan(root))
+
+        cold = ClipIndex(str(root), index_path=str(index_path))
+        _, cold_ms = timed(cold.refresh)
+
+        # New instance: loads the persisted index, then only stats directories
+        warm = ClipIndex(str(root), index_path=str(index_path))
+        _, warm_ms = timed(warm.refresh)
+        _, hot_ms = timed(warm.refresh)
+
+        # One new clip invalidates a single directory
+        next(root.glob("Game0/day0")).joinpath("Game_new_clip.mp4").touch()
+        _, incr_ms = timed(warm.refresh)
+
+        print(f"\n📊 {count} clips ({found} found by rglob)")
+        print(f"  rglob + stat:           {rglob_ms:9.1f} ms")
+        print(f"  index cold build:       {cold_ms:9.1f} ms")
+        print(f"  index warm (from disk): {warm_ms:9.1f} ms")
+        print(f"  index warm (in memory): {hot_ms:9.1f} ms")
+        print(f"  index after 1 new clip: {incr_ms:9.1f} ms  ({len(warm)} indexed)")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--per-dir", type=int, default=500)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        run(size, args.per_dir)
@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+"""
+ClipConductor AI - Clip Pagination Benchmark
+Times OFFSET vs keyset pages at increasing depth and exact vs estimated counts over a large clips table
+
+Usage: python benchmarks/bench_clip_pagination.py [--rows 1000000] [--url postgresql+asyncpg://...]
+Without --url a temporary SQLite database is used (needs aiosqlite). Point --url at a scratch database:
+the clips and users tables are created there if missing and filled up to --rows.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import Integer, String, bindparam, cast, func, insert, literal, literal_column, select, text  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from app.models.database import Base, Clip as ClipModel, User  # noqa: E402
+from app.services.clip_service import ClipService  # noqa: E402
+
+STATUSES = ["processing", "ready", "ready", "ready", "published", "error"]
+BATCH = 10_000
+
+
+async def fill(session_factory, rows: int) -> None:
+    async with session_factory() as db:
+        existing = (await db.execute(select(func.count()).select_from(ClipModel))).scalar()
+        if not (await db.execute(select(User.id).limit(1))).first():
+            await db.execute(insert(User), [{"id": i, "username": f"user{i}", "email": f"user{i}@example.com",
+                                             "hashed_password": "x"} for i in range(1, 51)])
+        rng = random.Random(existing)
+        # created_at is rendered by the database, `age` seconds ago, so it is stored exactly like the
+        # server default of a real upload (on SQLite: text without a fraction) and cursors round-trip it
+        age = bindparam("age", type_=Integer)
+        if db.bind.dialect.name == "sqlite":
+            created_at = func.datetime("now", literal("-") + cast(age, String) + literal(" seconds"))
+        else:
+            created_at = func.now() - age * literal_column("interval '1 second'")
+        for offset in range(existing, rows, BATCH):
+            batch = [{
+                "title": f"Clip {i}",
+                "file_path": f"/clips/{i}.mp4",
+                "status": rng.choice(STATUSES),
+                "owner_id": rng.randint(1, 50),
+                # Many clips share a second, as after a bulk import, so the id tie-break matters
+                "age": (rows - i) // 3,
+            } for i in range(offset, min(rows, offset + BATCH))]
+            await db.execute(insert(ClipModel).values(created_at=created_at), batch)
+            await db.commit()
+            print(f"\r  inserted {min(rows, offset + BATCH):,}/{rows:,}", end="", flush=True)
+        print()
+        if db.bind.dialect.name == "postgresql":
+            await db.execute(text("ANALYZE clips"))
+        await db.commit()
+
+
+async def timed(coro):
+    start = time.perf_counter()
+    result = await coro
+    return result, (time.perf_counter() - start) * 1000
+
+
+async def cursor_at(db: AsyncSession, depth: int, status=None) -> str:
+    """Cursor of the row just before `depth`, as if the client had paged there"""
+    from app.utils.pagination import encode_cursor
+    query = select(ClipModel.created_at, ClipModel.id)
+    if status:
+        query = query.where(ClipModel.status == status)
+    row = (await db.execute(
+        query.order_by(ClipModel.created_at.desc(), ClipModel.id.desc()).offset(depth - 1).limit(1)
+    )).one()
+    return encode_cursor(*row)
+
+
+async def walk(service: ClipService, pages: int, per_page: int, status=None) -> None:
+    """Follow next_cursor from the first page and check against OFFSET: no page repeats or skips rows"""
+    cursor = None
+    for page in range(pages):
+        clips, cursor = await service.list_clips(limit=per_page, cursor=cursor, status=status)
+        expected = await service.db.execute(
+            select(ClipModel.id).where(*service._clip_filters(status))
+            .order_by(ClipModel.created_at.desc(), ClipModel.id.desc())
+            .offset(page * per_page).limit(per_page)
+        )
+        assert [c.id for c in clips] == list(expected.scalars()), f"keyset page {page} differs from OFFSET"
+        if cursor is None:
+            break
+
+
+async def main(url: str, rows: int, per_page: int) -> None:
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all, tables=[User.__table__, ClipModel.__table__])
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await fill(session_factory, rows)
+
+    async with session_factory() as db:
+        service = ClipService(db)
+        print(f"\n📊 {rows:,} clips, {per_page} per page ({engine.dialect.name})")
+        for status in (None, "ready"):
+            label = f"status={status}" if status else "all clips"
+            print(f"\n  {label}")
+            await walk(service, 50, per_page, status)
+            for depth in (0, 10_000, 100_000, rows // 2):
+                if depth >= rows * (0.5 if status else 1.0):
+                    continue
+                offset_query = select(ClipModel).where(*service._clip_filters(status)) \
+                    .order_by(ClipModel.created_at.desc(), ClipModel.id.desc()) \
+                    .offset(depth).limit(per_page)
+                offset_rows, offset_ms = await timed(db.execute(offset_query))
+                cursor = await cursor_at(db, depth, status) if depth else None
+                (keyset_rows, _), keyset_ms = await timed(
+                    service.list_clips(limit=per_page, cursor=cursor, status=status)
+                )
+                assert [c.id for c in offset_rows.scalars()] == [c.id for c in keyset_rows], "pages differ"
+                print(f"    depth {depth:>9,}:  OFFSET {offset_ms:9.2f} ms   keyset {keyset_ms:7.2f} ms")
+            (exact, _), exact_ms = await timed(service.count_clips(status=status))
+            (estimate, is_estimate), estimate_ms = await timed(service.count_clips(status=status, estimate=True))
+            print(f"    count:  exact {exact:,} in {exact_ms:.1f} ms   "
+                  f"{'estimate' if is_estimate else 'exact'} {estimate:,} in {estimate_ms:.1f} ms")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--per-page", type=int, default=20)
+    parser.add_argument("--url", default=None)
+    args = parser.parse_args()
+
+    url = args.url
+    if url is None:
+        url = f"sqlite+aiosqlite:///{os.path.join(tempfile.gettempdir(), 'clip_pagination_bench.sqlite3')}"
+    asyncio.run(main(url, args.rows, args.per_page))
@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+"""
+ClipConductor AI - Frame Transport Benchmark
+Compares sending frames between processes through a pickled multiprocessing queue and the shared-memory FrameRing
+
+Usage: python benchmarks/bench_frame_ring.py [--frames 300] [--width 1920] [--height 1080] [--slots 16]
+"""
+
+import argparse
+import multiprocessing
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.frame_ring import FrameRing  # noqa: E402
+
+
+def make_frames(height: int, width: int, count: int = 8):
+    """A few distinct frames the producer cycles through, so generation is not measured"""
+    rng = np.random.default_rng(0)
+    return [rng.integers(0, 255, (height, width, 3), dtype=np.uint8) for _ in range(count)]
+
+
+def queue_producer(q, frames: int, height: int, width: int) -> None:
+    pool = make_frames(height, width)
+    for i in range(frames):
+        q.put((i, pool[i % len(pool)]))
+    q.put(None)
+
+
+def ring_producer(ring: FrameRing, frames: int, height: int, width: int) -> None:
+    pool = make_frames(height, width)
+    for i in range(frames):
+        ring.write(pool[i % len(pool)], i)
+    ring.close_writer()
+    ring.close()
+
+
+def consume(frame: np.ndarray) -> int:
+    # Touch a sparse grid of pixels, like a model reading its input once
+    return int(frame[::64, ::64].sum())
+
+
+def bench_queue(frames: int, height: int, width: int, slots: int, context) -> float:
+    q = context.Queue(maxsize=slots)
+    producer = context.Process(target=queue_producer, args=(q, frames, height, width))
+    producer.start()
+    start = None
+    while True:
+        item = q.get()
+        start = start or time.perf_counter()
+        if item is None:
+            break
+        consume(item[1])
+    elapsed = time.perf_counter() - start
+    producer.join()
+    return elapsed
+
+
+def bench_ring(frames: int, height: int, width: int, slots: int, context) -> float:
+    ring = FrameRing(slots, (height, width, 3), context=context)
+    producer = context.Process(target=ring_producer, args=(ring, frames, height, width))
+    producer.start()
+    start = None
+    try:
+        while True:
+            item = ring.read()
+            start = start or time.perf_counter()
+            if item is None:
+                break
+            slot, view, _ = item
+            consume(view)
+            del view
+            ring.release(slot)
+        elapsed = time.perf_counter() - start
+        producer.join()
+        return elapsed
+    finally:
+        ring.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--slots", type=int, default=16)
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    frame_mb = args.width * args.height * 3 / 1024 / 1024
+    print(f"\n📊 {args.frames} frames of {args.width}x{args.height} BGR ({frame_mb:.1f} MB each), "
+          f"{args.slots} slots")
+    for name, fn in (("pickled queue", bench_queue), ("shared ring", bench_ring)):
+        elapsed = fn(args.frames, args.height, args.width, args.slots, context)
+        rate = args.frames / elapsed
+        print(f"  {name:<14} {rate:9.1f} frames/s  {rate * frame_mb:9.1f} MB/s  {elapsed * 1000:9.1f} ms")
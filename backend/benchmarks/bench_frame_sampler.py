@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+"""
+ClipConductor AI - Frame Sampler Benchmark
+Compares seek, sequential and auto sampling on synthetic videos at several sample densities
+
+Usage: python benchmarks/bench_frame_sampler.py [--seconds 60] [--fps 60] [--samples 10 60 600]
+"""
+
+import argparse
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.frame_sampler import FrameSampler  # noqa: E402
+
+
+def build_video(path: Path, seconds: int, fps: int, width: int, height: int) -> None:
+    """Write a moving-gradient clip so every frame differs from the last"""
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+    if not writer.isOpened():
+        raise RuntimeError("OpenCV has no mp4v encoder available")
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    for i in range(seconds * fps):
+        frame = np.empty((height, width, 3), dtype=np.uint8)
+        frame[..., 0] = (x + i * 3) % 256
+        frame[..., 1] = (y + i * 2) % 256
+        frame[..., 2] = (x[None, :] + y + i) % 256
+        cv2.putText(frame, str(i), (20, height // 2), cv2.FONT_HERSHEY_SIMPLEX, 2, (255, 255, 255), 3)
+        writer.write(frame)
+    writer.release()
+
+
+def run_strategy(path: Path, samples: int, strategy: str, max_width: int):
+    with FrameSampler(str(path), max_width=max_width) as sampler:
+        indices = sampler.evenly_spaced(samples)
+        start = time.perf_counter()
+        read = sum(1 for _ in sampler.iter_frames(indices, strategy=strategy))
+        elapsed = time.perf_counter() - start
+        return read, elapsed, sampler.frames_decoded, sampler.seeks
+
+
+def run(seconds: int, fps: int, width: int, height: int, sample_counts, max_width: int) -> None:
+    workdir = Path(tempfile.mkdtemp(prefix="frame_sampler_bench_"))
+    try:
+        path = workdir / "synthetic.mp4"
+        build_video(path, seconds, fps, width, height)
+        print(f"\n📼 {seconds}s @ {fps}fps, {width}x{height} ({seconds * fps} frames)")
+
+        for samples in sample_counts:
+            print(f"\n📊 {samples} samples")
+            for strategy in FrameSampler.STRATEGIES:
+                read, elapsed, decoded, seeks = run_strategy(path, samples, strategy, max_width)
+                rate = read / elapsed if elapsed else 0.0
+                print(f"  {strategy:<10} {rate:9.1f} samples/s  {elapsed * 1000:9.1f} ms  "
+                      f"({decoded} decoded, {seeks} seeks)")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seconds", type=int, default=60)
+    parser.add_argument("--fps", type=int, default=60)
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--samples", type=int, nargs="+", default=[10, 60, 600])
+    parser.add_argument("--max-width", type=int, default=640)
+    args = parser.parse_args()
+
+    run(args.seconds, args.fps, args.width, args.height, args.samples, args.max_width)
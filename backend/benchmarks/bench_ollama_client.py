@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+"""
+ClipConductor AI - Ollama Client Load Test
+Compares a fresh httpx client per request with the shared pooled client against a mock Ollama
+
+Usage: python benchmarks/bench_ollama_client.py [--requests 500] [--concurrency 16] [--connect-delay 0.005]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from app.core.http_client import create_ollama_client  # noqa: E402
+from app.services.batch_processor import percentile  # noqa: E402
+from mock_ollama import MockOllama  # noqa: E402
+
+
+async def load(base_url: str, total: int, concurrency: int, shared: bool) -> list:
+    pooled = create_ollama_client() if shared else None
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    payload = {"model": "deepseek-r1:latest", "prompt": "title please", "stream": False}
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            if pooled:
+                response = await pooled.post(f"{base_url}/api/generate", json=payload)
+            else:
+                async with httpx.AsyncClient(timeout=60.0) as client:
+                    response = await client.post(f"{base_url}/api/generate", json=payload)
+            response.raise_for_status()
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    try:
+        await asyncio.gather(*(one() for _ in range(total)))
+    finally:
+        if pooled:
+            await pooled.aclose()
+    return latencies
+
+
+async def main(args) -> None:
+    async with MockOllama(connect_delay=args.connect_delay,
+                          first_token_delay=args.generation_delay) as server:
+        for label, shared in (("per-request client", False), ("shared pooled client", True)):
+            before = server.connections
+            latencies = await load(server.base_url, args.requests, args.concurrency, shared)
+            print(f"\n📊 {label}: {args.requests} requests, concurrency {args.concurrency}")
+            print(f"  p50 {percentile(latencies, 50):7.2f} ms   p95 {percentile(latencies, 95):7.2f} ms   "
+                  f"p99 {percentile(latencies, 99):7.2f} ms")
+            print(f"  TCP connections opened: {server.connections - before}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--connect-delay", type=float, default=0.005,
+                        help="emulated per-connection setup cost in seconds")
+    parser.add_argument("--generation-delay", type=float, default=0.01)
+    asyncio.run(main(parser.parse_args()))
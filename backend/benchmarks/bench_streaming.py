@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+"""
+ClipConductor AI - Streaming Latency Benchmark
+Measures time-to-first-token and time-to-title for blocking vs streaming generation against a mock Ollama
+
+Usage: python benchmarks/bench_streaming.py [--first-token-delay 0.3] [--token-delay 0.03] [--runs 5]
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from app.core.http_client import create_ollama_client  # noqa: E402
+from app.services.ai_service_ollama import AIMetadataService, OllamaService  # noqa: E402
+from mock_ollama import MockOllama  # noqa: E402
+
+
+async def measure(server: MockOllama) -> dict:
+    client = create_ollama_client()
+    ollama = OllamaService(client=client)
+    ollama.base_url = server.base_url
+    ollama.cache = None
+    metadata_service = AIMetadataService(ollama)
+
+    try:
+        start = time.perf_counter()
+        await ollama.generate_text("title please", use_cache=False)
+        blocking = time.perf_counter() - start
+
+        start = time.perf_counter()
+        first_token = None
+        async for _ in ollama.stream_text("title please", use_cache=False):
+            if first_token is None:
+                first_token = time.perf_counter() - start
+        streamed_total = time.perf_counter() - start
+
+        start = time.perf_counter()
+        title_at = None
+        async for event in metadata_service.stream_gaming_metadata("Clutch", "Valorant", use_cache=False):
+            if event["event"] == "field" and event["key"] == "title" and title_at is None:
+                title_at = time.perf_counter() - start
+    finally:
+        await client.aclose()
+
+    return {"blocking": blocking, "ttft": first_token, "stream_total": streamed_total, "title": title_at}
+
+
+async def main(args) -> None:
+    async with MockOllama(first_token_delay=args.first_token_delay, token_delay=args.token_delay) as server:
+        runs = [await measure(server) for _ in range(args.runs)]
+
+    print(f"\n📊 Mock Ollama: first token after {args.first_token_delay}s, {args.token_delay}s per token")
+    for key, label in (("blocking", "blocking generate_text"), ("ttft", "streaming first token"),
+                       ("title", "streaming metadata title"), ("stream_total", "streaming complete")):
+        values = [r[key] for r in runs if r[key] is not None]
+        print(f"  {label:26s} median {statistics.median(values) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--first-token-delay", type=float, default=0.3)
+    parser.add_argument("--token-delay", type=float, default=0.03)
+    parser.add_argument("--runs", type=int, default=5)
+    asyncio.run(main(parser.parse_args()))
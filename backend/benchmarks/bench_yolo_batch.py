@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+"""
+ClipConductor AI - YOLO Batch Benchmark
+Measures CPU inference throughput of BatchDetector for several batch sizes and resolutions
+
+Usage: python benchmarks/bench_yolo_batch.py [--frames 64] [--batch-sizes 1 4 8 16] [--imgsz 640 480]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.detector import BatchDetector  # noqa: E402
+
+
+def synthetic_frames(count: int, width: int, height: int):
+    """Noise frames with a few solid rectangles so NMS has something to chew on"""
+    rng = np.random.default_rng(0)
+    frames = []
+    for _ in range(count):
+        frame = rng.integers(0, 255, (height, width, 3), dtype=np.uint8)
+        for _ in range(4):
+            x, y = rng.integers(0, width - 120), rng.integers(0, height - 200)
+            frame[y:y + 200, x:x + 120] = rng.integers(0, 255, 3, dtype=np.uint8)
+        frames.append(frame)
+    return frames
+
+
+def run(frames, model_path: str, batch_size: int, imgsz: int, repeats: int):
+    detector = BatchDetector(model_path=model_path, imgsz=imgsz, batch_size=batch_size, device="cpu")
+    detector.detect(frames[:batch_size])  # load weights and warm up kernels
+
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        detections = detector.detect(frames)
+        timings.append(time.perf_counter() - start)
+    best = min(timings)
+    return len(frames) / best, best, len(detections)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--model", default="yolov8n.pt")
+    parser.add_argument("--frames", type=int, default=64)
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 4, 8, 16])
+    parser.add_argument("--imgsz", type=int, nargs="+", default=[640])
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    frames = synthetic_frames(args.frames, args.width, args.height)
+    for imgsz in args.imgsz:
+        print(f"\n📊 {args.frames} frames {args.width}x{args.height} -> imgsz {imgsz} (CPU)")
+        for batch_size in args.batch_sizes:
+            rate, elapsed, boxes = run(frames, args.model, batch_size, imgsz, args.repeats)
+            print(f"  batch {batch_size:>3}: {rate:8.1f} frames/s  {elapsed * 1000:9.1f} ms  ({boxes} boxes)")
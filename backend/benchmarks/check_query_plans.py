@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+"""
+ClipConductor AI - Query Plan Check
+EXPLAINs the hot queries of the API and the job worker and exits 1 if any of them reads a table sequentially
+
+Usage: python benchmarks/check_query_plans.py [--url postgresql+asyncpg://...]
+Without --url a temporary SQLite database is created from the models. With --url, point it at a database
+migrated to head (alembic upgrade head); nothing is written. On PostgreSQL sequential scans are disabled
+for the session, so a Seq Scan left in a plan means no index can serve the query, whatever the table
+size or statistics.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import Update, func, select, text, type_coerce  # noqa: E402
+from sqlalchemy.dialects.postgresql import JSONB  # noqa: E402
+from sqlalchemy.ext.asyncio import create_async_engine  # noqa: E402
+from sqlalchemy.ext.compiler import compiles  # noqa: E402
+from sqlalchemy.sql.expression import ClauseElement, Executable  # noqa: E402
+from app.models.database import Base, Clip as ClipModel, ProcessingJob as ProcessingJobModel, Publication  # noqa: E402
+from app.models.schemas import JobStatus  # noqa: E402
+from app.services.clip_search import has_hashtags, highlight_score  # noqa: E402
+from app.services.clip_service import ClipService  # noqa: E402
+from app.services.job_queue import JobQueue  # noqa: E402
+from app.utils.pagination import encode_cursor  # noqa: E402
+
+
+def hot_queries(dialect: str):
+    """(name, statement) for every query that runs per request or per worker poll"""
+    now = datetime.now(timezone.utc)
+    cursor = encode_cursor(now, 1000)
+    queries = [
+        ("clips: first page", ClipService._page_query(21)),
+        ("clips: page after cursor", ClipService._page_query(21, cursor)),
+        ("clips: page by status", ClipService._page_query(21, cursor, status="ready")),
+        ("clips: page by owner", ClipService._page_query(21, cursor, owner_id=1)),
+        ("clips: count by status",
+         select(func.count()).select_from(ClipModel).where(*ClipService._clip_filters("ready"))),
+        ("clips: by content hash", select(ClipModel.id).where(ClipModel.content_hash == "0" * 64)),
+        ("clips: search by game", select(ClipModel.id).where(ClipModel.game_detected == "valorant")),
+        ("clips: search by highlight score", select(ClipModel.id).where(highlight_score(dialect) >= 0.9)),
+        ("jobs: claim candidates", JobQueue._candidates_query(now)),
+        ("jobs: exhausted leases", JobQueue._exhausted_leases_update(now)),
+        ("jobs: of a clip",
+         select(ProcessingJobModel).where(ProcessingJobModel.clip_id == 1).order_by(ProcessingJobModel.id.desc())),
+        ("jobs: active for a clip",
+         select(ProcessingJobModel.id).where(
+             ProcessingJobModel.clip_id == 1,
+             ProcessingJobModel.status.in_([JobStatus.PENDING.value, JobStatus.PROCESSING.value]),
+         )),
+        ("publications: of a clip on a platform",
+         select(Publication).where(Publication.clip_id == 1, Publication.platform == "youtube")),
+    ]
+    if dialect == "postgresql":
+        queries += [
+            ("clips: search by hashtag", select(ClipModel.id).where(has_hashtags(dialect, ["#clutch"]))),
+            ("clips: by detected event", select(ClipModel.id).where(
+                type_coerce(ClipModel.highlights_detected, JSONB).contains({"detected_events": [{"type": "kill"}]})
+            )),
+        ]
+    return queries
+
+
+def postgres_seq_scans(plan: dict) -> list:
+    found = [plan["Relation Name"]] if plan["Node Type"] == "Seq Scan" else []
+    for child in plan.get("Plans", []):
+        found += postgres_seq_scans(child)
+    return found
+
+
+SQLITE_TABLE_SCAN = re.compile(r"^SCAN (?:TABLE )?(\w+)(?: AS \w+)?$")
+
+
+class Explain(Executable, ClauseElement):
+    """EXPLAIN <statement>, compiled with the statement's bound parameters"""
+
+    inherit_cache = False
+
+    def __init__(self, statement, prefix: str):
+        self.statement = statement
+        self.prefix = prefix
+
+
+@compiles(Explain)
+def _compile_explain(element, compiler, **kw):
+    return f"{element.prefix} {compiler.process(element.statement, **kw)}"
+
+
+async def explain(conn, statement) -> tuple:
+    """(plan text, tables read sequentially)"""
+    if isinstance(statement, Update):
+        # Same access path as the UPDATE, without compiling DML inside EXPLAIN
+        statement = select(*statement.table.primary_key.columns).where(statement.whereclause)
+    if conn.dialect.name == "postgresql":
+        plan = (await conn.execute(Explain(statement, "EXPLAIN (FORMAT JSON)"))).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        lines = (await conn.execute(Explain(statement, "EXPLAIN"))).scalars().all()
+        return "\n".join(lines), postgres_seq_scans(plan[0]["Plan"])
+
+    rows = (await conn.execute(Explain(statement, "EXPLAIN QUERY PLAN"))).all()
+    details = [row[-1] for row in rows]
+    scans = [match.group(1) for match in map(SQLITE_TABLE_SCAN.match, details) if match]
+    return "\n".join(details), scans
+
+
+async def main(url: str, verbose: bool) -> int:
+    engine = create_async_engine(url)
+    failures = []
+    async with engine.connect() as conn:
+        dialect = conn.dialect.name
+        if dialect == "sqlite" and not (await conn.execute(text(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'clips'"
+        ))).first():
+            await conn.run_sync(Base.metadata.create_all)
+        if dialect == "postgresql":
+            await conn.execute(text("SET enable_seqscan = off"))
+
+        print(f"📊 Query plans ({dialect})")
+        for name, statement in hot_queries(dialect):
+            plan, scans = await explain(conn, statement)
+            print(f"{'❌' if scans else '✅'} {name}" + (f": sequential scan of {', '.join(scans)}" if scans else ""))
+            if scans:
+                failures.append(name)
+            if verbose or scans:
+                print("    " + plan.replace("\n", "\n    "))
+        await conn.rollback()
+    await engine.dispose()
+
+    if failures:
+        print(f"\n{len(failures)} hot queries fall back to sequential scans; add or fix an index (alembic migration)")
+        return 1
+    print("\nAll hot queries are served by indexes")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default=None)
+    parser.add_argument("--verbose", action="store_true", help="print every plan, not only failing ones")
+    args = parser.parse_args()
+
+    url = args.url
+    if url is None:
+        url = f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'query_plans.sqlite3')}"
+    sys.exit(asyncio.run(main(url, args.verbose)))
@@ -0,0 +1,170 @@
+#!/usr/bin/env python
+"""
+ClipConductor AI - Mock Ollama Server
+Minimal HTTP/1.1 keep-alive server speaking the parts of the Ollama API the backend uses
+
+Used by the benchmarks; can also be run standalone:
+    python benchmarks/mock_ollama.py --port 11500 --token-delay 0.02
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Optional
+
+DEFAULT_RESPONSE = json.dumps({
+    "title": "Insane 1v4 Clutch!",
+    "description": "🎮 Nobody expected this ending 🔥",
+    "hashtags": ["#gaming", "#clutch", "#fyp", "#viral", "#epic", "#gamer", "#insane", "#highlights"],
+    "platforms": {
+        "youtube": {"title": "Insane 1v4 Clutch", "tags": ["gaming", "clutch"]},
+        "tiktok": {"title": "1v4 😱", "hashtags": ["#fyp", "#gaming"]},
+        "instagram": {"title": "Clutch of the year", "hashtags": ["#reels", "#gaming"]}
+    }
+})
+
+
+class MockOllama:
+    """
+    In-process Ollama stand-in.
+
+    ``connect_delay`` is paid once per new TCP connection (emulating the
+    handshake/accept cost of a remote or containerised Ollama),
+    ``first_token_delay`` once per generation and ``token_delay`` per
+    streamed token.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0,
+                 connect_delay: float = 0.0, first_token_delay: float = 0.0,
+                 token_delay: float = 0.0, response: str = DEFAULT_RESPONSE,
+                 models: Optional[list] = None):
+        self.host = host
+        self.port = port
+        self.connect_delay = connect_delay
+        self.first_token_delay = first_token_delay
+        self.token_delay = token_delay
+        self.response = response
+        self.models = models or ["deepseek-r1:latest", "medgemma:4b", "nidum-gemma:latest"]
+        self.connections = 0
+        self.requests = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self) -> "MockOllama":
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self) -> None:
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.stop()
+
+    def _tokens(self):
+        # Split into small chunks the way a tokenizer roughly would
+        text = self.response
+        return [text[i:i + 4] for i in range(0, len(text), 4)]
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        if self.connect_delay:
+            await asyncio.sleep(self.connect_delay)
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode().split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    key, _, value = line.decode().partition(":")
+                    headers[key.strip().lower()] = value.strip()
+                body = b""
+                if "content-length" in headers:
+                    body = await reader.readexactly(int(headers["content-length"]))
+                self.requests += 1
+                await self._route(method, path, json.loads(body) if body else {}, writer)
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, method: str, path: str, payload: dict, writer: asyncio.StreamWriter) -> None:
+        if path == "/api/tags":
+            await self._send_json(writer, {"models": [{"name": m} for m in self.models]})
+        elif path == "/api/ps":
+            await self._send_json(writer, {"models": [{"name": self.models[0], "size_vram": 0}]})
+        elif path == "/api/generate" and payload.get("stream", True):
+            await self._stream_generate(payload, writer)
+        elif path == "/api/generate":
+            await asyncio.sleep(self.first_token_delay + self.token_delay * len(self._tokens()))
+            await self._send_json(writer, {
+                "model": payload.get("model"),
+                "response": self.response,
+                "done": True,
+            })
+        else:
+            await self._send(writer, 404, b'{"error":"not found"}')
+
+    async def _send(self, writer, status: int, body: bytes, content_type: str = "application/json") -> None:
+        writer.write(
+            f"HTTP/1.1 {status} {'OK' if status == 200 else 'Not Found'}\r\nContent-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: keep-alive\r\n\r\n".encode() + body
+        )
+        await writer.drain()
+
+    async def _send_json(self, writer, data: dict) -> None:
+        await self._send(writer, 200, json.dumps(data).encode())
+
+    async def _stream_generate(self, payload: dict, writer) -> None:
+        writer.write(
+            b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\n"
+            b"Transfer-Encoding: chunked\r\nConnection: keep-alive\r\n\r\n"
+        )
+        await asyncio.sleep(self.first_token_delay)
+        for token in self._tokens():
+            await self._write_chunk(writer, {"model": payload.get("model"), "response": token, "done": False})
+            if self.token_delay:
+                await asyncio.sleep(self.token_delay)
+        await self._write_chunk(writer, {"model": payload.get("model"), "response": "", "done": True,
+                                         "created_at": time.time()})
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    async def _write_chunk(self, writer, data: dict) -> None:
+        line = json.dumps(data).encode() + b"\n"
+        writer.write(f"{len(line):x}\r\n".encode() + line + b"\r\n")
+        await writer.drain()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mock Ollama server")
+    parser.add_argument("--port", type=int, default=11500)
+    parser.add_argument("--connect-delay", type=float, default=0.0)
+    parser.add_argument("--first-token-delay", type=float, default=0.2)
+    parser.add_argument("--token-delay", type=float, default=0.02)
+    args = parser.parse_args()
+
+    async def main():
+        server = MockOllama(port=args.port, connect_delay=args.connect_delay,
+                            first_token_delay=args.first_token_delay, token_delay=args.token_delay)
+        await server.start()
+        print(f"🤖 Mock Ollama listening on {server.base_url}")
+        await asyncio.Event().wait()
+
+    asyncio.run(main())
@@ -0,0 +1,129 @@
+"""
+ClipSearch against a plain Python reference on the SQLite json1 path
+"""
+
+import random
+from collections import Counter
+
+import pytest
+
+from app.models.database import Clip as ClipModel
+from app.services.clip_search import SCORE_BUCKETS, ClipSearch
+from app.utils.hashtags import normalize_hashtag, normalize_metadata_hashtags
+
+GAMES = ["valorant", "fortnite", "apex", None]
+TAGS = ["#clutch", "#ace", "#fail", "#gaming", "#funny"]
+STATUSES = ["ready", "processing", "published"]
+
+CASES = [
+    {},
+    {"hashtags": ["#Clutch"]},
+    {"hashtags": ["clutch", "#ace"], "status": "ready"},
+    {"min_score": 0.9},
+    {"game": "apex", "min_score": 0.5, "max_score": 0.75},
+    {"status": "published", "game": "valorant", "hashtags": ["#gaming"], "min_score": 0.2},
+]
+
+
+def _random_clips(count: int, seed: int = 1) -> list:
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        roll = rng.random()
+        if roll < 0.9:
+            tags = rng.sample(TAGS, rng.randint(0, 3))
+            metadata = {"hashtags": [t.upper() if rng.random() < 0.3 else t for t in tags]}
+        elif roll < 0.95:
+            metadata = {"hashtags": "not-a-list"}
+        else:
+            metadata = None
+        score = round(rng.random(), 3) if rng.random() < 0.85 else None
+        rows.append({
+            "owner_id": 1,
+            "title": f"clip-{i}",
+            "file_path": f"/clips/{i}.mp4",
+            "status": rng.choice(STATUSES),
+            "game_detected": rng.choice(GAMES),
+            "ai_metadata": normalize_metadata_hashtags(metadata),
+            "highlights_detected": {"best_moments": [], "highlight_score": score} if score is not None else None,
+        })
+    return rows
+
+
+def _tags(row) -> list:
+    metadata = row["ai_metadata"]
+    if metadata and isinstance(metadata.get("hashtags"), list):
+        return metadata["hashtags"]
+    return []
+
+
+def _score(row):
+    return row["highlights_detected"]["highlight_score"] if row["highlights_detected"] else None
+
+
+def _bucket(score: float) -> str:
+    for label, lower in SCORE_BUCKETS:
+        if lower is None or score >= lower:
+            return label
+
+
+def _matches(row, status=None, game=None, hashtags=(), min_score=None, max_score=None, exclude=None) -> bool:
+    if status and exclude != "status" and row["status"] != status:
+        return False
+    if game and exclude != "game" and row["game_detected"] != game:
+        return False
+    if hashtags and exclude != "hashtag" and not all(tag in _tags(row) for tag in hashtags):
+        return False
+    if exclude != "highlight_score":
+        score = _score(row)
+        if min_score is not None and (score is None or score < min_score):
+            return False
+        if max_score is not None and (score is None or score >= max_score):
+            return False
+    return True
+
+
+@pytest.fixture
+async def clips(session_factory):
+    rows = _random_clips(400)
+    async with session_factory() as db:
+        db.add_all(ClipModel(**row) for row in rows)
+        await db.commit()
+    return rows
+
+
+@pytest.mark.parametrize("filters", CASES)
+async def test_search_matches_reference(session_factory, clips, filters):
+    reference = dict(filters)
+    reference["hashtags"] = [normalize_hashtag(t) for t in filters.get("hashtags", [])]
+    expected = [row for row in clips if _matches(row, **reference)]
+
+    async with session_factory() as db:
+        search = ClipSearch(db, **filters)
+        assert search.dialect == "sqlite"
+        assert await search.count() == len(expected)
+
+        seen, cursor = [], None
+        while True:
+            page, cursor = await search.page(limit=37, cursor=cursor)
+            seen += [clip.title for clip in page]
+            if not cursor:
+                break
+        assert len(seen) == len(set(seen))
+        assert sorted(seen) == sorted(row["title"] for row in expected)
+
+        facets = await search.facets(limit=50)
+
+    def counts(facet):
+        return {item["value"]: item["count"] for item in facets[facet] if item["count"]}
+
+    assert counts("status") == Counter(
+        row["status"] for row in clips if _matches(row, **reference, exclude="status"))
+    assert counts("game") == Counter(
+        row["game_detected"] for row in clips
+        if row["game_detected"] and _matches(row, **reference, exclude="game"))
+    assert counts("hashtag") == Counter(
+        tag for row in clips if _matches(row, **reference, exclude="hashtag") for tag in _tags(row))
+    assert counts("highlight_score") == Counter(
+        _bucket(_score(row)) for row in clips
+        if _score(row) is not None and _matches(row, **reference, exclude="highlight_score"))
@@ -0,0 +1,160 @@
+"""
+JobQueue and JobWorker on SQLite: claims, leases, retries, cancellation and shutdown
+"""
+
+import asyncio
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import select, update
+
+from app.models.database import Clip as ClipModel, ProcessingJob as ProcessingJobModel
+from app.models.schemas import ClipStatus, JobStatus
+from app.services.job_queue import (
+    CLIP_FAILING_JOB_TYPES, JOB_HANDLERS, JobQueue, JobWorker, job_handler, utcnow,
+)
+
+
+@pytest.fixture
+def handlers():
+    """Test job types, removed from the global registry afterwards"""
+    started = asyncio.Event()
+    never = asyncio.Event()  # never set: a blocking job only stops when cancelled
+
+    @job_handler("test_noop")
+    async def noop(ctx):
+        return {"ran": True}
+
+    @job_handler("test_broken", fails_clip=True)
+    async def broken(ctx):
+        raise RuntimeError("decoder exploded")
+
+    @job_handler("test_blocking")
+    async def blocking(ctx):
+        started.set()
+        await never.wait()
+
+    yield started
+    for job_type in ("test_noop", "test_broken", "test_blocking"):
+        JOB_HANDLERS.pop(job_type, None)
+        CLIP_FAILING_JOB_TYPES.discard(job_type)
+
+
+async def _enqueue(session_factory, job_type, clip_id=None, max_attempts=3):
+    async with session_factory() as db:
+        job = await JobQueue(session_factory).enqueue(db, job_type, clip_id=clip_id, max_attempts=max_attempts)
+    return job.id
+
+
+async def _job(session_factory, job_id) -> ProcessingJobModel:
+    async with session_factory() as db:
+        return (await db.execute(select(ProcessingJobModel).where(ProcessingJobModel.id == job_id))).scalar_one()
+
+
+async def _processing_clip(session_factory) -> int:
+    async with session_factory() as db:
+        clip = ClipModel(owner_id=1, title="clip", file_path="/clips/clip.mp4", status=ClipStatus.PROCESSING.value)
+        db.add(clip)
+        await db.commit()
+        return clip.id
+
+
+async def test_two_workers_never_claim_the_same_job(session_factory, handlers):
+    job_ids = [await _enqueue(session_factory, "test_noop") for _ in range(20)]
+    queues = [JobQueue(session_factory, worker_id=f"worker-{n}") for n in range(2)]
+
+    async def claim_all(queue):
+        claimed = []
+        while (job := await queue.claim()) is not None:
+            claimed.append(job.id)
+        return claimed
+
+    first, second = await asyncio.gather(*(claim_all(q) for q in queues))
+    assert sorted(first + second) == job_ids
+    assert not set(first) & set(second)
+
+    for job_id in first:
+        job = await _job(session_factory, job_id)
+        assert (job.status, job.locked_by, job.attempts) == (JobStatus.PROCESSING.value, "worker-0", 1)
+
+
+async def test_expired_lease_is_reclaimed_by_another_worker(session_factory, handlers):
+    job_id = await _enqueue(session_factory, "test_noop")
+    crashed = JobQueue(session_factory, worker_id="crashed")
+    crashed.lease = timedelta(seconds=-1)  # lease already over, as if heartbeats stopped
+    survivor = JobQueue(session_factory, worker_id="survivor")
+
+    assert (await crashed.claim()).id == job_id
+    reclaimed = await survivor.claim()
+    assert reclaimed.id == job_id
+    assert (reclaimed.locked_by, reclaimed.attempts) == ("survivor", 2)
+
+    # The original worker has lost the job: no more heartbeats or completion from it
+    assert not await crashed.heartbeat(job_id)
+    assert not await crashed.complete(job_id)
+    assert await survivor.complete(job_id, {"ok": True})
+    assert (await _job(session_factory, job_id)).status == JobStatus.COMPLETED.value
+
+
+async def test_retries_back_off_then_fail_the_job_and_its_clip(session_factory, handlers):
+    clip_id = await _processing_clip(session_factory)
+    job_id = await _enqueue(session_factory, "test_broken", clip_id=clip_id, max_attempts=2)
+    queue = JobQueue(session_factory, worker_id="worker")
+    worker = JobWorker(queue, concurrency=1)
+
+    await worker._run_job(await queue.claim())
+    job = await _job(session_factory, job_id)
+    assert job.status == JobStatus.PENDING.value
+    assert job.attempts == 1
+    assert "decoder exploded" in job.error_message
+    assert job.run_after.replace(tzinfo=None) > utcnow().replace(tzinfo=None)
+    assert await queue.claim() is None  # not due until the backoff has passed
+
+    async with session_factory() as db:
+        await db.execute(update(ProcessingJobModel).where(ProcessingJobModel.id == job_id)
+                         .values(run_after=utcnow() - timedelta(seconds=1)))
+        await db.commit()
+    await worker._run_job(await queue.claim())
+
+    job = await _job(session_factory, job_id)
+    assert (job.status, job.attempts, job.locked_by) == (JobStatus.FAILED.value, 2, None)
+    assert worker.failed == 2
+    async with session_factory() as db:
+        status = (await db.execute(select(ClipModel.status).where(ClipModel.id == clip_id))).scalar_one()
+    assert status == ClipStatus.ERROR.value
+
+
+async def test_cancel_stops_the_handler_at_its_next_heartbeat(session_factory, handlers):
+    job_id = await _enqueue(session_factory, "test_blocking")
+    queue = JobQueue(session_factory, worker_id="worker")
+    worker = JobWorker(queue, concurrency=1)
+    worker.heartbeat_interval = 0.01
+
+    task = asyncio.create_task(worker._run_job(await queue.claim()))
+    await asyncio.wait_for(handlers.wait(), timeout=5)
+    async with session_factory() as db:
+        assert await queue.cancel(db, job_id)
+
+    with pytest.raises(asyncio.CancelledError):
+        await asyncio.wait_for(task, timeout=5)
+    job = await _job(session_factory, job_id)
+    assert (job.status, job.locked_by) == (JobStatus.CANCELLED.value, None)
+    assert worker.completed == worker.failed == 0
+
+
+async def test_drain_requeues_jobs_still_running_after_the_grace_period(session_factory, handlers):
+    job_id = await _enqueue(session_factory, "test_blocking")
+    queue = JobQueue(session_factory, worker_id="worker")
+    worker = JobWorker(queue, concurrency=1)
+    worker.poll_interval = 0.01
+    stop = asyncio.Event()
+
+    run = asyncio.create_task(worker.run(stop, shutdown_grace=0.05))
+    await asyncio.wait_for(handlers.wait(), timeout=5)
+    assert worker.stats()["running"] == [job_id]
+    stop.set()
+    await asyncio.wait_for(run, timeout=5)
+
+    job = await _job(session_factory, job_id)
+    assert (job.status, job.attempts, job.locked_by, job.run_after) == (JobStatus.PENDING.value, 0, None, None)
+    assert (await JobQueue(session_factory, worker_id="next").claim()).id == job_id
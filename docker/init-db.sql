@@ -5,5 +5,5 @@
 -- Extensions
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
 
--- Create indexes for better performance
--- These will be created by Alembic migrations, but included here as reference
+-- Tables and indexes are created by the Alembic migrations (backend/alembic/versions):
+--   alembic upgrade head